@@ -0,0 +1,65 @@
+import glob
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.merge import BookmarkMerger
+from src.storage import BookmarkStorage
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Merge and dedup bookmark dumps by tweet id')
+    parser.add_argument('inputs', nargs='+',
+                        help='bookmarks_*.json / twitter_bookmarks_*.json files or globs (.gz/.zst ok)')
+    parser.add_argument('--output', help='Output file (.json, .jsonl, optionally .gz/.zst)')
+
+    args = parser.parse_args()
+
+    # expand globs ourselves so quoting works the same on every shell
+    paths = []
+    for pattern in args.inputs:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(m for m in matches if m not in paths)
+
+    merger = BookmarkMerger()
+    for path in paths:
+        if not Path(path).exists():
+            print(f"✗ Not found: {path}")
+            sys.exit(1)
+        print(f"Indexing {path}...")
+        merger.add_file(path)
+
+    output = Path(args.output or f"bookmarks_merged_{datetime.now():%Y%m%d_%H%M%S}.json")
+    storage = BookmarkStorage(output.parent)
+
+    if '.jsonl' in output.suffixes:
+        storage.save_jsonl(merger.iter_merged(), output.name, index=True)
+        count = len(merger.index)
+    else:
+        meta = {
+            "merged_from": [str(p) for p in merger.sources],
+            "merged_at": datetime.now().isoformat(),
+            "stats": merger.stats
+        }
+        _, count = storage.save_export(merger.iter_merged(), output.name, meta)
+
+    stats = merger.stats
+    print(f"\n{'='*50}")
+    print(f"✓ Merge complete!")
+    print(f"  Files: {stats['files']}")
+    print(f"  Tweets read: {stats['tweets_read']}")
+    print(f"  Unique tweets: {count}")
+    print(f"  Exact duplicates: {stats['duplicates']}")
+    print(f"  Changed between runs: {stats['changed']}")
+    print(f"  Replaced by richer version: {stats['replaced']}")
+    if stats['missing_id']:
+        print(f"  Skipped without id: {stats['missing_id']}")
+    print(f"  Output: {output}")
+    print(f"{'='*50}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+# add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.media_parser import MediaParser
+from src.gazetteer import Gazetteer
+from src.parser_config import load_parser_config
+from src.wikidata_cache import WikidataCache
+from src.wikidata_client import WikidataClient
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse scraped tweets for media information (rule-based, no model)')
+    parser.add_argument('input', help='twitter_bookmarks_*.json / .jsonl export (.gz/.zst ok)')
+    parser.add_argument('output', help='Parsed output file, same shape as src/parserIndex.js writes')
+    parser.add_argument('--config', '-c', help='Parser config (default: config/parser.config.json)')
+    parser.add_argument('--no-wikidata', action='store_true',
+                        help='No wikidata requests, only titles matched on earlier runs are enriched')
+
+    args = parser.parse_args()
+
+    if not Path(args.input).exists():
+        print(f"✗ Not found: {args.input}")
+        sys.exit(1)
+
+    config = load_parser_config(args.config)
+    settings = config.get('wikidata') or {}
+    wikidata = cache = gazetteer = None
+    if settings.get('enabled'):
+        # cache_dir is relative to the repo root, like for the node parser
+        cache_dir = Path(__file__).parent / settings['cache_dir']
+        cache = WikidataCache(cache_dir / 'wikidata.sqlite3',
+                              ttl_days=settings.get('cache_ttl_days', 7),
+                              negative_ttl_days=settings.get('negative_cache_ttl_days', 1))
+        # lookups the node parser already made
+        cache.import_json(cache_dir / 'wikidata-cache.json')
+        cache.purge()
+        # titles matched on earlier runs resolve offline, the rest go to wikidata
+        gazetteer = Gazetteer.from_caches(cache)
+        if not args.no_wikidata:
+            wikidata = WikidataClient(cache, rate_limit_ms=settings.get('rate_limit_ms', 500))
+
+    media_parser = MediaParser(config, wikidata, gazetteer=gazetteer)
+    print(f"Parsing {args.input}...")
+    try:
+        stats = media_parser.parse_file(args.input, args.output)
+        cache_stats = cache.stats() if cache else None
+    finally:
+        if wikidata:
+            wikidata.close()
+        if cache:
+            cache.close()
+
+    print(f"\n{'='*50}")
+    print(f"✓ Parsing complete!")
+    print(f"  Tweets processed: {stats['tweets_processed']}")
+    print(f"  Tweets with media: {stats['tweets_with_media']}")
+    print(f"  Media items found: {stats['total_media_items']}")
+    if cache:
+        print(f"  Wikidata enhanced: {stats['wikidata_enhanced']} ({len(gazetteer)} known titles)")
+    if wikidata:
+        print(f"  Wikidata lookups: {wikidata.stats['lookups']} "
+              f"({wikidata.stats['cache_hits']} cached, {wikidata.stats['searches']} searches, "
+              f"{wikidata.stats['entity_calls']} entity calls)")
+        print(f"  Wikidata cache: {cache_stats['entries']} entries "
+              f"({cache_stats['negative_entries']} no-match), hit rate {cache_stats['hit_rate']:.0%}")
+    print(f"  Output: {args.output}")
+    print(f"{'='*50}\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,318 @@
-import json
 import requests
 import re
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import sys
+import threading
+import heapq
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from datetime import datetime
 
+# add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.compression import open_file, strip_codec_suffix, codec_for
+from src.offset_index import OffsetIndexReader
+from src.json_stream import iter_tweets
+from src import serializer
+from src.ollama_client import OllamaClient
+from src.ollama_router import OllamaRouter
+from src.extraction_cache import ExtractionCache, content_key
+from src.journal import ExtractionJournal
+from src.rule_extractor import RuleExtractor
+from src.gazetteer import Gazetteer
+from src.wikidata_cache import WikidataCache
+from src.streaming import read_generate_stream
+from src.retry_policy import BudgetExhausted, RetryPolicy
+from src.telemetry import Telemetry, ollama_timings
+from src.near_dupes import NearDuplicateFinder
+from src.filters import TweetFilter
+from src.prompt_compactor import PromptCompactor
+from src.parser_config import load_parser_config
+
+# section marker between tweets in a batched prompt and its answer
+BATCH_MARKER_RE = re.compile(r'^\s*={2,}\s*TWEET\s+(\S+?)\s*={2,}\s*$', re.MULTILINE)
+FIELD_LINE_RE = re.compile(r'^\s*(TITLE|URL|QUALITY|TYPE|SUMMARY):', re.MULTILINE)
+
+# validation rules for extracted fields, built once rather than per answer
+# common false positives to filter
+FALSE_POSITIVES = frozenset({
+    'collection', 'post', 'tweet', 'video', 'file', 'link', 'content',
+    'archive', 'folder', 'directory', 'drive', 'share', 'upload',
+    'document', 'library', 'backup', 'storage', 'media', 'resource'
+})
+URL_HOST_HINTS = ('gofile', 'transfer', 'mega', 'drive.google', 'dropbox', 'cloud')
+QUALITY_HINTS = ('p', 'k', 'remux', 'webrip', 'dvdrip', 'bdrip', 'vhs')
+VALID_TYPES = ('movie', 'tv', 'documentary', 'series', 'film', 'show', 'miniseries', 'special')
+# common patterns for person names
+PERSON_NAME_PATTERNS = [
+    re.compile(r"^[A-Z][a-z]+\s+[A-Z][a-z]+$"),  # First Last
+    re.compile(r"^[A-Z]\.\s+[A-Z][a-z]+$"),      # Initial Last
+    re.compile(r"'s\s+"),                          # Possessive (like "John's Collection")
+    re.compile(r"^(Dr|Mr|Mrs|Ms|Prof|Sir)\s+"),   # Titles
+]
+
+# ollama structured output schema for --json-mode
+EXTRACTION_FIELDS = {
+    "titles": {"type": "array", "items": {"type": "string"}},
+    "urls": {"type": "array", "items": {"type": "string"}},
+    "quality": {"type": "array", "items": {"type": "string"}},
+    "type": {"type": "array", "items": {"type": "string"}},
+    "summary": {"type": "string"},
+}
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": EXTRACTION_FIELDS,
+    "required": list(EXTRACTION_FIELDS),
+}
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, **EXTRACTION_FIELDS},
+                "required": ["id", *EXTRACTION_FIELDS],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+# prompt templates. everything before the tweet is fixed text, keep it that
+# way: ollama only reuses its cached context for an identical prompt prefix
+REASONING_INSTRUCTIONS = """Extract information from the tweet at the end. Show your reasoning step by step.
+
+INSTRUCTIONS:
+1. IGNORE the author name - it's NOT a movie/TV title
+2. Look for ACTUAL titles in the MAIN TWEET TEXT section
+3. Extract ONLY from the text content, not metadata
+
+EXAMPLES:
+- If text says "Game of Thrones S01 1080p" → Title: Game of Thrones
+- If text says "Director John Smith's Collection" → NO title (it's a person)
+- If text says "Breaking Bad Complete Series" → Title: Breaking Bad
+
+First, identify what the tweet is about:
+[Your reasoning]
+
+Then provide:
+TITLE: [the actual movie/TV show title, NOT the author]
+URL: [file sharing URL if present]
+QUALITY: [video quality like 1080p, 4K, etc]
+TYPE: [Movie/TV Series/Documentary/etc]
+SUMMARY: [one sentence description]
+
+If a field is not found or not applicable, skip it.
+
+TWEET:
+"""
+REASONING_SUFFIX = """
+
+NOW EXTRACT from the tweet above."""
+
+DIRECT_INSTRUCTIONS = """Extract structured information from the tweet at the end.
+
+CRITICAL: Ignore the author name - extract ONLY movie/TV titles from the MAIN TWEET TEXT section.
+
+Extract and provide (skip if not found):
+TITLE: [movie/TV show name ONLY - not author]
+URL: [file sharing URL]
+QUALITY: [video quality/format]
+TYPE: [Movie/TV/Documentary/etc]
+SUMMARY: [one line description]
+
+TWEET:
+"""
+
+JSON_INSTRUCTIONS = """Extract structured information from the tweet at the end.
+
+CRITICAL: Ignore the author name - extract ONLY movie/TV titles from the MAIN TWEET TEXT section.
+
+Answer in JSON with these keys (empty list or "" if not found):
+"titles": [movie/TV show names ONLY - not author]
+"urls": [file sharing URLs]
+"quality": [video quality/format]
+"type": [Movie/TV/Documentary/etc]
+"summary": one line description
+
+TWEET:
+"""
+
+BATCH_INSTRUCTIONS = """Extract structured information from each of the tweets below.
+
+CRITICAL: Ignore the author names - extract ONLY movie/TV titles from each MAIN TWEET TEXT section.
+
+For EVERY tweet, answer with its marker line followed by its fields (skip a field if not found):
+=== TWEET <id> ===
+TITLE: [movie/TV show name ONLY - not author]
+URL: [file sharing URL]
+QUALITY: [video quality/format]
+TYPE: [Movie/TV/Documentary/etc]
+SUMMARY: [one line description]
+
+Keep the tweets in the order given and use the ids exactly as written.
+
+"""
+
+BATCH_JSON_INSTRUCTIONS = """Extract structured information from each of the tweets below.
+
+CRITICAL: Ignore the author names - extract ONLY movie/TV titles from each MAIN TWEET TEXT section.
+
+Answer in JSON: {"results": [...]} with one object per tweet, in the order given, each with
+"id" (the tweet id exactly as written), "titles" (movie/TV show names ONLY - not authors),
+"urls" (file sharing URLs), "quality" (video quality/format), "type" (Movie/TV/Documentary/etc)
+and "summary" (one line description). Use empty lists or "" for anything not found.
+
+"""
+
+# --compact-prompt versions: no author line to warn about, one line per field
+COMPACT_DIRECT_INSTRUCTIONS = """Extract from the tweet at the end, skip fields not found. Titles are movie/TV names, never people.
+TITLE: name
+URL: file sharing url
+QUALITY: video quality/format
+TYPE: Movie/TV/Documentary/etc
+SUMMARY: one line
+
+"""
+
+COMPACT_JSON_INSTRUCTIONS = """Extract from the tweet at the end as JSON: "titles" (movie/TV names, never people), "urls" (file sharing), "quality" (video quality/format), "type" (Movie/TV/Documentary/etc), "summary" (one line). Empty list or "" if not found.
+
+"""
+
+COMPACT_BATCH_INSTRUCTIONS = """Extract from each tweet below, skip fields not found. Titles are movie/TV names, never people.
+Answer every tweet, in order, as its marker line then its fields:
+=== TWEET <id> ===
+TITLE: name
+URL: file sharing url
+QUALITY: video quality/format
+TYPE: Movie/TV/Documentary/etc
+SUMMARY: one line
+
+"""
+
+COMPACT_BATCH_JSON_INSTRUCTIONS = """Extract from each tweet below as JSON {"results": [...]}, one object per tweet in order: "id" (exactly as written), "titles" (movie/TV names, never people), "urls" (file sharing), "quality" (video quality/format), "type" (Movie/TV/Documentary/etc), "summary" (one line). Empty list or "" if not found.
+
+"""
+
+# what a tweet gets when the run's deadline came before its request could go out
+BUDGET_EXHAUSTED = "run budget exhausted"
+
+class RetryableError(Exception):
+    """transient failure of one attempt; error is what ends up in the output"""
+    
+    def __init__(self, error: str, message: str):
+        super().__init__(message)
+        self.error = error
+
+class UnparsableResponse(RetryableError):
+    """the server answered fine but the model's answer didn't parse, worth an immediate retry"""
+
 class BookmarkAIProcessor:
+    # bump whenever the prompt templates change, it invalidates cached extractions
+    PROMPT_VERSION = 2
+    # tweets longer than this (text + quoted text) always get a prompt of their own
+    BATCH_MAX_CHARS = 600
+    
     def __init__(self, model: str = "mistral", ollama_url: str = "http://localhost:11434", 
-                 timeout: int = 180, debug: bool = False, show_reasoning: bool = False):
+                 timeout: int = 180, debug: bool = False, show_reasoning: bool = False,
+                 pretty: bool = False, concurrency: int = 1, pool_size: int = None,
+                 cache: ExtractionCache = None, rules: RuleExtractor = None,
+                 batch_size: int = 1, json_mode: bool = False, stream: bool = False,
+                 keep_alive: str = None, warm_up: bool = False, retry: RetryPolicy = None,
+                 dedup: NearDuplicateFinder = None, priority: TweetFilter = None,
+                 compact: PromptCompactor = None):
         self.model = model
-        self.ollama_url = ollama_url
-        self.api_endpoint = f"{ollama_url}/api/generate"
-        self.tags_endpoint = f"{ollama_url}/api/tags"
+        # one url, or several ollama servers to spread the work over
+        urls = [ollama_url] if isinstance(ollama_url, str) else list(ollama_url)
+        self.ollama_url = ', '.join(urls)
         self.timeout = timeout
         self.max_retries = 3
+        # attempts, backoff, adaptive timeouts, run budget and circuit breaker
+        self.retry = retry or RetryPolicy(max_attempts=self.max_retries, timeout=timeout)
         self.debug = debug
         self.show_reasoning = show_reasoning
+        # indented output is opt-in, compact is much faster to write and load
+        self.pretty = pretty
+        # number of extractions in flight, match OLLAMA_NUM_PARALLEL on the server
+        self.concurrency = max(1, concurrency)
+        self._print_lock = threading.Lock()
+        
+        # one keep-alive connection per worker unless told otherwise
+        if len(urls) > 1:
+            self.client = OllamaRouter(urls, pool_size or self.concurrency)
+        else:
+            self.client = OllamaClient(urls[0], pool_size or self.concurrency)
+        # client and server timings of every generate call, see src/telemetry.py
+        self.telemetry = Telemetry()
+        # time the current worker's batch sat in the pool queue, see _timed_extract
+        self._local = threading.local()
+        # disk cache of model answers keyed by tweet content, None to always ask the model
+        self.cache = cache
+        # deterministic tier for formulaic tweets, None to send everything to the model
+        self.rules = rules
+        self.rule_hits = 0
+        # tweets answered from the rules' gazetteer of known titles
+        self.known_title_hits = 0
+        self._stats_lock = threading.Lock()
+        # short tweets packed into one prompt, the reasoning prompt is too long to share
+        self.batch_size = 1 if show_reasoning else max(1, batch_size)
+        self.batch_fallbacks = 0
+        # ask for schema-constrained json instead of TITLE:/URL: lines, not with reasoning
+        self.json_mode = json_mode and not show_reasoning
+        # read single-tweet answers token by token and hang up once every field is in
+        self.stream = stream
+        # how long ollama keeps the model loaded after each request ("30m", "-1" = forever),
+        # None leaves the server default
+        if isinstance(keep_alive, str) and keep_alive.lstrip('-').isdigit():
+            # bare numbers are seconds and have to go out as json numbers
+            keep_alive = int(keep_alive)
+        self.keep_alive = keep_alive
+        # load the model in the background while the input is read
+        self.warm_up = warm_up
+        self.warm_up_s = None
+        # reposts of one post are extracted once, None to send every tweet
+        self.dedup = dedup
+        self.near_duplicates = 0
+        # most promising tweets first by TweetFilter score, None for file order
+        self.priority = priority
+        # shorter prompts (no author, no tracking parameters, no repeats), None for the full ones
+        self.compact = compact
         
-        self.check_connection()
-        self.check_model_loaded()
+        # a single /api/tags probe covers both checks
+        models = self.check_connection()
+        self.check_model_loaded(models)
     
-    def check_connection(self):
-        """verify ollama is running"""
+    @property
+    def request_timings(self) -> List[Dict[str, Any]]:
+        return self.telemetry.records
+    
+    @property
+    def prompt_variant(self) -> str:
+        if self.json_mode:
+            variant = "json"
+        else:
+            variant = "reasoning" if self.show_reasoning else "direct"
+        return variant + "-compact" if self.compact is not None else variant
+    
+    def check_connection(self) -> List[str]:
+        """verify ollama is running, returns the available models from the same probe"""
         try:
             print(f"Checking connection to Ollama at {self.ollama_url}...")
-            response = requests.get(self.tags_endpoint, timeout=5)
+            status, models = self.client.probe(timeout=5)
             
-            if response.status_code == 200:
+            if status == 200:
                 print(f"✓ Connected to Ollama")
+                if isinstance(self.client, OllamaRouter):
+                    for endpoint in self.client.stats():
+                        mark = "✓" if endpoint['healthy'] else "✗ unreachable, retried later:"
+                        print(f"  {mark} {endpoint['url']}")
+                return models
             else:
-                print(f"✗ Ollama returned status {response.status_code}")
+                print(f"✗ Ollama returned status {status}")
                 sys.exit(1)
         except requests.exceptions.ConnectionError:
             print(f"✗ Cannot connect to Ollama at {self.ollama_url}")
@@ -44,30 +325,95 @@ class BookmarkAIProcessor:
             print(f"✗ Error: {e}")
             sys.exit(1)
     
-    def check_model_loaded(self):
-        """check if model is available"""
-        try:
-            print(f"Checking if model '{self.model}' is loaded...")
-            response = requests.get(self.tags_endpoint, timeout=5)
-            data = response.json()
-            
-            models = [m['name'].split(':')[0] for m in data.get('models', [])]
-            
-            if self.model in models:
-                print(f"✓ Model '{self.model}' is available\n")
-            else:
-                print(f"✗ Model '{self.model}' not found")
-                print(f"Available models: {', '.join(models)}")
-                print(f"To download: ollama pull {self.model}")
-                sys.exit(1)
-        except Exception as e:
-            print(f"Warning: Could not verify model: {e}\n")
+    def check_model_loaded(self, models: List[str]):
+        """check if model is available in the probed model list"""
+        if self.model in models:
+            print(f"✓ Model '{self.model}' is available\n")
+        else:
+            print(f"✗ Model '{self.model}' not found")
+            print(f"Available models: {', '.join(models)}")
+            print(f"To download: ollama pull {self.model}")
+            sys.exit(1)
     
-    def extract_from_tweet(self, tweet: Dict[str, str], attempt: int = 1) -> Dict[str, Any]:
-        """use local AI to extract movie/tv info from tweet"""
+    def extract_from_tweet(self, tweet: Dict[str, str]) -> Dict[str, Any]:
+        """extract movie/tv info from tweet, rules first, then cached or fresh model answers"""
+        extracted = self._extract_without_llm(tweet)
+        if extracted is not None:
+            return extracted
         
-        # combine all text - be explicit about sources
-        full_text = f"""AUTHOR (SKIP THIS): {tweet.get('author', 'Unknown')}
+        extracted = self._extract_with_llm(tweet)
+        self._store(tweet, extracted)
+        return extracted
+    
+    def extract_batch(self, tweets: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """extract a group of tweets, short ones sharing a single prompt
+        
+        anything the batch answer doesn't cover cleanly is asked again on its own.
+        """
+        if len(tweets) == 1:
+            return [self.extract_from_tweet(tweets[0])]
+        
+        results = [self._extract_without_llm(tweet) for tweet in tweets]
+        pending = [i for i, r in enumerate(results) if r is None]
+        batchable = [i for i in pending if self._tweet_chars(tweets[i]) <= self.BATCH_MAX_CHARS]
+        
+        if len(batchable) > 1:
+            answers = self._extract_batch_with_llm([tweets[i] for i in batchable])
+            for i in batchable:
+                extracted = answers.get(str(tweets[i].get('id')))
+                if extracted is not None:
+                    results[i] = extracted
+                    self._store(tweets[i], extracted)
+        
+        for i in pending:
+            if results[i] is None:
+                results[i] = self._extract_with_llm(tweets[i])
+                self._store(tweets[i], results[i])
+        return results
+    
+    def _extract_without_llm(self, tweet: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """rule or cache answer for a tweet, None when the model has to be asked"""
+        if self.rules is not None:
+            extracted = self.rules.extract(tweet)
+            if extracted and self._accept_title(extracted["titles"][0], tweet.get('author', '')):
+                with self._stats_lock:
+                    self.rule_hits += 1
+                self._progress("  (rules)", end='')
+                return extracted
+        
+        if self.cache is not None:
+            cached = self.cache.get(self._cache_key(tweet))
+            if cached is not None:
+                self._progress("  (cached)", end='')
+                return cached
+        
+        # a title resolved before (wikidata, earlier extractions), found offline
+        if self.rules is not None:
+            extracted = self.rules.extract_known(tweet)
+            if extracted and self._accept_title(extracted["titles"][0], tweet.get('author', '')):
+                with self._stats_lock:
+                    self.known_title_hits += 1
+                self._progress("  (known title)", end='')
+                return extracted
+        return None
+    
+    def _store(self, tweet: Dict[str, str], extracted: Dict[str, Any]):
+        # errors are never cached, a rerun should try them again
+        if self.cache is not None and not extracted.get("error"):
+            self.cache.put(self._cache_key(tweet), extracted, model=self.model, variant=self.prompt_variant)
+    
+    def _cache_key(self, tweet: Dict[str, str]) -> str:
+        # the batch prompt asks for the same fields as the direct one, they share entries
+        return content_key(tweet, self.model, self.prompt_variant, self.PROMPT_VERSION)
+    
+    def _tweet_chars(self, tweet: Dict[str, str]) -> int:
+        return len(tweet.get('text') or '') + len(tweet.get('quoted_text') or '')
+    
+    def _tweet_block(self, tweet: Dict[str, str], compact: bool = False) -> str:
+        """tweet text for the prompt, explicit about where each part comes from"""
+        if compact:
+            return self.compact.block(tweet)
+        return f"""AUTHOR (SKIP THIS): {tweet.get('author', 'Unknown')}
 
 MAIN TWEET TEXT:
 {tweet.get('text', '')}
@@ -77,106 +423,295 @@ QUOTED TWEET TEXT:
 
 URLS IN TWEET:
 {', '.join(tweet.get('links', []) + tweet.get('quoted_links', [])) if (tweet.get('links') or tweet.get('quoted_links')) else 'None'}"""
+    
+    def _extract_batch_with_llm(self, tweets: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """one model call for several tweets, returns extractions by tweet id
+        
+        ids missing from the answer, or whose section has no fields, are left
+        out so the caller can retry them one by one.
+        """
+        ids = [str(t.get('id')) for t in tweets]
+        prompt = self._batch_prompt(tweets)
+        if self.compact is not None:
+            prompt, full = self._batch_prompt(tweets, compact=True), prompt
+            self.compact.record(full, prompt)
+        
+        try:
+            self.retry.acquire()
+        except BudgetExhausted:
+            return {}
+        # batches take longer than the single-tweet latencies the adaptive timeout follows
+        remaining = self.retry.remaining()
+        timeout = self.timeout if remaining is None else min(self.timeout, remaining)
         
-        # improved prompt with examples and chain of thought
+        try:
+            self._progress(f"  Extracting batch of {len(tweets)}...", end='')
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "temperature": 0.2,
+                "num_predict": 150 * len(tweets)
+            }
+            self._add_keep_alive(payload)
+            if self.json_mode:
+                payload["format"] = BATCH_SCHEMA
+            record = {
+                "tweet_id": ",".join(ids),
+                "batch": len(tweets),
+                "attempt": 1,
+                "timeout_s": timeout,
+                "queue_s": self._take_queue_wait(),
+            }
+            started = time.perf_counter()
+            try:
+                response, timings = self.client.generate(payload, timeout=timeout)
+            except requests.exceptions.RequestException as e:
+                self.telemetry.record({**record, "status": None, "error": type(e).__name__,
+                                       "http_s": time.perf_counter() - started})
+                raise
+            record.update(status=response.status_code, **timings)
+            if response.status_code != 200:
+                self.telemetry.record(record)
+                self._progress(f" ✗ Error {response.status_code}, falling back to single tweets")
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.retry.record_failure()
+                else:
+                    # a 4xx is about the request, not the server's health
+                    self.retry.release()
+                answers = {}
+            else:
+                self.retry.record_success()
+                result = response.json()
+                self.telemetry.record({**record, **ollama_timings(result)})
+                raw_response = result['response']
+                if self.debug:
+                    print(f"\nRAW BATCH RESPONSE:\n{raw_response}\n")
+                answers = self._parse_batch(raw_response, tweets)
+                self._progress(f" ✓ ({timings['http_s']:.1f}s, {len(answers)}/{len(tweets)} parsed)")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            self.retry.record_failure()
+            reason = f"Timeout ({timeout:.0f}s)" if isinstance(e, requests.exceptions.Timeout) else f"Error: {e}"
+            self._progress(f" ✗ {reason}, falling back to single tweets")
+            answers = {}
+        except Exception as e:
+            self.retry.release()
+            self._progress(f" ✗ Error: {e}, falling back to single tweets")
+            answers = {}
+        
+        missed = len(tweets) - len(answers)
+        if missed:
+            with self._stats_lock:
+                self.batch_fallbacks += missed
+        return answers
+    
+    def _parse_batch(self, response: str, tweets: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """split a batched answer on its markers and parse each section like a single answer"""
+        authors = {str(t.get('id')): t.get('author', '') for t in tweets}
+        if self.json_mode:
+            return self._parse_json_batch(response, authors)
+        
+        markers = list(BATCH_MARKER_RE.finditer(response))
+        
+        answers = {}
+        for n, marker in enumerate(markers):
+            tweet_id = marker.group(1).strip('[]<>#:')
+            # unknown or repeated ids mean the model lost track, don't guess
+            if tweet_id not in authors or tweet_id in answers:
+                continue
+            end = markers[n + 1].start() if n + 1 < len(markers) else len(response)
+            section = response[marker.end():end].strip()
+            if not FIELD_LINE_RE.search(section):
+                continue
+            answers[tweet_id] = self._parse_extraction(section, authors[tweet_id])
+        return answers
+    
+    def _parse_json_batch(self, response: str, authors: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """map the results array of a json batch answer back to tweet ids"""
+        try:
+            data = serializer.loads(response)
+        except ValueError:
+            return {}
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list):
+            return {}
+        
+        answers = {}
+        for item in results:
+            if not isinstance(item, dict):
+                continue
+            tweet_id = str(item.get("id", ""))
+            if tweet_id not in authors or tweet_id in answers:
+                continue
+            answers[tweet_id] = self._validate_fields(item, authors[tweet_id], response)
+        return answers
+    
+    def _prompt(self, tweet: Dict[str, str], compact: bool = False) -> str:
+        # combine all text - be explicit about sources
+        full_text = self._tweet_block(tweet, compact)
+        
+        # the instruction block is an identical prefix for every tweet and the
+        # tweet comes last, so ollama can reuse the cached prefix between calls
         if self.show_reasoning:
-            prompt = f"""Extract information from this tweet. Show your reasoning step by step.
-
-{full_text}
-
-INSTRUCTIONS:
-1. IGNORE the author name - it's NOT a movie/TV title
-2. Look for ACTUAL titles in the MAIN TWEET TEXT section
-3. Extract ONLY from the text content, not metadata
-
-EXAMPLES:
-- If text says "Game of Thrones S01 1080p" → Title: Game of Thrones
-- If text says "Director John Smith's Collection" → NO title (it's a person)
-- If text says "Breaking Bad Complete Series" → Title: Breaking Bad
-
-NOW EXTRACT from the tweet above.
-
-First, identify what this tweet is about:
-[Your reasoning]
-
-Then provide:
-TITLE: [the actual movie/TV show title, NOT the author]
-URL: [file sharing URL if present]
-QUALITY: [video quality like 1080p, 4K, etc]
-TYPE: [Movie/TV Series/Documentary/etc]
-SUMMARY: [one sentence description]
-
-If a field is not found or not applicable, skip it."""
+            # improved prompt with examples and chain of thought, kept in full
+            return REASONING_INSTRUCTIONS + full_text + REASONING_SUFFIX
+        if self.json_mode:
+            return (COMPACT_JSON_INSTRUCTIONS if compact else JSON_INSTRUCTIONS) + full_text
+        return (COMPACT_DIRECT_INSTRUCTIONS if compact else DIRECT_INSTRUCTIONS) + full_text
+    
+    def _batch_prompt(self, tweets: List[Dict[str, str]], compact: bool = False) -> str:
+        blocks = "\n\n".join(f"=== TWEET {tweet.get('id')} ===\n{self._tweet_block(tweet, compact)}"
+                             for tweet in tweets)
+        
+        # fixed instructions first and tweets last, so every batch shares the prefix
+        if self.json_mode:
+            instructions = COMPACT_BATCH_JSON_INSTRUCTIONS if compact else BATCH_JSON_INSTRUCTIONS
         else:
-            prompt = f"""Extract structured information from this tweet.
-
-{full_text}
-
-CRITICAL: Ignore the author name - extract ONLY movie/TV titles from the MAIN TWEET TEXT section.
+            instructions = COMPACT_BATCH_INSTRUCTIONS if compact else BATCH_INSTRUCTIONS
+        return instructions + blocks
+    
+    def _extract_with_llm(self, tweet: Dict[str, str]) -> Dict[str, Any]:
+        """use local AI to extract movie/tv info from tweet"""
+        
+        prompt = self._prompt(tweet)
+        if self.compact is not None:
+            prompt, full = self._prompt(tweet, compact=True), prompt
+            self.compact.record(full, prompt)
 
-Extract and provide (skip if not found):
-TITLE: [movie/TV show name ONLY - not author]
-URL: [file sharing URL]
-QUALITY: [video quality/format]
-TYPE: [Movie/TV/Documentary/etc]
-SUMMARY: [one line description]"""
+        if self.debug:
+            print(f"\n{'='*60}")
+            print(f"DEBUG: Tweet ID {tweet.get('id')}")
+            print(f"Author: {tweet.get('author')}")
+            print(f"Text preview: {tweet.get('text')[:100]}...")
+            print(f"{'='*60}")
         
-        try:
-            if self.debug:
-                print(f"\n{'='*60}")
-                print(f"DEBUG: Tweet ID {tweet.get('id')}")
-                print(f"Author: {tweet.get('author')}")
-                print(f"Text preview: {tweet.get('text')[:100]}...")
-                print(f"{'='*60}")
-            
-            print(f"  Extracting... (attempt {attempt}/{self.max_retries})", end='', flush=True)
-            
-            start = time.time()
-            response = requests.post(
-                self.api_endpoint,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.2,  # lower for more consistent extraction
-                    "num_predict": 150
-                },
-                timeout=self.timeout
-            )
-            elapsed = time.time() - start
+        error = None
+        timeouts = 0
+        for attempt in range(1, self.retry.max_attempts + 1):
+            try:
+                # waits here while the circuit breaker has dispatch paused
+                self.retry.acquire()
+            except BudgetExhausted:
+                self._progress(f" ✗ Run budget exhausted")
+                return {"error": BUDGET_EXHAUSTED}
             
-            if response.status_code != 200:
-                print(f" ✗ Error {response.status_code}")
-                if attempt < self.max_retries:
-                    print(f"  Retrying...")
-                    time.sleep(5)
-                    return self.extract_from_tweet(tweet, attempt + 1)
-                return {"error": f"API error {response.status_code}"}
+            # a request that timed out gets longer on its next attempt
+            timeout = self.retry.timeout(timeouts)
+            self._progress(f"  Extracting... (attempt {attempt}/{self.retry.max_attempts})", end='')
+            try:
+                extracted, elapsed = self._request_extraction(tweet, prompt, attempt, timeout)
+            except UnparsableResponse as e:
+                # the server is fine, ask again right away
+                error = e.error
+                self._progress(f" ✗ {e}")
+                self.retry.release()
+                continue
+            except RetryableError as e:
+                if e.error == "timeout" and self.retry.exhausted():
+                    # its timeout was what was left of the budget, the server isn't to blame
+                    self._progress(f" ✗ Run budget exhausted")
+                    return {"error": BUDGET_EXHAUSTED}
+                error = e.error
+                if error == "timeout":
+                    timeouts += 1
+                self._progress(f" ✗ {e}")
+                if self.retry.record_failure():
+                    self._log(f"⚠️  Ollama looks down or overloaded, pausing requests for "
+                              f"{self.retry.breaker.cooldown:.0f}s")
+                delay = self.retry.backoff(attempt) if attempt < self.retry.max_attempts else None
+                if delay is None:
+                    break
+                self._progress(f"  Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            except Exception as e:
+                # the server answered, just not usefully, another attempt won't help
+                self.retry.release()
+                self._progress(f" ✗ Error: {e}")
+                return {"error": str(e)}
             
+            self.retry.record_success(elapsed)
+            return extracted
+        
+        return {"error": error}
+    
+    def _request_extraction(self, tweet: Dict[str, str], prompt: str, attempt: int,
+                            timeout: float) -> tuple:
+        """one generate call, (extraction, seconds), RetryableError on transient failures"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": self.stream,
+            "temperature": 0.2,  # lower for more consistent extraction
+            "num_predict": 150
+        }
+        self._add_keep_alive(payload)
+        if self.json_mode:
+            # ollama constrains decoding to the schema
+            payload["format"] = EXTRACTION_SCHEMA
+        
+        record = {
+            "tweet_id": tweet.get('id'),
+            "attempt": attempt,
+            "timeout_s": timeout,
+            "queue_s": self._take_queue_wait(),
+        }
+        started = time.perf_counter()
+        try:
+            response, timings = self.client.generate(payload, timeout=timeout, stream=self.stream)
+            if self.stream and response.status_code == 200:
+                # json answers end with their closing brace, only line answers can ramble on
+                raw_response, stream_timings = read_generate_stream(
+                    response, started, early_stop=not self.json_mode)
+                timings.update(stream_timings)
+        except requests.exceptions.Timeout:
+            self.telemetry.record({**record, "status": None, "error": "timeout",
+                                   "http_s": time.perf_counter() - started})
+            raise RetryableError("timeout", f"Timeout ({timeout:.0f}s)")
+        except requests.exceptions.ConnectionError as e:
+            self.telemetry.record({**record, "status": None, "error": "connection error",
+                                   "http_s": time.perf_counter() - started})
+            raise RetryableError("connection error", f"Connection error: {e}")
+        
+        elapsed = timings.get('complete_s', timings['http_s'])
+        record.update(status=response.status_code, **timings)
+        
+        if response.status_code != 200:
+            self.telemetry.record(record)
+            response.close()
+            # overloaded or broken server, worth another go; 4xx won't change
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableError(f"API error {response.status_code}", f"Error {response.status_code}")
+            raise RuntimeError(f"API error {response.status_code}")
+        
+        if not self.stream:
             result = response.json()
             raw_response = result['response']
-            
-            if self.debug or self.show_reasoning:
-                print(f"\nRAW MODEL RESPONSE:\n{raw_response}\n")
-            
+            record.update(ollama_timings(result))
+        self.telemetry.record(record)
+        
+        if self.debug or self.show_reasoning:
+            print(f"\nRAW MODEL RESPONSE:\n{raw_response}\n")
+        
+        if self.json_mode:
+            extracted = self._parse_json_extraction(raw_response, tweet.get('author', ''))
+            if extracted is None:
+                raise UnparsableResponse("unparsable response", "Unparsable JSON")
+        else:
             extracted = self._parse_extraction(raw_response, tweet.get('author', ''))
-            
-            if self.debug:
-                print(f"PARSED RESULT: {extracted}\n")
-            
-            print(f" ✓ ({elapsed:.1f}s)")
-            return extracted
-            
-        except requests.exceptions.Timeout:
-            print(f" ✗ Timeout ({self.timeout}s)")
-            if attempt < self.max_retries:
-                print(f"  Retrying...")
-                time.sleep(5)
-                return self.extract_from_tweet(tweet, attempt + 1)
-            return {"error": "timeout"}
-        except Exception as e:
-            print(f" ✗ Error: {e}")
-            return {"error": str(e)}
+        
+        if self.debug:
+            print(f"PARSED RESULT: {extracted}\n")
+        
+        details = [f"{elapsed:.1f}s"]
+        if self.stream and timings['ttft_s'] is not None:
+            details.insert(0, f"first token {timings['ttft_s']:.1f}s")
+        if self.stream and timings['early_stop']:
+            details.append("stopped early")
+        if not timings['reused']:
+            details.append(f"new connection {timings['connect_s']*1000:.0f}ms")
+        self._progress(f" ✓ ({', '.join(details)})")
+        return extracted, elapsed
     
     def _parse_extraction(self, response: str, author_name: str = "") -> Dict[str, Any]:
         """parse AI response with validation to avoid false positives"""
@@ -189,13 +724,6 @@ SUMMARY: [one line description]"""
             "raw_response": response
         }
         
-        # common false positives to filter
-        false_positives = {
-            'collection', 'post', 'tweet', 'video', 'file', 'link', 'content',
-            'archive', 'folder', 'directory', 'drive', 'share', 'upload',
-            'document', 'library', 'backup', 'storage', 'media', 'resource'
-        }
-        
         for line in response.split('\n'):
             line = line.strip()
             if not line:
@@ -205,133 +733,210 @@ SUMMARY: [one line description]"""
                 title = line.replace('TITLE:', '').strip()
                 
                 # validation: filter out author names and false positives
-                if (title and 
-                    len(title) > 2 and 
-                    title.lower() != 'none' and
-                    title.lower() != author_name.lower() and
-                    not any(fp in title.lower() for fp in false_positives) and
-                    not self._looks_like_person_name(title)):
-                    
+                if self._accept_title(title, author_name):
                     extracted["titles"].append(title)
                 elif self.debug:
                     print(f"  FILTERED TITLE: '{title}' (reason: likely false positive)")
             
             elif line.startswith('URL:'):
                 url = line.replace('URL:', '').strip()
-                if (url and 
-                    ('http' in url or any(domain in url for domain in 
-                     ['gofile', 'transfer', 'mega', 'drive.google', 'dropbox', 'cloud'])) and
-                    url.lower() != 'none' and
-                    len(url) > 10):
-                    
+                if self._accept_url(url):
                     extracted["urls"].append(url)
                 elif self.debug:
                     print(f"  FILTERED URL: '{url}'")
             
             elif line.startswith('QUALITY:'):
                 qual = line.replace('QUALITY:', '').strip()
-                # validate quality is reasonable
-                if (qual and 
-                    qual.lower() != 'none' and
-                    any(q in qual.lower() for q in ['p', 'k', 'remux', 'webrip', 'dvdrip', 'bdrip', 'vhs'])):
-                    
+                if self._accept_quality(qual):
                     extracted["quality"].append(qual)
             
             elif line.startswith('TYPE:'):
                 typ = line.replace('TYPE:', '').strip()
-                valid_types = ['movie', 'tv', 'documentary', 'series', 'film', 'show', 'miniseries', 'special']
-                
-                if (typ and 
-                    typ.lower() != 'none' and
-                    any(vt in typ.lower() for vt in valid_types)):
-                    
+                if self._accept_type(typ):
                     extracted["type"].append(typ)
             
             elif line.startswith('SUMMARY:'):
                 summary = line.replace('SUMMARY:', '').strip()
-                if summary and summary.lower() != 'none' and len(summary) > 5:
+                if self._accept_summary(summary):
                     extracted["summary"] = summary
         
         return extracted
     
+    def _parse_json_extraction(self, response: str, author_name: str = "") -> Optional[Dict[str, Any]]:
+        """parse a json-mode answer, None if it isn't an object at all"""
+        try:
+            data = serializer.loads(response)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        return self._validate_fields(data, author_name, response)
+    
+    def _validate_fields(self, data: Dict[str, Any], author_name: str, response: str) -> Dict[str, Any]:
+        """apply the same checks as the line parser to json fields"""
+        titles = self._string_list(data.get("titles"))
+        for title in titles:
+            if self.debug and not self._accept_title(title, author_name):
+                print(f"  FILTERED TITLE: '{title}' (reason: likely false positive)")
+        
+        summary = data.get("summary")
+        summary = summary.strip() if isinstance(summary, str) else ""
+        
+        return {
+            "titles": [t for t in titles if self._accept_title(t, author_name)],
+            "urls": [u for u in self._string_list(data.get("urls")) if self._accept_url(u)],
+            "quality": [q for q in self._string_list(data.get("quality")) if self._accept_quality(q)],
+            "type": [t for t in self._string_list(data.get("type")) if self._accept_type(t)],
+            "summary": summary if self._accept_summary(summary) else "",
+            "raw_response": response
+        }
+    
+    def _string_list(self, value: Any) -> List[str]:
+        # models sometimes answer a bare string where the schema says list
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            return []
+        return [v.strip() for v in value if isinstance(v, str) and v.strip()]
+    
+    def _accept_title(self, title: str, author_name: str = "") -> bool:
+        """reject author names, generic words and person names posing as titles"""
+        lower = title.lower() if title else ''
+        return bool(title and 
+                    len(title) > 2 and 
+                    lower != 'none' and
+                    lower != author_name.lower() and
+                    not any(fp in lower for fp in FALSE_POSITIVES) and
+                    not self._looks_like_person_name(title))
+    
+    def _accept_url(self, url: str) -> bool:
+        return bool(url and 
+                    ('http' in url or any(domain in url for domain in URL_HOST_HINTS)) and
+                    url.lower() != 'none' and
+                    len(url) > 10)
+    
+    def _accept_quality(self, qual: str) -> bool:
+        # validate quality is reasonable
+        lower = qual.lower() if qual else ''
+        return bool(qual and lower != 'none' and any(q in lower for q in QUALITY_HINTS))
+    
+    def _accept_type(self, typ: str) -> bool:
+        lower = typ.lower() if typ else ''
+        return bool(typ and lower != 'none' and any(vt in lower for vt in VALID_TYPES))
+    
+    def _accept_summary(self, summary: str) -> bool:
+        return bool(summary and summary.lower() != 'none' and len(summary) > 5)
+    
     def _looks_like_person_name(self, text: str) -> bool:
         """heuristic to detect if text looks like a person name rather than title"""
-        # common patterns for person names
-        patterns = [
-            r"^[A-Z][a-z]+\s+[A-Z][a-z]+$",  # First Last
-            r"^[A-Z]\.\s+[A-Z][a-z]+$",      # Initial Last
-            r"'s\s+",                          # Possessive (like "John's Collection")
-            r"^(Dr|Mr|Mrs|Ms|Prof|Sir)\s+",   # Titles
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text):
-                return True
+        return any(pattern.match(text) for pattern in PERSON_NAME_PATTERNS)
+    
+    def _iter_tweets(self, json_file: str, ids: List[str] = None):
+        """tweets of a json export or a jsonl file as they are parsed, optionally only some ids"""
+        if ids and strip_codec_suffix(json_file).suffix == '.jsonl' and not codec_for(json_file):
+            # jump straight to the records through the offset index
+            with OffsetIndexReader(json_file) as reader:
+                yield from reader.get_many(ids)
+            return
         
-        return False
+        # .gz/.zst inputs are decompressed transparently, one chunk at a time
+        tweets = iter_tweets(json_file)
+        if ids:
+            wanted = set(ids)
+            tweets = (t for t in tweets if str(t.get('id')) in wanted)
+        yield from tweets
     
-    def process_bookmarks(self, json_file: str, output_file: str = None, limit: int = None):
+    def process_bookmarks(self, json_file: str, output_file: str = None, limit: int = None,
+                          ids: List[str] = None, resume: bool = False, journal_file: str = None,
+                          metrics_file: str = None):
         """process bookmark json file with AI"""
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if not output_file:
+            # keep the input's codec, e.g. x.json.zst -> x_processed_mistral.json.zst
+            stem = strip_codec_suffix(json_file).stem
+            suffix = Path(json_file).suffix if codec_for(json_file) else ''
+            output_file = f"{stem}_processed_{self.model}.json{suffix}"
+        
+        # every finished tweet is checkpointed here as it completes
+        journal = ExtractionJournal(journal_file or strip_codec_suffix(output_file).with_suffix('.journal.jsonl'))
+        # and every model request gets a line of timings here
+        self.telemetry.open(metrics_file or strip_codec_suffix(output_file).with_suffix('.metrics.jsonl'),
+                            resume=resume)
         
-        tweets = data.get('tweets', [])
-        print(f"\nProcessing {len(tweets)} tweets with {self.model}...")
+        # the model load overlaps with reading the input
+        warm_up = self._start_warm_up() if self.warm_up else None
+        
+        # parsed as they are processed, a --limit run never reads past its last tweet
+        tweets = self._iter_tweets(json_file, ids)
+        print(f"\nProcessing {json_file} with {self.model}...")
         print(f"Debug mode: {self.debug}")
-        print(f"Show reasoning: {self.show_reasoning}\n")
+        print(f"Show reasoning: {self.show_reasoning}")
+        print(f"Concurrency: {self.concurrency}")
+        print(f"Batch size: {self.batch_size}")
+        print(f"JSON mode: {self.json_mode}")
+        print(f"Keep alive: {self.keep_alive or 'server default'}\n")
+        
+        if resume:
+            # only successes are skipped, earlier errors get another try
+            done_ids = journal.done_ids()
+            tweets = (t for t in tweets if str(t.get('id')) not in done_ids)
+            print(f"Resuming from {journal.path}: {len(done_ids)} already done\n")
         
-        processed_tweets = []
-        errors = []
+        planned = None
+        if self.priority is not None:
+            # scoring needs every tweet, the queue then hands out the best first. the
+            # budget is already running, a long input spends part of it right here
+            queue = self._priority_queue(tweets)
+            planned = len(queue)
+            tweets = self._drain(queue)
+            print(f"Priority order: {planned} tweets queued by score\n")
+        
+        if limit:
+            tweets = islice(tweets, limit)
+            planned = min(planned, limit) if planned is not None else None
+            print(f"Limiting to first {limit} tweets\n")
+        
+        # near-duplicates wait here for their representative's result
+        duplicates: Dict[str, List[Dict]] = {}
+        if self.dedup is not None:
+            tweets = self._representatives(tweets, duplicates)
+            print("Near-duplicates: one extraction per cluster, grouped as tweets are read\n")
+        
+        if warm_up is not None:
+            # wait for the load only once the first chunk of input has been read
+            tweets = self._after_warm_up(tweets, warm_up)
+        
+        journal.open(resume=resume)
         start_time = time.time()
+        deadline_reached = False
+        handled = 0
         
-        for idx, tweet in enumerate(tweets):
-            if limit and idx >= limit:
-                print(f"\nReached limit of {limit} tweets")
-                break
-            
-            try:
-                print(f"[{idx+1}/{min(len(tweets), limit or len(tweets))}] {tweet.get('id')}", end=' ')
-                
-                extraction = self.extract_from_tweet(tweet)
-                
+        try:
+            for tweet, extraction in self._with_duplicates(self._iter_extractions(tweets), duplicates):
+                if extraction.get("error") == BUDGET_EXHAUSTED:
+                    # out of time: stop here, what is left isn't an error and --resume picks it up
+                    deadline_reached = True
+                    break
+                handled += 1
                 if extraction.get("error"):
-                    errors.append({
+                    journal.record_error({
                         'tweet_id': tweet.get('id'),
                         'error': extraction['error']
                     })
-                    print(f"⚠️  {extraction['error']}")
                     continue
                 
-                processed_tweet = {
+                journal.record_tweet({
                     **tweet,
                     "ai_extraction": extraction
-                }
-                
-                processed_tweets.append(processed_tweet)
-                
-                # show results
-                if extraction.get("titles"):
-                    print(f"→ {extraction['titles'][0]}", end='')
-                if extraction.get("urls"):
-                    print(f" | URLs: {len(extraction['urls'])}", end='')
-                print()
-                
-            except KeyboardInterrupt:
-                print("\n\nInterrupted by user")
-                break
-            except Exception as e:
-                print(f"✗ Error: {e}")
-                errors.append({
-                    'tweet_id': tweet.get('id'),
-                    'error': str(e)
                 })
+        finally:
+            journal.close()
+            self.telemetry.close()
         
         elapsed = time.time() - start_time
         
-        if not output_file:
-            stem = Path(json_file).stem
-            output_file = f"{stem}_processed_{self.model}.json"
+        # the journal holds this run plus anything resumed from earlier runs
+        processed_tweets, errors = journal.load()
         
         output_data = {
             "model": self.model,
@@ -344,20 +949,379 @@ SUMMARY: [one line description]"""
             "errors": errors,
             "summary": self._create_summary(processed_tweets)
         }
+        if self.rules is not None:
+            output_data["rule_hits"] = self.rule_hits
+        if self.rules is not None and self.rules.gazetteer is not None:
+            output_data["known_title_hits"] = self.known_title_hits
+        if self.dedup is not None:
+            output_data["near_duplicates"] = self.near_duplicates
+        if self.batch_size > 1:
+            output_data["batch_fallbacks"] = self.batch_fallbacks
+        if self.cache is not None:
+            output_data["cache"] = self.cache.stats()
+        if self.stream:
+            output_data["streaming"] = self._stream_stats()
+        if self.compact is not None:
+            output_data["prompt_compaction"] = self.compact.stats()
+        if self.retry.deadline is not None:
+            output_data["budget"] = {
+                "deadline_reached": deadline_reached,
+                "handled": handled,
+                # only known when the whole input was queued by priority
+                "unprocessed": planned - handled if planned is not None else None,
+            }
+        output_data["retries"] = self.retry.stats()
+        output_data["telemetry"] = self._telemetry_summary()
+        if isinstance(self.client, OllamaRouter):
+            output_data["endpoints"] = self.client.stats()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with open_file(output_file, 'wb') as f:
+            serializer.dump(output_data, f, self.pretty)
         
         print(f"\n{'='*60}")
         print(f"✓ Processing complete!")
         print(f"  Processed: {len(processed_tweets)}")
         print(f"  Failed: {len(errors)}")
         print(f"  Time: {elapsed/60:.1f} minutes")
+        if self.rules is not None:
+            print(f"  Rules: {self.rule_hits} tweets extracted without the model")
+        if self.rules is not None and self.rules.gazetteer is not None:
+            print(f"  Known titles: {self.known_title_hits} tweets matched offline "
+                  f"({len(self.rules.gazetteer)} titles indexed)")
+        if deadline_reached:
+            left = output_data["budget"]["unprocessed"]
+            print(f"  Budget: deadline reached, {left if left is not None else 'remaining'} tweets "
+                  f"left for --resume")
+        if self.compact is not None:
+            stats = self.compact.stats()
+            if stats["prompts"]:
+                print(f"  Prompts: ~{stats['tokens_before'] / stats['prompts']:.0f} tokens before compaction, "
+                      f"~{stats['tokens_after'] / stats['prompts']:.0f} after ({stats['saved']:.0%} fewer)")
+        if self.dedup is not None:
+            print(f"  Near-duplicates: {self.near_duplicates} extractions copied from a representative")
+        if self.batch_size > 1:
+            print(f"  Batches: size {self.batch_size}, {self.batch_fallbacks} tweets retried on their own")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"  Cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%}), {stats['entries']} entries, "
+                  f"{stats['size_bytes']/1024/1024:.1f} MB")
+        retries = self.retry.stats()
+        if retries["failed_attempts"]:
+            print(f"  Retries: {retries['failed_attempts']} failed attempts, "
+                  f"circuit breaker tripped {retries['breaker_trips']} times")
+        if self.stream:
+            stats = self._stream_stats()
+            if stats["requests"]:
+                print(f"  Streaming: first token {stats['mean_ttft_s']:.2f}s, "
+                      f"complete {stats['mean_complete_s']:.2f}s on average, "
+                      f"{stats['early_stops']}/{stats['requests']} stopped early")
+        self._print_telemetry(output_data["telemetry"])
+        for endpoint in output_data.get("endpoints", []):
+            latency = f"{endpoint['latency_s']:.2f}s avg" if endpoint['latency_s'] is not None else "no answers"
+            print(f"  Endpoint {endpoint['url']}: {endpoint['requests']} requests, "
+                  f"{endpoint['failures']} failed, {endpoint['ejections']} ejections, {latency}")
         print(f"  Output: {output_file}")
+        print(f"  Journal: {journal.path}")
+        print(f"  Metrics: {self.telemetry.path}")
         print(f"{'='*60}\n")
         
         return processed_tweets
     
+    def _start_warm_up(self) -> List[threading.Thread]:
+        """send an empty prompt to every healthy server, ollama loads the model without generating"""
+        if isinstance(self.client, OllamaRouter):
+            clients = [e.client for e in self.client.endpoints if e.healthy]
+        else:
+            clients = [self.client]
+        
+        def run(client):
+            start = time.perf_counter()
+            payload = {"model": self.model, "prompt": "", "stream": False}
+            self._add_keep_alive(payload)
+            try:
+                response, _ = client.generate(payload, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                self._log(f"⚠️  Warm-up of {client.base_url} failed: {e}")
+                return
+            if response.status_code == 200:
+                # the slowest server decides when the run is warm
+                loaded_s = time.perf_counter() - start
+                with self._print_lock:
+                    self.warm_up_s = max(self.warm_up_s or 0.0, loaded_s)
+            else:
+                self._log(f"⚠️  Warm-up of {client.base_url} failed: status {response.status_code}")
+        
+        threads = [threading.Thread(target=run, args=(client,), name='warm-up', daemon=True)
+                   for client in clients]
+        for thread in threads:
+            thread.start()
+        return threads
+    
+    def _after_warm_up(self, tweets, warm_up: List[threading.Thread]):
+        """pass tweets through, joining the warm-up after the first one is read"""
+        waiting = True
+        for tweet in tweets:
+            if waiting:
+                waiting = False
+                for thread in warm_up:
+                    thread.join()
+                if self.warm_up_s is not None:
+                    print(f"✓ Model '{self.model}' loaded ({self.warm_up_s:.1f}s)\n")
+            yield tweet
+    
+    def _take_queue_wait(self) -> float:
+        queue_s = getattr(self._local, 'queue_s', 0.0)
+        self._local.queue_s = 0.0
+        return queue_s
+    
+    def _add_keep_alive(self, payload: Dict[str, Any]):
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+    
+    def _iter_extractions(self, tweets):
+        """yield (tweet, extraction) in input order, sequentially or through the worker pool
+        
+        tweets may be a lazy stream, it is only read as far as the work has got
+        """
+        # progress shows a total when it is known up front
+        total = len(tweets) if isinstance(tweets, list) else None
+        if self.concurrency > 1:
+            yield from self._iter_extractions_concurrent(tweets, total)
+            return
+        if self.batch_size > 1:
+            yield from self._iter_extractions_batched(tweets, total)
+            return
+        
+        for idx, tweet in enumerate(tweets):
+            try:
+                print(f"[{self._position(idx+1, total)}] {tweet.get('id')}", end=' ')
+                extraction = self.extract_from_tweet(tweet)
+            except KeyboardInterrupt:
+                print("\n\nInterrupted by user")
+                return
+            except Exception as e:
+                print(f"✗ Error: {e}")
+                extraction = {"error": str(e)}
+            else:
+                print(self._describe(extraction))
+            
+            yield tweet, extraction
+    
+    def _iter_extractions_batched(self, tweets, total: int = None):
+        """sequential run, batch_size tweets per model call"""
+        start = 0
+        for chunk in self._chunks(tweets):
+            try:
+                print(f"[{start+1}-{self._position(start+len(chunk), total)}]", end=' ')
+                extractions = self.extract_batch(chunk)
+            except KeyboardInterrupt:
+                print("\n\nInterrupted by user")
+                return
+            except Exception as e:
+                print(f"✗ Error: {e}")
+                extractions = [{"error": str(e)} for _ in chunk]
+            else:
+                print()
+            
+            for offset, (tweet, extraction) in enumerate(zip(chunk, extractions)):
+                print(f"  [{self._position(start+offset+1, total)}] {tweet.get('id')} {self._describe(extraction)}")
+                yield tweet, extraction
+            start += len(chunk)
+    
+    def _iter_extractions_concurrent(self, tweets, total: int = None):
+        """run extractions on a bounded thread pool, results reassembled in input order
+        
+        only a few batches per worker are read ahead of the oldest unfinished
+        one, so a streamed input is never held in full
+        """
+        chunks = self._chunks(tweets)
+        window = self.concurrency * 4
+        pending = {}  # future -> (position of its first tweet, batch)
+        results = {}  # position -> (batch, extractions), finished early
+        read = 0
+        next_start = 0
+        done = 0
+        # the first tweet the run deadline stopped, handed out after everything that did finish
+        exhausted = None
+        
+        # each worker takes a batch, a single tweet unless batching is on
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='extract')
+        
+        def submit():
+            nonlocal read
+            while exhausted is None and len(pending) + len(results) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                pending[pool.submit(self._timed_extract, chunk, time.perf_counter())] = (read, chunk)
+                read += len(chunk)
+        
+        try:
+            submit()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    start, chunk = pending.pop(future)
+                    try:
+                        extractions, elapsed = future.result()
+                    except Exception as e:
+                        extractions, elapsed = [{"error": str(e)}] * len(chunk), 0.0
+                    
+                    for tweet, extraction in zip(chunk, extractions):
+                        done += 1
+                        status = "✗" if extraction.get("error") else "✓"
+                        self._log(f"[{self._position(done, total)}] {tweet.get('id')} {status} ({elapsed:.1f}s) "
+                                  f"{self._describe(extraction)}")
+                    # hand results back in file order, holding early finishers
+                    results[start] = (chunk, extractions)
+                
+                while next_start in results:
+                    chunk, extractions = results.pop(next_start)
+                    for tweet, extraction in zip(chunk, extractions):
+                        if extraction.get("error") != BUDGET_EXHAUSTED:
+                            yield tweet, extraction
+                        elif exhausted is None:
+                            # stop reading, but keep what is still running or done out of order
+                            exhausted = (tweet, extraction)
+                    next_start += len(chunk)
+                submit()
+            if exhausted is not None:
+                yield exhausted
+        except KeyboardInterrupt:
+            self._log("\n\nInterrupted by user, waiting for running extractions...")
+            pool.shutdown(wait=True, cancel_futures=True)
+            # keep whatever finished, even out of order
+            for future, (start, chunk) in pending.items():
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    results[start] = (chunk, future.result()[0])
+            for start in sorted(results):
+                yield from zip(*results[start])
+            return
+        finally:
+            # also reached when the caller stops early, e.g. at the run deadline
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _chunks(self, tweets):
+        """batches of batch_size tweets, read lazily"""
+        tweets = iter(tweets)
+        while True:
+            chunk = list(islice(tweets, self.batch_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _position(self, n: int, total: int = None) -> str:
+        return f"{n}/{total}" if total else str(n)
+    
+    def _priority_queue(self, tweets) -> List[tuple]:
+        """heap of (-score, position, tweet), ties stay in file order"""
+        queue = [(-self.priority.score(tweet), idx, tweet) for idx, tweet in enumerate(tweets)]
+        heapq.heapify(queue)
+        return queue
+    
+    def _drain(self, queue: List[tuple]):
+        while queue:
+            yield heapq.heappop(queue)[2]
+    
+    def _representatives(self, tweets, duplicates: Dict[str, List[Dict]]):
+        """pass on the tweets that start a cluster, park the others under their representative's id"""
+        for tweet, head in self.dedup.stream(tweets):
+            if head is None:
+                yield tweet
+            else:
+                duplicates.setdefault(head, []).append(tweet)
+    
+    def _with_duplicates(self, results, duplicates: Dict[str, List[Dict]]):
+        """follow each representative's result with copies for the rest of its cluster
+
+        members read after their representative's result came out are copied
+        after the next one, or at the end. a failed extraction isn't copied,
+        the members get the error as their own.
+        """
+        finished = {}
+        for tweet, extraction in results:
+            yield tweet, extraction
+            finished[str(tweet.get('id'))] = (tweet.get('id'), extraction)
+            yield from self._copies(duplicates, finished)
+        yield from self._copies(duplicates, finished)
+    
+    def _copies(self, duplicates: Dict[str, List[Dict]], finished: Dict[str, tuple]):
+        for head in [head for head in duplicates if head in finished]:
+            head_id, extraction = finished[head]
+            for member in duplicates.pop(head):
+                if extraction.get("error"):
+                    yield member, {"error": extraction["error"]}
+                    continue
+                self.near_duplicates += 1
+                yield member, {**extraction, "duplicate_of": head_id}
+    
+    def _timed_extract(self, tweets: List[Dict], submitted: float) -> tuple:
+        # the first request of this batch reports how long it waited for a worker
+        self._local.queue_s = time.perf_counter() - submitted
+        start = time.time()
+        extractions = self.extract_batch(tweets)
+        return extractions, time.time() - start
+    
+    def _describe(self, extraction: Dict[str, Any]) -> str:
+        """one-line result for progress output"""
+        if extraction.get("error"):
+            return f"⚠️  {extraction['error']}"
+        parts = []
+        if extraction.get("titles"):
+            parts.append(f"→ {extraction['titles'][0]}")
+        if extraction.get("urls"):
+            parts.append(f"URLs: {len(extraction['urls'])}")
+        return " | ".join(parts)
+    
+    def _log(self, message: str):
+        """print a whole line without interleaving with other workers"""
+        with self._print_lock:
+            print(message, flush=True)
+    
+    def _progress(self, message: str, end: str = '\n'):
+        """inline per-attempt progress, only shown when running one at a time"""
+        if self.concurrency == 1:
+            print(message, end=end, flush=True)
+    
+    def _telemetry_summary(self) -> Dict[str, Any]:
+        summary = self.telemetry.summary()
+        summary["warm_up_s"] = self.warm_up_s
+        if self.cache is not None:
+            summary["cache_hit_rate"] = self.cache.stats()["hit_rate"]
+        return summary
+    
+    def _print_telemetry(self, summary: Dict[str, Any]):
+        """where the time went, as far as requests to the model are concerned"""
+        if not summary["requests"]:
+            return
+        print(f"  Requests: {summary['requests']} ({summary['failed_requests']} failed)")
+        latency = summary["latency_s"]
+        if latency:
+            print(f"  Latency: p50 {latency['p50']:.2f}s, p90 {latency['p90']:.2f}s, p99 {latency['p99']:.2f}s")
+        queue = summary["queue_s"]
+        if queue and queue["p90"] > 0:
+            print(f"  Queue wait: p50 {queue['p50']:.2f}s, p90 {queue['p90']:.2f}s")
+        if summary["generated_tokens_per_s"]:
+            print(f"  Throughput: {summary['prompt_tokens_per_s'] or 0:.0f} prompt tok/s, "
+                  f"{summary['generated_tokens_per_s']:.1f} generated tok/s")
+        if summary["prompt_share"] is not None:
+            print(f"  Model time: {summary['prompt_share']:.0%} reading prompts, "
+                  f"{1 - summary['prompt_share']:.0%} generating")
+        if summary["load_s_total"]:
+            print(f"  Model loads: {summary['load_s_total']:.1f}s")
+    
+    def _stream_stats(self) -> Dict[str, Any]:
+        """time-to-first-token and time-to-complete over the streamed requests"""
+        streamed = [t for t in self.request_timings if 'complete_s' in t]
+        ttfts = [t['ttft_s'] for t in streamed if t['ttft_s'] is not None]
+        return {
+            "requests": len(streamed),
+            "early_stops": sum(1 for t in streamed if t['early_stop']),
+            "mean_ttft_s": sum(ttfts) / len(ttfts) if ttfts else None,
+            "mean_complete_s": sum(t['complete_s'] for t in streamed) / len(streamed) if streamed else None,
+        }
+    
     def _create_summary(self, processed_tweets: List[Dict]) -> Dict[str, Any]:
         """create summary statistics"""
         all_titles = set()
@@ -384,26 +1348,125 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Process bookmarks with local AI')
-    parser.add_argument('json_file', help='Path to bookmark JSON file')
+    parser.add_argument('json_file', help='Path to bookmark JSON or JSONL file (.gz/.zst ok)')
     parser.add_argument('--model', default='mistral', help='Ollama model')
-    parser.add_argument('--output', help='Output file path')
+    parser.add_argument('--output', help='Output file path (.gz/.zst to compress)')
     parser.add_argument('--limit', type=int, help='Limit number of tweets')
-    parser.add_argument('--timeout', type=int, default=180, help='Timeout in seconds')
-    parser.add_argument('--url', default='http://localhost:11434', help='Ollama URL')
+    parser.add_argument('--timeout', type=int, default=180,
+                        help='Longest timeout in seconds, shortened once typical latency is known')
+    parser.add_argument('--min-timeout', type=int, default=15,
+                        help='Shortest timeout the adaptive timeout may pick, in seconds')
+    parser.add_argument('--budget-minutes', type=float,
+                        help='Stop after this many minutes with a partial output, most promising tweets first. '
+                             'Scoring reads the whole input before the first request, that time counts '
+                             'against the budget (use --file-order to start at once)')
+    parser.add_argument('--file-order', action='store_true',
+                        help='With --budget-minutes, keep file order instead of scoring tweets')
+    parser.add_argument('--url', action='append',
+                        help='Ollama URL, repeat to spread work over several servers '
+                             '(default: http://localhost:11434)')
     parser.add_argument('--debug', action='store_true', help='Show debug info and raw responses')
     parser.add_argument('--reasoning', action='store_true', help='Show model reasoning (slower but more accurate)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Extractions in flight at once (set to OLLAMA_NUM_PARALLEL)')
+    parser.add_argument('--json-mode', action='store_true',
+                        help='Ask for schema-constrained JSON instead of TITLE:/URL: lines (ignored with --reasoning)')
+    parser.add_argument('--keep-alive', default='30m',
+                        help='How long Ollama keeps the model loaded between requests (e.g. 30m, -1 for forever)')
+    parser.add_argument('--no-warm-up', action='store_true',
+                        help='Skip loading the model in the background while the input is read')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream answers and stop generation once every field is in (single-tweet prompts)')
+    parser.add_argument('--compact-prompt', action='store_true',
+                        help='Shorter prompts: no author line, no tracking parameters or repeated links')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Pack up to this many short tweets into one prompt (ignored with --reasoning)')
+    parser.add_argument('--pool-size', type=int,
+                        help='Keep-alive connections to Ollama (default: same as --concurrency)')
+    parser.add_argument('--cache-dir', default='cache/extractions',
+                        help='Where cached model extractions are kept')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                        help='Evict least recently used extractions beyond this size')
+    parser.add_argument('--no-rules', action='store_true',
+                        help='Send every tweet to the model, skip the rule-based tier')
+    parser.add_argument('--wikidata-cache', default='cache/wikidata/wikidata.sqlite3',
+                        help='Wikidata lookups of parse_bookmarks.py, known titles for the rule tier')
+    parser.add_argument('--no-gazetteer', action='store_true',
+                        help="Don't match tweets against titles known from wikidata and earlier extractions")
+    parser.add_argument('--dedup', action='store_true',
+                        help='Extract one tweet per cluster of near-duplicates (reposts, quote tweets) '
+                             'and copy the result to the others')
+    parser.add_argument('--no-cache', action='store_true', help='Always ask the model, ignore the cache')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip tweets already done in the journal of an earlier, interrupted run')
+    parser.add_argument('--metrics', help='Per-request timings file (default: <output>.metrics.jsonl)')
+    parser.add_argument('--journal', help='Checkpoint journal path (default: <output>.journal.jsonl)')
+    parser.add_argument('--pretty', action='store_true', help='Indent the output JSON for reading by hand')
+    parser.add_argument('--ids', help='Only process these tweet ids (comma separated)')
+    parser.add_argument('--retry-errors', metavar='PROCESSED_FILE',
+                        help='Only process tweets listed under errors in a previous output file')
     
     args = parser.parse_args()
     
+    ids = [i.strip() for i in args.ids.split(',') if i.strip()] if args.ids else []
+    if args.retry_errors:
+        with open_file(args.retry_errors, 'rb') as f:
+            ids += [str(e['tweet_id']) for e in serializer.load(f).get('errors', [])]
+    
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(Path(args.cache_dir) / 'extractions.sqlite3',
+                                max_bytes=args.cache_max_mb * 1024 * 1024)
+    
+    rules = None if args.no_rules else RuleExtractor()
+    
+    # the budget clock starts here, it covers the whole run
+    retry = RetryPolicy(timeout=args.timeout, min_timeout=args.min_timeout,
+                        budget_s=args.budget_minutes * 60 if args.budget_minutes else None)
+    
+    priority = None
+    if args.budget_minutes and not args.file_order:
+        # TARGET_DOMAINS/INCLUDE_PATTERNS come from .env like for the scraper
+        from src.config import Config
+        # with limited time, the tweets most likely to hold media go first
+        priority = TweetFilter(Config.TARGET_DOMAINS or load_parser_config()['url_domains'],
+                               Config.INCLUDE_PATTERNS)
+    
     processor = BookmarkAIProcessor(
         model=args.model, 
-        ollama_url=args.url, 
+        ollama_url=args.url or ['http://localhost:11434'], 
         timeout=args.timeout,
         debug=args.debug,
-        show_reasoning=args.reasoning
+        show_reasoning=args.reasoning,
+        pretty=args.pretty,
+        concurrency=args.concurrency,
+        pool_size=args.pool_size,
+        cache=cache,
+        rules=rules,
+        batch_size=args.batch_size,
+        json_mode=args.json_mode,
+        stream=args.stream,
+        keep_alive=args.keep_alive,
+        warm_up=not args.no_warm_up,
+        retry=retry,
+        dedup=NearDuplicateFinder() if args.dedup else None,
+        priority=priority,
+        compact=PromptCompactor() if args.compact_prompt else None
     )
     
-    processor.process_bookmarks(args.json_file, args.output, args.limit)
+    if rules is not None and not args.no_gazetteer:
+        # only read, a missing wikidata cache just means fewer known titles
+        wikidata_cache = None
+        if Path(args.wikidata_cache).exists():
+            wikidata_cache = WikidataCache(args.wikidata_cache)
+        # earlier answers count only if this model and prompt variant gave them
+        rules.gazetteer = Gazetteer.from_caches(wikidata_cache, cache, model=processor.model,
+                                                variant=processor.prompt_variant)
+        if wikidata_cache is not None:
+            wikidata_cache.close()
+    
+    processor.process_bookmarks(args.json_file, args.output, args.limit, ids or None,
+                                resume=args.resume, journal_file=args.journal, metrics_file=args.metrics)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,79 @@
+import sys
+import time
+from pathlib import Path
+
+# add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.compression import open_file, strip_codec_suffix
+from src.embeddings import Embedder, EmbeddingIndex
+from src.merge import load_tweets
+from src.ollama_client import OllamaClient
+from src import serializer
+
+def read_tweets(path):
+    if strip_codec_suffix(path).suffix == '.jsonl':
+        with open_file(path, 'rb') as f:
+            return [serializer.loads(line) for line in f if line.strip()]
+    return load_tweets(path)
+
+def print_results(results, elapsed):
+    for rank, (row, score) in enumerate(results, 1):
+        print(f"{rank:>3}. {score:.3f}  {row['id']}  {row['preview']}")
+    print(f"\n{len(results)} results in {elapsed*1000:.1f} ms")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Semantic search over bookmarks with local embeddings')
+    parser.add_argument('--index', default='cache/embeddings', help='Index directory')
+    parser.add_argument('--model', default='nomic-embed-text', help='Ollama embedding model')
+    parser.add_argument('--url', default='http://localhost:11434', help='Ollama URL')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Embed a bookmark export, reusing vectors of unchanged tweets')
+    build.add_argument('json_file', help='Bookmark JSON or JSONL file (.gz/.zst ok)')
+    build.add_argument('--batch-size', type=int, default=64, help='Texts per embedding request')
+
+    query = commands.add_parser('query', help='Bookmarks about a piece of text')
+    query.add_argument('text')
+    query.add_argument('-k', type=int, default=10, help='Number of results')
+
+    like = commands.add_parser('like', help='Bookmarks similar to a tweet in the index')
+    like.add_argument('tweet_id')
+    like.add_argument('-k', type=int, default=10, help='Number of results')
+
+    args = parser.parse_args()
+
+    index = EmbeddingIndex(Path(args.index) / args.model.replace(':', '_').replace('/', '_'))
+    embedder = Embedder(OllamaClient(args.url), args.model, getattr(args, 'batch_size', 64))
+
+    if args.command == 'build':
+        tweets = read_tweets(args.json_file)
+        start = time.time()
+        stats = index.build(tweets, embedder)
+        print(f"✓ Indexed {stats['rows']} tweets in {time.time() - start:.1f}s "
+              f"({stats['embedded']} embedded in {embedder.requests} requests, {stats['reused']} from cache)")
+        print(f"  Index: {index.directory}")
+        return
+
+    if not len(index):
+        print(f"✗ No index in {index.directory}, run 'build' first")
+        sys.exit(1)
+
+    if args.command == 'query':
+        # the query itself still needs one embedding request, timed apart from the search
+        vector = embedder.embed([args.text])[0]
+        start = time.perf_counter()
+        results = index.search(vector, args.k)
+    else:
+        start = time.perf_counter()
+        try:
+            results = index.like(args.tweet_id, args.k)
+        except KeyError as e:
+            print(f"✗ {e.args[0]}")
+            sys.exit(1)
+    print_results(results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -50,7 +50,7 @@ async def main():
         return
     
     # save results
-    storage = BookmarkStorage(Config.DATA_DIR)
+    storage = BookmarkStorage(Config.DATA_DIR, Config.COMPRESSION, Config.PRETTY_JSON)
     
     # save all bookmarks
     json_path = await storage.save_json(bookmarks)
@@ -0,0 +1,54 @@
+# python port of src/collectionSplitter.js, keep the two in step
+import re
+from typing import Any, Dict
+
+# words that strongly suggest a bundle, not a single item
+COLLECTION_KEYWORDS = ['collection', 'complete', 'anthology', 'series', 'cartoon collection']
+YEAR_RANGE_RE = re.compile(r'\b(19|20)\d{2}\s*[-–]\s*\d{2,4}\b')
+TITLE_YEAR_RE = re.compile(r'^\s*([^(]+?)\s*\((\d{4}(?:\s*[-–]\s*\d{2,4})?)\)', re.IGNORECASE)
+YEAR_SEPARATOR_RE = re.compile(r'[-–]')
+FROM_PAREN_RE = re.compile(r'\s*\(.*')
+
+
+class CollectionSplitter:
+    def split(self, block_text: str) -> Dict[str, Any]:
+        """decide if a block looks like a collection, and if so return
+        a franchise name + list of contained titles"""
+        lines = [l.strip() for l in block_text.split('\n')]
+        lines = [l for l in lines if l]
+
+        if not lines:
+            return {'isCollection': False}
+
+        first = lines[0]
+        first_lower = first.lower()
+
+        # collect all "Title (year...)" in block
+        items = []
+        for line in lines:
+            m = TITLE_YEAR_RE.match(line)
+            if m:
+                raw_title = m.group(1).strip()
+                year_only = YEAR_SEPARATOR_RE.split(m.group(2).strip())[0].strip()
+                items.append({'title': raw_title, 'year': year_only})
+
+        multiple_title_pairs = len(items) > 1
+        has_keyword = any(kw in first_lower for kw in COLLECTION_KEYWORDS)
+        has_year_range = bool(YEAR_RANGE_RE.search(first))
+
+        # heuristic: collection if:
+        # - multiple title/year pairs, OR
+        # - first line has collection keyword AND some title/year pairs
+        if not multiple_title_pairs and not (has_keyword and items) and not has_year_range:
+            return {'isCollection': False}
+
+        franchise = FROM_PAREN_RE.sub('', first, count=1).strip() or (items[0]['title'] if items else None)
+
+        if not franchise:
+            return {'isCollection': False}
+
+        return {
+            'isCollection': True,
+            'franchise': franchise,
+            'items': items,
+        }
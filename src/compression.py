@@ -0,0 +1,79 @@
+import gzip
+import io
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .zst files
+    zstandard = None
+
+# codec is picked from the last suffix of the path
+CODEC_SUFFIXES = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+DEFAULT_LEVELS = {
+    'gzip': 6,
+    'zstd': 10,
+}
+
+
+def codec_for(path) -> Optional[str]:
+    """return the codec name for a path, or None for plain files"""
+    return CODEC_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def strip_codec_suffix(path) -> Path:
+    """drop a trailing .gz/.zst so the real extension is visible"""
+    path = Path(path)
+    if codec_for(path):
+        return path.with_suffix('')
+    return path
+
+
+def codec_suffix(codec: Optional[str]) -> str:
+    """file suffix for a codec name ('gz', 'gzip', 'zst', 'zstd' or empty)"""
+    if not codec:
+        return ''
+    codec = codec.lower().lstrip('.')
+    for suffix, name in CODEC_SUFFIXES.items():
+        if codec in (name, suffix.lstrip('.')):
+            return suffix
+    raise ValueError(f"unknown compression codec: {codec}")
+
+
+def open_file(path, mode: str = 'r', level: int = None, encoding: str = 'utf-8', newline: str = None):
+    """open a file, streaming through gzip/zstd when the extension asks for it
+
+    text mode is the default, pass 'b' in mode for bytes. compressed streams
+    are encoded/decoded incrementally so nothing is buffered in full.
+    """
+    codec = codec_for(path)
+    binary = 'b' in mode
+
+    if codec is None:
+        if binary:
+            return open(path, mode)
+        return open(path, mode, encoding=encoding, newline=newline)
+
+    if not binary and 't' not in mode:
+        mode += 't'
+    text_kwargs = {} if binary else {'encoding': encoding, 'newline': newline}
+    writing = any(c in mode for c in 'wax')
+
+    if codec == 'gzip':
+        compresslevel = level or DEFAULT_LEVELS['gzip']
+        return gzip.open(path, mode, compresslevel=compresslevel, **text_kwargs)
+
+    if zstandard is None:
+        raise RuntimeError(f"zstandard is not installed, needed for {path} (pip install zstandard)")
+
+    if writing:
+        cctx = zstandard.ZstdCompressor(level=level or DEFAULT_LEVELS['zstd'])
+        return zstandard.open(path, mode, cctx=cctx, **text_kwargs)
+    if binary:
+        # the raw zstd reader cannot iterate lines, a buffered wrapper can
+        return io.BufferedReader(zstandard.open(path, mode))
+    return zstandard.open(path, mode, **text_kwargs)
@@ -18,6 +18,11 @@ class Config:
     TARGET_DOMAINS = [d.strip() for d in os.getenv('TARGET_DOMAINS', '').split(',') if d]
     INCLUDE_PATTERNS = [p.strip() for p in os.getenv('INCLUDE_PATTERNS', '').split(',') if p]
     
+    # storage - 'gz' or 'zst' to compress saved files, empty for plain
+    COMPRESSION = os.getenv('COMPRESSION', '')
+    # indent saved json for reading by hand (slower, larger files)
+    PRETTY_JSON = os.getenv('PRETTY_JSON', 'False').lower() == 'true'
+    
     # paths
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / 'data'
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+from . import serializer
+
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for the embedding index
+    np = None
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# an index directory holds the raw float32 matrix, one row per tweet, and its row table
+VECTORS_FILE = 'vectors.f32'
+ROWS_FILE = 'rows.json'
+PREVIEW_CHARS = 120
+
+
+def embedding_text(tweet: Dict[str, Any]) -> str:
+    """what gets embedded: the tweet and its quote, whitespace collapsed"""
+    parts = [tweet.get('text') or '', tweet.get('quoted_text') or '']
+    return WHITESPACE_RE.sub(' ', '\n'.join(p for p in parts if p)).strip()
+
+
+def text_hash(text: str, model: str) -> str:
+    """cache key of one embedding, the same text under another model is another vector"""
+    return hashlib.blake2b(f'{model}\0{text}'.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("the embedding index needs numpy (pip install numpy)")
+
+
+class Embedder:
+    """batched calls to ollama's /api/embed"""
+
+    def __init__(self, client, model: str = 'nomic-embed-text', batch_size: int = 64,
+                 timeout: float = 120, keep_alive: str = None):
+        self.client = client
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.requests = 0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            payload = {'model': self.model, 'input': texts[start:start + self.batch_size]}
+            if self.keep_alive is not None:
+                payload['keep_alive'] = self.keep_alive
+            response, _ = self.client.post('/api/embed', payload, timeout=self.timeout)
+            self.requests += 1
+            if response.status_code != 200:
+                raise RuntimeError(f"embedding request failed: {response.status_code} {response.text[:200]}")
+            vectors.extend(response.json()['embeddings'])
+        return vectors
+
+
+class EmbeddingIndex:
+    """unit-length tweet embeddings in a memory-mapped float32 matrix
+
+    rows.json maps rows to tweet ids and content hashes. building again
+    reuses the vector of every text already embedded under the same model,
+    so only new or edited tweets go to the server. queries are a single
+    matrix-vector product over the mapped file, cosine similarity being a
+    dot product of unit vectors.
+    """
+
+    def __init__(self, directory):
+        _require_numpy()
+        self.directory = Path(directory)
+        self.model = None
+        self.dim = 0
+        self.rows: List[Dict[str, str]] = []
+        self.vectors = None
+        self._row_of_id: Dict[str, int] = {}
+        if (self.directory / ROWS_FILE).exists():
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _open(self):
+        with open(self.directory / ROWS_FILE, 'rb') as f:
+            meta = serializer.load(f)
+        self.model = meta['model']
+        self.dim = meta['dim']
+        self.rows = meta['rows']
+        self._row_of_id = {row['id']: i for i, row in enumerate(self.rows)}
+        self.vectors = None
+        if self.rows:
+            self.vectors = np.memmap(self.directory / VECTORS_FILE, dtype=np.float32, mode='r',
+                                     shape=(len(self.rows), self.dim))
+
+    def build(self, tweets: Iterable[Dict[str, Any]], embedder: Embedder) -> Dict[str, int]:
+        """(re)write the index for tweets, embedding only texts not seen before
+
+        new texts are embedded one embedder batch at a time and appended to
+        the matrix as they come back, so no more than a batch of vectors is
+        ever held in memory. rows are stored reused first, then new.
+        """
+        cached = {}
+        if self.vectors is not None and self.model == embedder.model:
+            cached = {row['hash']: i for i, row in enumerate(self.rows)}
+
+        reused = []
+        missing: Dict[str, str] = {}  # hash -> text, embedded once however many tweets share it
+        waiting: Dict[str, List[Dict[str, str]]] = {}  # hash -> rows that get its vector
+        for tweet in tweets:
+            text = embedding_text(tweet)
+            if not text or tweet.get('id') is None:
+                continue
+            key = text_hash(text, embedder.model)
+            row = {'id': str(tweet['id']), 'hash': key, 'preview': text[:PREVIEW_CHARS]}
+            if key in cached:
+                reused.append(row)
+            else:
+                missing[key] = text
+                waiting.setdefault(key, []).append(row)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / (VECTORS_FILE + '.tmp')
+        rows = list(reused)
+        dim = self.dim
+        with open(tmp, 'wb') as f:
+            for row in reused:
+                f.write(np.ascontiguousarray(self.vectors[cached[row['hash']]], dtype=np.float32).tobytes())
+            keys = list(missing)
+            for start in range(0, len(keys), embedder.batch_size):
+                batch = keys[start:start + embedder.batch_size]
+                vectors = self._normalize(np.asarray(embedder.embed([missing[k] for k in batch]), dtype=np.float32))
+                dim = vectors.shape[1]
+                for key, vector in zip(batch, vectors):
+                    for row in waiting[key]:
+                        f.write(vector.tobytes())
+                        rows.append(row)
+
+        # drop the old mapping before the file under it is replaced
+        self.vectors = None
+        os.replace(tmp, self.directory / VECTORS_FILE)
+        with open(self.directory / ROWS_FILE, 'wb') as f:
+            serializer.dump({'model': embedder.model, 'dim': dim, 'rows': rows}, f)
+        self._open()
+        return {'rows': len(rows), 'embedded': len(missing), 'reused': len(rows) - len(missing)}
+
+    def search(self, vector, k: int = 10, exclude: Iterable[str] = ()) -> List[Tuple[Dict[str, str], float]]:
+        """top k rows by cosine similarity to vector, best first"""
+        if self.vectors is None:
+            return []
+        query = self._normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        scores = self.vectors @ query
+        for tweet_id in exclude:
+            row = self._row_of_id.get(str(tweet_id))
+            if row is not None:
+                scores[row] = -np.inf
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        # partial selection, only the k winners get sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.rows[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def search_text(self, text: str, embedder: Embedder, k: int = 10):
+        """bookmarks about text"""
+        return self.search(embedder.embed([text])[0], k)
+
+    def like(self, tweet_id: str, k: int = 10):
+        """bookmarks similar to an indexed tweet, not including itself"""
+        row = self._row_of_id.get(str(tweet_id))
+        if row is None:
+            raise KeyError(f"tweet {tweet_id} is not in the index")
+        return self.search(self.vectors[row], k, exclude=[tweet_id])
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
@@ -0,0 +1,147 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from . import serializer
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_content(tweet: Dict[str, Any]) -> Dict[str, Any]:
+    """the parts of a tweet the model sees, with cosmetic differences removed"""
+    links = set(tweet.get('links') or []) | set(tweet.get('quoted_links') or [])
+    return {
+        'text': WHITESPACE_RE.sub(' ', tweet.get('text') or '').strip(),
+        'quoted_text': WHITESPACE_RE.sub(' ', tweet.get('quoted_text') or '').strip(),
+        'links': sorted(links),
+    }
+
+
+def content_key(tweet: Dict[str, Any], model: str, variant: str, prompt_version: int) -> str:
+    """cache key: normalized content + model + prompt variant + template version"""
+    material = {
+        'content': normalize_content(tweet),
+        'model': model,
+        'variant': variant,
+        'prompt_version': prompt_version,
+    }
+    return hashlib.sha256(serializer.dumps(material)).hexdigest()
+
+
+class ExtractionCache:
+    """sqlite-backed store of model extractions with size-based lru eviction
+
+    safe to share between extraction worker threads.
+    """
+
+    def __init__(self, path, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS extractions ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' accessed REAL NOT NULL,'
+            ' model TEXT,'
+            ' variant TEXT)'
+        )
+        # caches written before entries knew their model and prompt variant
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(extractions)')}
+        for column in ('model', 'variant'):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE extractions ADD COLUMN {column} TEXT')
+        self._db.execute('CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions (accessed)')
+        self._db.commit()
+
+        self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM extractions').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT value FROM extractions WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute('UPDATE extractions SET accessed = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+        return serializer.loads(row[0])
+
+    def put(self, key: str, extraction: Dict[str, Any], model: str = None, variant: str = None):
+        """store an extraction, model and variant say what produced it (see values)"""
+        value = serializer.dumps(extraction)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT size FROM extractions WHERE key = ?', (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._db.execute(
+                'INSERT OR REPLACE INTO extractions (key, value, size, created, accessed, model, variant)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, value, len(value), now, now, model, variant)
+            )
+            self.total_bytes += len(value)
+            self.stores += 1
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """drop least recently used entries until 90% of max_bytes (lock held)"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute('SELECT key, size FROM extractions ORDER BY accessed').fetchall()
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            self._db.execute('DELETE FROM extractions WHERE key = ?', (key,))
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def values(self, model: str = None, variant: str = None) -> Iterator[Dict[str, Any]]:
+        """cached extractions, oldest first, without touching access times
+
+        with model or variant only those stored for it, entries of unknown
+        origin left out.
+        """
+        query, params = 'SELECT value FROM extractions', []
+        filters = [(column, value) for column, value in (('model', model), ('variant', variant)) if value]
+        if filters:
+            query += ' WHERE ' + ' AND '.join(f'{column} = ?' for column, _ in filters)
+            params = [value for _, value in filters]
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY created', params).fetchall()
+        for (value,) in rows:
+            yield serializer.loads(value)
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM extractions').fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(self),
+            'size_bytes': self.total_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,148 @@
+# python port of src/extractors.js, keep the two in step
+import re
+from typing import Any, Dict, List, Optional
+
+JUNK_LINE_PATTERNS = [
+    re.compile(r'^\d+\s+(episodes|volumes|seasons)'),
+    re.compile(r'^two special episodes'),
+    re.compile(r'^\(there are lots of'),
+    re.compile(r'^complete series'),
+    re.compile(r'bonus materials are included'),
+    re.compile(r'extract and enjoy'),
+]
+
+TRAILING_YEAR_RE = re.compile(r'\s*\(\d{4}(?:-\d{2,4})?\)\s*$')
+NUMBERED_PART_RE = re.compile(r'^(season|episode|part)\s*\d+$', re.IGNORECASE)
+TRAILING_PUNCT_RE = re.compile(r'[:\-,]+$')
+MIXED_CASE_RE = re.compile(r'[A-Z].*[a-z]')
+# ascii like the js \w, so full-width and small-cap letters are left alone
+WORD_RE = re.compile(r'[A-Za-z0-9_]\S*')
+LETTER_RE = re.compile(r'[a-z]', re.IGNORECASE)
+
+GAME_SIGNALS = [
+    'official game of the movie',
+    'official game',
+    'drm',
+    'run on modern system',
+    'check readme before playing',
+    'extract and enjoy',  # very common in game dumps
+]
+
+
+class Extractors:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.patterns = self.compile_patterns()
+        self.title_stopwords = {s.lower() for s in config['title_stopwords']}
+        self.quality_keywords = [(kw, kw.lower()) for kw in config['quality_keywords']]
+        self.type_keywords = [
+            (type_name.replace('_', ' ', 1), [kw.lower() for kw in keywords])
+            for type_name, keywords in config['type_keywords'].items()
+        ]
+
+    def compile_patterns(self) -> Dict[str, re.Pattern]:
+        patterns = self.config['regex_patterns']
+        return {
+            name: re.compile(patterns[name], re.IGNORECASE)
+            for name in ('title_with_year', 'quoted_title', 'year', 'season_episode', 'url', 'resolution')
+        }
+
+    def extract_title(self, block: str) -> Optional[Dict[str, Optional[str]]]:
+        year_match = self.patterns['title_with_year'].search(block)
+        if year_match:
+            title = self.clean_title(year_match.group(1))
+            if title:
+                return {'title': self.proper_case(title), 'year': year_match.group(2)}
+
+        quoted_match = self.patterns['quoted_title'].search(block)
+        if quoted_match:
+            title = self.clean_title(quoted_match.group(1))
+            if title:
+                return {'title': self.proper_case(title), 'year': None}
+
+        lines = [l.strip() for l in block.split('\n') if l.strip()]
+        for line in lines:
+            if self.looks_like_title(line):
+                title = self.extract_title_from_line(line)
+                if title:
+                    return {'title': self.proper_case(title), 'year': None}
+
+        return None
+
+    def extract_title_from_line(self, line: str) -> Optional[str]:
+        title = TRAILING_YEAR_RE.sub('', line).strip()
+
+        if ':' in title and not title.startswith('http'):
+            parts = title.split(':')
+            if len(parts[0]) > 3 and not NUMBERED_PART_RE.match(parts[0]):
+                title = parts[0].strip()
+
+        return self.clean_title(title)
+
+    def looks_like_title(self, line: str) -> bool:
+        if not line or line.startswith('http'):
+            return False
+
+        lower = line.lower()
+
+        # filter out descriptive lines
+        if any(p.search(lower) for p in JUNK_LINE_PATTERNS):
+            return False
+
+        # must have letters
+        letter_count = len(LETTER_RE.findall(line))
+        if not letter_count:
+            return False
+        if letter_count < len(line) * 0.4:
+            return False
+
+        return True
+
+    def clean_title(self, text: Optional[str]) -> Optional[str]:
+        if not text:
+            return None
+        cleaned = TRAILING_PUNCT_RE.sub('', text.strip()).strip()
+
+        if cleaned.lower() in self.title_stopwords:
+            return None
+        if len(cleaned) < 2:
+            return None
+
+        return cleaned
+
+    def proper_case(self, text: str) -> str:
+        if MIXED_CASE_RE.search(text):
+            return text
+        return WORD_RE.sub(lambda m: m.group(0)[0].upper() + m.group(0)[1:].lower(), text)
+
+    def extract_year(self, block: str) -> Optional[str]:
+        match = self.patterns['year'].search(block)
+        return match.group(1) if match else None
+
+    def extract_quality(self, block: str) -> List[str]:
+        lower = block.lower()
+        qualities = []
+        seen = set()
+        for keyword, kw_lower in self.quality_keywords:
+            if kw_lower in lower and kw_lower not in seen:
+                qualities.append(keyword)
+                seen.add(kw_lower)
+        return qualities
+
+    def extract_type(self, block: str) -> Optional[str]:
+        lower = block.lower()
+
+        # strong game signals first, should be rare
+        if any(signal in lower for signal in GAME_SIGNALS):
+            return 'game'
+
+        # config driven, film type keywords
+        for type_name, keywords in self.type_keywords:
+            if any(kw in lower for kw in keywords):
+                return type_name
+
+        return None
+
+    def extract_season_info(self, block: str) -> Optional[str]:
+        match = self.patterns['season_episode'].search(block)
+        return match.group(0) if match else None
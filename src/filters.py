@@ -3,6 +3,16 @@ from urllib.parse import urlparse
 from typing import List, Dict, Any
 
 class TweetFilter:
+    # how much each signal adds to a tweet's priority score
+    SCORE_WEIGHTS = {
+        'target_domain': 4,
+        'quality': 2,
+        'year': 2,
+        'movie': 1,
+        'include_pattern': 1,
+        'link': 1,
+    }
+    
     def __init__(self, target_domains: List[str] = None, include_patterns: List[str] = None):
         self.target_domains = target_domains or []
         self.include_patterns = include_patterns or []
@@ -16,6 +26,11 @@ class TweetFilter:
         
         # movie pattern - case insensitive
         self.movie_pattern = re.compile(r'\bmovies?\b', re.IGNORECASE)
+        
+        # release quality keywords - shared files usually name theirs
+        self.quality_pattern = re.compile(
+            r'\b(2160p|1080p|1080i|720p|480p|4k|uhd|remux|blu-?ray|web-?dl|webrip|hdtv|dvdrip|bdrip|vhsrip)\b',
+            re.IGNORECASE)
     
     def extract_urls(self, text: str) -> List[str]:
         """extract all urls from text"""
@@ -82,6 +97,24 @@ class TweetFilter:
         
         return False
     
+    def score(self, tweet: Dict[str, Any]) -> int:
+        """how likely the tweet holds extractable media, higher is better"""
+        all_text = (tweet.get('text') or '') + ' ' + (tweet.get('quoted_text') or '')
+        all_urls = self.extract_urls(all_text)
+        all_urls.extend(tweet.get('links') or [])
+        all_urls.extend(tweet.get('quoted_links') or [])
+        
+        signals = {
+            'target_domain': any(target.lower() in self.get_domain(url)
+                                 for url in all_urls for target in self.target_domains),
+            'quality': bool(self.quality_pattern.search(all_text)),
+            'year': bool(self.year_pattern.search(all_text)),
+            'movie': bool(self.movie_pattern.search(all_text)),
+            'include_pattern': any(p.lower() in all_text.lower() for p in self.include_patterns),
+            'link': bool(all_urls),
+        }
+        return sum(self.SCORE_WEIGHTS[name] for name, hit in signals.items() if hit)
+    
     def categorize_tweets(self, tweets: List[Dict]) -> Dict[str, List]:
         """categorize tweets by what matched them"""
         categorized = {
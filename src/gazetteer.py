@@ -0,0 +1,162 @@
+import math
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# entry fields kept from wikidata matches and extractions
+FIELDS = ('title', 'year', 'type', 'wikidata_id', 'imdb_id', 'steam_id', 'confidence')
+
+NON_WORD_RE = re.compile(r'[\W_]+')
+# model answers that are not titles
+JUNK_TITLES = {'unknown', 'unknown title', 'none', 'n a', 'not specified', 'various'}
+
+# extraction TYPE labels -> the type names wikidata matches use
+TYPE_NAMES = {'movie': 'film', 'tv series': 'tv series', 'tv movie': 'tv film', 'game': 'game'}
+
+
+def normalize_title(title: str) -> str:
+    """casefolded words only: '𝐓𝐡𝐞 Green-Mile!' -> 'the green mile'"""
+    title = unicodedata.normalize('NFKC', title or '').casefold().replace('&', ' and ')
+    return NON_WORD_RE.sub(' ', title).strip()
+
+
+def trigrams(normalized: str) -> frozenset:
+    """character trigrams of a normalized title, padded so short words still get some"""
+    padded = f'  {normalized} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class Gazetteer:
+    """offline index of known titles, exact and fuzzy
+
+    entries come from wikidata matches and earlier extractions. lookup tries
+    the normalized title first (a dict hit), then a character-trigram index
+    that tolerates typos, casing and styled letters: candidates are drawn
+    only from the query's rarest trigrams (enough of them that any title
+    over min_score must share one) and scored by dice similarity.
+    """
+
+    def __init__(self, min_score: float = 0.8):
+        self.min_score = min_score
+        self.entries: List[Dict[str, Any]] = []
+        self._grams: List[frozenset] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry: Dict[str, Any], alias: str = None) -> bool:
+        """index one title (dict with FIELDS), merged into an existing same title/year entry
+
+        alias is another name to find the entry by, e.g. what a wikidata search
+        was made for.
+        """
+        title = (entry.get('title') or '').strip()
+        key = normalize_title(alias or title)
+        if len(key) < 2 or key in JUNK_TITLES:
+            return False
+        entry = {field: entry.get(field) for field in FIELDS if entry.get(field) is not None}
+        entry['title'] = title
+
+        for idx in self._exact.get(key, ()):
+            known = self.entries[idx]
+            if known.get('year') == entry.get('year'):
+                # ids found later fill in what an earlier source did not have
+                for field, value in entry.items():
+                    known.setdefault(field, value)
+                return False
+
+        idx = len(self.entries)
+        grams = trigrams(key)
+        self.entries.append(entry)
+        self._grams.append(grams)
+        self._exact.setdefault(key, []).append(idx)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(idx)
+        return True
+
+    def add_wikidata(self, lookups: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """(cache key, match) pairs, found by their own title and by what was searched"""
+        added = 0
+        for key, match in lookups:
+            # search:<title>:<year or any>
+            searched = key.partition(':')[2].rpartition(':')[0]
+            added += self.add(match)
+            added += self.add(match, alias=searched)
+        return added
+
+    def add_extractions(self, extractions: Iterable[Dict[str, Any]]) -> int:
+        """titles of earlier extractions
+
+        only single-title ones with a year: a list of titles has no year per
+        title, and a title without one can't be told from its remakes.
+        answers the gazetteer gave itself add nothing.
+        """
+        added = 0
+        for extraction in extractions:
+            titles = extraction.get('titles') or []
+            if extraction.get('error') or len(titles) != 1 or not extraction.get('year'):
+                continue
+            if extraction.get('source') == 'gazetteer':
+                continue
+            types = extraction.get('type') or []
+            added += self.add({
+                'title': titles[0],
+                'year': extraction.get('year'),
+                'type': TYPE_NAMES.get(types[0].lower()) if types else None,
+            })
+        return added
+
+    def lookup(self, title: str, year: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """best known entry for a title, with its score (1.0 exact), or None
+
+        an exact title counts with a year on one side only, years on both
+        sides have to agree. fuzzy matches need the same year on both sides,
+        a near title alone is too weak (remakes, sequels).
+        """
+        key = normalize_title(title)
+        if not key:
+            return None
+
+        exact = [self.entries[i] for i in self._exact.get(key, ())]
+        for entry in exact:
+            if year and entry.get('year') == year:
+                return {**entry, 'score': 1.0}
+        for entry in exact:
+            if not year or not entry.get('year'):
+                return {**entry, 'score': 1.0}
+
+        if not year:
+            return None
+        query = trigrams(key)
+        # dice >= t needs at least t*|q|/(2-t) shared trigrams, so a match shares one of the rest
+        needed = math.ceil(self.min_score * len(query) / (2 - self.min_score))
+        rarest = sorted(query, key=lambda g: len(self._postings.get(g, ())))
+        candidates = {i for gram in rarest[:len(query) - needed + 1] for i in self._postings.get(gram, ())}
+
+        best, best_score = None, self.min_score
+        for idx in candidates:
+            entry = self.entries[idx]
+            if entry.get('year') != year:
+                continue
+            grams = self._grams[idx]
+            score = 2 * len(query & grams) / (len(query) + len(grams))
+            if score >= best_score:
+                best, best_score = entry, score
+        return {**best, 'score': round(best_score, 3)} if best else None
+
+    @classmethod
+    def from_caches(cls, wikidata_cache=None, extraction_cache=None, model: str = None,
+                    variant: str = None, **kwargs) -> 'Gazetteer':
+        """index of everything a WikidataCache matched and an ExtractionCache holds, wikidata first
+
+        model and variant limit the extractions to those of one model and
+        prompt variant, the ones this run's answers would be checked against.
+        """
+        gazetteer = cls(**kwargs)
+        if wikidata_cache is not None:
+            gazetteer.add_wikidata(wikidata_cache.matches())
+        if extraction_cache is not None:
+            gazetteer.add_extractions(extraction_cache.values(model, variant))
+        return gazetteer
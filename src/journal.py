@@ -0,0 +1,93 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+from . import serializer
+
+
+class ExtractionJournal:
+    """append-only checkpoint of a processing run
+
+    every finished tweet or error is written as one jsonl record and synced
+    right away, so a crash loses at most the extraction in flight. the
+    final output can be rebuilt from the journal alone.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, resume: bool = False):
+        """start writing; a fresh run truncates, a resumed run appends"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            self._drop_torn_tail()
+        self._file = open(self.path, 'ab' if resume else 'wb')
+        return self
+
+    def _drop_torn_tail(self):
+        """cut off a half-written last record left by a crash mid-write"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def _append(self, record: Dict):
+        line = serializer.dumps(record) + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_tweet(self, processed_tweet: Dict):
+        self._append({'kind': 'tweet', 'tweet': processed_tweet})
+
+    def record_error(self, error: Dict):
+        self._append({'kind': 'error', **error})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def load(self) -> Tuple[List[Dict], List[Dict]]:
+        """(processed tweets, errors) recorded so far
+
+        later records win, so a tweet that failed and then succeeded on a
+        resumed run only shows up as processed. records without a tweet id
+        can't be matched up, each one is kept on its own.
+        """
+        processed: Dict[str, Dict] = {}
+        errors: Dict[str, Dict] = {}
+        if not self.path.exists():
+            return [], []
+
+        with open(self.path, 'rb') as f:
+            for position, line in enumerate(f):
+                if not line.endswith(b'\n'):
+                    break  # torn write from a crash
+                record = serializer.loads(line)
+                if record['kind'] == 'tweet':
+                    tweet_id = self._key(record['tweet'].get('id'), position)
+                    processed[tweet_id] = record['tweet']
+                    errors.pop(tweet_id, None)
+                else:
+                    record.pop('kind')
+                    tweet_id = self._key(record.get('tweet_id'), position)
+                    if tweet_id not in processed:
+                        errors[tweet_id] = record
+
+        return list(processed.values()), list(errors.values())
+
+    @staticmethod
+    def _key(tweet_id, position: int) -> str:
+        """tweet id, or the record's line for tweets without one"""
+        return str(tweet_id) if tweet_id is not None else f'#{position}'
+
+    def done_ids(self) -> set:
+        """ids that already have a successful extraction, id-less tweets are never done"""
+        processed, _ = self.load()
+        return {str(t['id']) for t in processed if t.get('id') is not None}
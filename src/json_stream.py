@@ -0,0 +1,138 @@
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator
+from .compression import open_file, strip_codec_suffix
+from . import serializer
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+
+class _ArrayReader:
+    """walks a json document chunk by chunk, decoding one array item at a time
+
+    only the current item and the unread rest of the last chunk are held, so
+    memory follows the largest tweet, not the file.
+    """
+
+    def __init__(self, fp: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """read another chunk, False at the end of the file"""
+        if self.eof:
+            return False
+        data = ''
+        while not data:
+            raw = self.fp.read(self.chunk_size)
+            # a chunk ending inside a multi-byte character decodes to nothing yet
+            data = self.utf8.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            if not raw:
+                break
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """next non-whitespace character, '' at the end of the file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} in json input, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """decode the value at the current position, reading more until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number or literal cut off by the chunk edge decodes fine but short
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator[Any]:
+        """items of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"expected ',' or ']' in json array, found {char or 'end of file'!r}")
+
+
+def iter_json_array(fp: BinaryIO, key: str = 'tweets', chunk_size: int = CHUNK_SIZE,
+                    meta: dict = None) -> Iterator[Any]:
+    """items of a top-level array, or of the array under key of a top-level object
+
+    other keys of the object are decoded on the way and dropped, or put in meta
+    when one is given. reading stops once the array is done, so keys after it
+    are never seen.
+    """
+    reader = _ArrayReader(fp, chunk_size)
+    char = reader.peek()
+    if char == '[':
+        yield from reader.items()
+        return
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            yield from reader.items()
+            return
+        value = reader.value()
+        if meta is not None:
+            meta[name] = value
+        char = reader.peek()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f"expected ',' or '}}' in json object, found {char or 'end of file'!r}")
+
+
+def iter_jsonl(fp: BinaryIO) -> Iterator[Any]:
+    for line in fp:
+        if line.strip():
+            yield serializer.loads(line)
+
+
+def iter_tweets(path) -> Iterator[dict]:
+    """tweets of a json export or a jsonl file, one at a time, .gz/.zst decompressed on the way"""
+    with open_file(path, 'rb') as f:
+        if strip_codec_suffix(path).suffix == '.jsonl':
+            yield from iter_jsonl(f)
+        else:
+            yield from iter_json_array(f)
@@ -0,0 +1,385 @@
+# python port of src/parser.js, keep the two in step
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from .collection_splitter import CollectionSplitter
+from .compression import open_file, strip_codec_suffix
+from .extractors import Extractors
+from .gazetteer import Gazetteer
+from .json_stream import iter_json_array, iter_jsonl
+from .parser_config import load_parser_config
+from .storage import BookmarkStorage
+from .text_processor import TextProcessor
+from .url_associator import UrlAssociator
+from .url_repair import collect_urls
+
+# --------------- watch-list helpers ---------------
+
+WATCH_TRIGGERS = [
+    re.compile(r'#nw\b', re.IGNORECASE),
+    re.compile(r'\bnow[\s-]?watching\b', re.IGNORECASE),
+    re.compile(r'\bjust[\s-]?watched\b', re.IGNORECASE),
+    re.compile(r'\bwatching\b', re.IGNORECASE),
+]
+
+# either "Title" or Title (1990)
+WATCH_ITEM_RE = re.compile(r'[“”"]([^“”"]+)[“”"]|([A-Z][A-Za-z0-9 :\-’\']+?)\s*\((\d{4})\)')
+
+HAS_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+
+# titles that are clearly junk unless they came with a url
+BAD_TITLE_STARTS = (
+    'download links',
+    'download link',
+    'in this folder you\'ll find',
+    'bonus',
+    'movies',
+    'anime',
+    'manga',
+    'series',
+    'complete series',
+    'full color',
+    'one hundred',
+    'quoted tweet',
+)
+
+MEDIA_TYPES_FOR_WIKIDATA = {'film', 'tv series', 'tv film', 'documentary', 'game'}
+WIKIDATA_IDS = ('wikidata_id', 'imdb_id', 'steam_id')
+
+
+def extract_watch_items(unified_text: str) -> List[Dict[str, Any]]:
+    if not any(trigger.search(unified_text) for trigger in WATCH_TRIGGERS):
+        return []
+
+    results = []
+    for m in WATCH_ITEM_RE.finditer(unified_text):
+        title = (m.group(1) or m.group(2) or '').strip()
+        if not title:
+            continue
+
+        results.append({
+            'title': title,
+            'year': m.group(3),
+            'type': 'media-interest',
+            'quality': [],
+            'season_episode_info': None,
+            'associated_urls': [],
+            'wikidata_enhanced': False,
+            'isWatch': True,
+        })
+
+    return results
+
+
+class MediaParser:
+    """rule-based media parser, one tweet at a time
+
+    same rules and output (parsed_media) as the node parser, run in process:
+    parse_tweet for a single tweet, parse_tweets over any iterable of them,
+    parse_file to stream an export file to a parsed one. wikidata is any
+    object with search_media(title, year) -> dict or None, or one with
+    search_many([(title, year), ...]) -> {(title, year): dict or None} like
+    WikidataClient, which is then handed a window of tweets' lookups at once.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, wikidata=None, wikidata_window: int = 200,
+                 gazetteer: Gazetteer = None):
+        self.config = config or load_parser_config()
+        self.text_processor = TextProcessor(self.config)
+        self.extractors = Extractors(self.config)
+        self.url_associator = UrlAssociator(self.config)
+        self.collection_splitter = CollectionSplitter()
+        self.wikidata = wikidata
+        # tweets whose lookups a batched client (one with search_many) resolves together
+        self.wikidata_window = wikidata_window
+        # titles matched on earlier runs, asked before wikidata
+        self.gazetteer = gazetteer
+
+        self.quality_keywords = [kw.lower() for kw in self.config['quality_keywords']]
+        self.url_domains = [d.lower() for d in self.config['url_domains']]
+
+    def parse_tweets(self, tweets: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        if not hasattr(self.wikidata, 'search_many'):
+            for tweet in tweets:
+                yield self.parse_tweet(tweet)
+            return
+        # batched client: look up a whole window of titles in one pipelined run
+        window = []
+        for tweet in tweets:
+            window.append(tweet)
+            if len(window) == self.wikidata_window:
+                yield from self._parse_window(window)
+                window = []
+        yield from self._parse_window(window)
+
+    def _parse_window(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not tweets:
+            return []
+        # a dry pass collects the lookups, the real one reads their answers
+        wanted = _Lookups()
+        for tweet in tweets:
+            self._parse_tweet(tweet, wanted)
+        found = _Lookups(self.wikidata.search_many(wanted.lookups) if wanted.lookups else {})
+        return [self._parse_tweet(tweet, found) for tweet in tweets]
+
+    def parse_file(self, input_path, output_path) -> Dict[str, Any]:
+        """stream an export (or jsonl) file into a parsed export, returns parser_stats"""
+        stats = ParserStats()
+        meta = {}
+
+        with open_file(input_path, 'rb') as f:
+            if strip_codec_suffix(input_path).suffix == '.jsonl':
+                tweets = iter_jsonl(f)
+            else:
+                tweets = iter_json_array(f, meta=meta)
+            # the keys before the tweets array are known once the first tweet is read
+            first = next(tweets, None)
+            source = tweets if first is None else _prepend(first, tweets)
+
+            def parsed():
+                for tweet in self.parse_tweets(source):
+                    stats.add(tweet)
+                    yield tweet
+
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            BookmarkStorage(output_path.parent).save_export(
+                parsed(), output_path.name, meta, after=lambda: {'parser_stats': stats.summary()})
+
+        return stats.summary()
+
+    def parse_tweet(self, tweet: Dict[str, Any]) -> Dict[str, Any]:
+        if hasattr(self.wikidata, 'search_many'):
+            return self._parse_window([tweet])[0]
+        return self._parse_tweet(tweet, self.wikidata)
+
+    def _parse_tweet(self, tweet: Dict[str, Any], wikidata) -> Dict[str, Any]:
+        main_text = tweet.get('text') or ''
+        quoted_text = tweet.get('quoted_text') or ''
+
+        # use both for URLs, but only main_text for titles
+        unified_for_urls = '\n'.join(t for t in (main_text, quoted_text) if t)
+
+        all_urls = collect_urls(tweet, unified_for_urls)
+        watch_items = extract_watch_items(unified_for_urls)
+
+        # if literally nothing looks like media, bail early
+        if not all_urls and not watch_items and not self.has_media_indicators(main_text):
+            return {
+                **tweet,
+                'parsed_media': {
+                    'media_items': [],
+                    'media_interest_items': [],
+                    'unassociated_urls': [],
+                    'skipped_reason': 'no_media_indicators',
+                },
+            }
+
+        normalized_main = self.text_processor.normalize(main_text)
+        blocks = self.text_processor.split_into_blocks(normalized_main)
+
+        parsed_items = []
+        used_urls: Set[str] = set()
+
+        # 1. parse main text blocks into items / collections
+        for block in blocks:
+            split = self.collection_splitter.split(block)
+
+            if not split['isCollection']:
+                item = self.parse_single_block(block, all_urls, used_urls, wikidata)
+            else:
+                item = self.build_collection_from_split(split, all_urls, used_urls)
+            if item:
+                parsed_items.append(item)
+
+        # 2. classify items into downloads vs interest
+        has_any_url = bool(all_urls)
+        media_items = []
+        # watch items always go to interest
+        media_interest_items = list(watch_items)
+
+        for item in parsed_items:
+            if not has_any_url:
+                # tweet has no URLs at all -> this is all media-of-interest
+                media_interest_items.append(item)
+            elif item.get('isWatch'):
+                media_interest_items.append(item)
+            elif item.get('isCollection') or item.get('associated_urls'):
+                media_items.append(item)
+            # else: noisy descriptive line with no URL in a tweet that *does* have URLs -> drop
+
+        self.finalize_url_assignments(media_items, all_urls)
+
+        # recompute used URLs after finalization
+        used_now = {url for item in media_items for url in item.get('associated_urls') or []}
+
+        return {
+            **tweet,
+            'parsed_media': {
+                'media_items': media_items,
+                'media_interest_items': media_interest_items,
+                'unassociated_urls': [u for u in all_urls if u not in used_now],
+            },
+        }
+
+    def parse_single_block(self, block: str, all_urls: List[str], used_urls: Set[str],
+                           wikidata=None) -> Optional[Dict[str, Any]]:
+        title_data = self.extractors.extract_title(block)
+        if not title_data:
+            return None
+
+        year = title_data['year'] or self.extractors.extract_year(block)
+        type_name = self.extractors.extract_type(block)
+        quality = self.extractors.extract_quality(block)
+        season_info = self.extractors.extract_season_info(block)
+
+        associated = self.url_associator.associate(block, all_urls, used_urls)
+
+        # quick filter: titles that are clearly junk
+        if title_data['title'].lower().startswith(BAD_TITLE_STARTS) and not associated:
+            return None
+
+        item = {
+            'title': title_data['title'],
+            'year': year or None,
+            'type': type_name,
+            'quality': quality,
+            'season_episode_info': season_info,
+            'associated_urls': associated,
+            'wikidata_enhanced': False,
+        }
+
+        # call wikidata only if this actually looks like media
+        looks_like_media = (year and len(year) == 4) or (type_name and type_name in MEDIA_TYPES_FOR_WIKIDATA)
+
+        res = None
+        if self.gazetteer is not None and looks_like_media:
+            # a title matched before needs no request; only wikidata entries carry a confidence
+            res = self.gazetteer.lookup(item['title'], item['year'])
+            if res and not res.get('wikidata_id'):
+                res = None
+        if res is None and wikidata is not None and looks_like_media:
+            try:
+                res = wikidata.search_media(item['title'], item['year'])
+            except Exception as e:
+                print(f'wikidata error for "{item["title"]}": {e}')
+                res = None
+        if res and res.get('score', 1.0) < 1.0:
+            # a near title is only as good as the match that found it
+            res = {**res, 'confidence': min(res.get('confidence', 0), round(res['score'] * 100))}
+        if res and res.get('confidence', 0) >= self.config['wikidata']['min_confidence']:
+            item = {
+                **item,
+                'title': res.get('title') or item['title'],
+                'year': item['year'] or res.get('year'),
+                'type': item['type'] or res.get('type'),
+                **{key: res[key] for key in WIKIDATA_IDS if res.get(key) is not None},
+                'wikidata_confidence': res['confidence'],
+                'wikidata_enhanced': True,
+            }
+
+        return item
+
+    def build_collection_from_split(self, split: Dict[str, Any], all_urls: List[str],
+                                    used_urls: Set[str]) -> Optional[Dict[str, Any]]:
+        if not split.get('franchise'):
+            return None
+
+        # assign *all remaining* URLs to this collection
+        urls_for_collection = []
+        for url in all_urls:
+            if url not in used_urls:
+                urls_for_collection.append(url)
+                used_urls.add(url)
+
+        items = split.get('items') or []
+        return {
+            'title': split['franchise'],
+            'year': (items[0].get('year') if items else None) or None,
+            'type': 'collection',
+            'quality': [],
+            'season_episode_info': None,
+            'isCollection': True,
+            'items_included': items,
+            'associated_urls': urls_for_collection,
+            'wikidata_enhanced': False,
+        }
+
+    def has_media_indicators(self, text: str) -> bool:
+        lower = text.lower()
+        has_quality = any(kw in lower for kw in self.quality_keywords)
+        has_domain = any(d in lower for d in self.url_domains)
+        return has_quality or has_domain or bool(HAS_YEAR_RE.search(lower))
+
+    def finalize_url_assignments(self, media_items: List[Dict[str, Any]], all_urls: List[str]):
+        if not all_urls or not media_items:
+            return
+
+        used = {url for item in media_items for url in item.get('associated_urls') or []}
+        unused_urls = [u for u in all_urls if u not in used]
+        if not unused_urls:
+            return
+
+        # "primary" items are collections or items that already have URLs
+        primary = [i for i in media_items if i.get('isCollection') or i.get('associated_urls')]
+
+        if len(primary) == 1:
+            # single collection / single main item -> give it ALL remaining URLs
+            target = primary[0]
+            target.setdefault('associated_urls', [])
+            target['associated_urls'].extend(unused_urls)
+            return
+
+        # multiple primary items:
+        # assign remaining URLs in order to items that currently have none
+        no_url_items = [i for i in media_items if not i.get('associated_urls')]
+        for item, url in zip(no_url_items, unused_urls):
+            item['associated_urls'] = [url]
+
+
+class ParserStats:
+    """running parser_stats, same fields as the node parser's buildStats"""
+
+    def __init__(self):
+        self.tweets_processed = 0
+        self.tweets_with_media = 0
+        self.total_media_items = 0
+        self.wikidata_enhanced = 0
+
+    def add(self, tweet: Dict[str, Any]):
+        items = (tweet.get('parsed_media') or {}).get('media_items') or []
+        self.tweets_processed += 1
+        if items:
+            self.tweets_with_media += 1
+        self.total_media_items += len(items)
+        self.wikidata_enhanced += sum(1 for i in items if i.get('wikidata_enhanced'))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'tweets_processed': self.tweets_processed,
+            'tweets_with_media': self.tweets_with_media,
+            'total_media_items': self.total_media_items,
+            'wikidata_enhanced': self.wikidata_enhanced,
+            'parsed_at': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        }
+
+
+class _Lookups:
+    """stands in for the wikidata client while a window is parsed
+
+    records the lookups asked for, and answers them from results once known.
+    """
+
+    def __init__(self, results: Dict = None):
+        self.results = results or {}
+        self.lookups = []
+
+    def search_media(self, title: str, year: Optional[str]) -> Optional[Dict[str, Any]]:
+        self.lookups.append((title, year))
+        return self.results.get((title, year or None))
+
+
+def _prepend(first, rest: Iterator) -> Iterator:
+    yield first
+    yield from rest
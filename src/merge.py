@@ -0,0 +1,107 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from .compression import open_file
+from . import serializer
+
+# fields that define what a tweet says, used for change detection
+CONTENT_FIELDS = ['text', 'quoted_text', 'links', 'quoted_links']
+
+# fields that only some scrapers fill in, a version with more of them wins
+RICH_FIELDS = ['author', 'text', 'links', 'has_quote', 'quoted_text', 'quoted_links',
+               'quoted_author', 'url', 'scraped_at']
+
+
+def load_tweets(path) -> List[Dict]:
+    """load tweets from a python bookmarks_*.json list or a browser export dict"""
+    with open_file(path, 'rb') as f:
+        data = serializer.load(f)
+    if isinstance(data, list):
+        return data
+    return data.get('tweets', [])
+
+
+def content_hash(tweet: Dict) -> bytes:
+    """short digest of the content fields, stable across key order"""
+    content = {field: tweet.get(field) or None for field in CONTENT_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).digest()
+
+
+def richness(tweet: Dict) -> Tuple[int, int]:
+    """rank versions of a tweet: filled-in fields first, then amount of text"""
+    filled = sum(1 for field in RICH_FIELDS if tweet.get(field) not in (None, '', []))
+    text_len = len(tweet.get('text') or '') + len(tweet.get('quoted_text') or '')
+    return filled, text_len
+
+
+class BookmarkMerger:
+    """merge overlapping bookmark dumps into one corpus keyed by tweet id
+
+    only a small index entry is kept per tweet id (digest, rank, source,
+    position); documents are re-read from their source file when written.
+    """
+
+    def __init__(self):
+        self.sources: List[Path] = []
+        # tweet id -> (content digest, richness, source index, position in source)
+        self.index: Dict[str, tuple] = {}
+        self.stats = {
+            'files': 0,
+            'tweets_read': 0,
+            'unique': 0,
+            'duplicates': 0,
+            'changed': 0,
+            'replaced': 0,
+            'missing_id': 0
+        }
+
+    def add_file(self, path):
+        """index one dump, keeping only the richest version of each tweet"""
+        path = Path(path)
+        source = len(self.sources)
+        self.sources.append(path)
+        self.stats['files'] += 1
+
+        for position, tweet in enumerate(load_tweets(path)):
+            self.stats['tweets_read'] += 1
+            tweet_id = tweet.get('id')
+            if not tweet_id:
+                self.stats['missing_id'] += 1
+                continue
+            tweet_id = str(tweet_id)
+
+            digest = content_hash(tweet)
+            rank = richness(tweet)
+            current = self.index.get(tweet_id)
+
+            if current is None:
+                self.index[tweet_id] = (digest, rank, source, position)
+                self.stats['unique'] += 1
+                continue
+
+            if current[0] == digest and current[1] >= rank:
+                self.stats['duplicates'] += 1
+                continue
+
+            if current[0] != digest:
+                self.stats['changed'] += 1
+            else:
+                self.stats['duplicates'] += 1
+
+            # ties go to the later file, it is the more recent scrape
+            if rank >= current[1]:
+                self.index[tweet_id] = (digest, rank, source, position)
+                self.stats['replaced'] += 1
+
+    def iter_merged(self) -> Iterator[Dict]:
+        """yield winning tweets source by source, so only one dump is loaded at a time"""
+        by_source: Dict[int, Dict[int, str]] = {}
+        for tweet_id, (_, _, source, position) in self.index.items():
+            by_source.setdefault(source, {})[position] = tweet_id
+
+        for source, positions in sorted(by_source.items()):
+            for position, tweet in enumerate(load_tweets(self.sources[source])):
+                if position in positions:
+                    yield tweet
@@ -0,0 +1,163 @@
+import hashlib
+import random
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from .url_repair import URL_RE, collect_urls, repair_broken_urls
+
+WORD_RE = re.compile(r'\w+')
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_url(url: str) -> str:
+    """host + path, no scheme, query or trailing slash"""
+    parsed = urlparse(url)
+    return (parsed.netloc.lower().removeprefix('www.') + parsed.path.rstrip('/')).rstrip('…')
+
+
+def tweet_urls(tweet: Dict[str, Any]) -> FrozenSet[str]:
+    unified = '\n'.join(t for t in (tweet.get('text'), tweet.get('quoted_text')) if t)
+    return frozenset(normalize_url(u) for u in collect_urls(tweet, unified))
+
+
+def tweet_words(tweet: Dict[str, Any]) -> List[str]:
+    """words of the tweet and its quote, urls removed, styled unicode folded"""
+    words = []
+    for text in (tweet.get('text'), tweet.get('quoted_text')):
+        text = URL_RE.sub(' ', repair_broken_urls(text or ''))
+        words.extend(WORD_RE.findall(unicodedata.normalize('NFKC', text).casefold()))
+    return words
+
+
+class _DisjointSet:
+    def __init__(self, size: int = 0):
+        self.parent = list(range(size))
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # the earlier tweet stays the root, it becomes the representative
+            self.parent[max(a, b)] = min(a, b)
+
+
+class NearDuplicateFinder:
+    """minhash + lsh banding over word shingles and link sets
+
+    each tweet gets a num_perm minhash signature, split into bands; tweets
+    sharing any band bucket are candidates. a candidate only joins the
+    bucket's first tweet's cluster when the estimated jaccard similarity
+    reaches threshold and, if either has links, they share one. every tweet
+    is compared with at most one tweet per band, so the whole pass is linear.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def features(self, tweet: Dict[str, Any]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """(shingles, normalized urls) of a tweet"""
+        words = tweet_words(tweet)
+        n = self.shingle_size
+        if len(words) >= n:
+            shingles = {' '.join(words[i:i + n]) for i in range(len(words) - n + 1)}
+        else:
+            shingles = {' '.join(words)} if words else set()
+        urls = tweet_urls(tweet)
+        shingles.update('url:' + u for u in urls)
+        return frozenset(shingles), urls
+
+    def signature(self, shingles: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big')
+                  for s in shingles]
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    def similarity(self, sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """estimated jaccard similarity of the two shingle sets"""
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def clusters(self, tweets: List[Dict[str, Any]]) -> List[List[int]]:
+        """groups of tweet indexes, input order, first index of each group is its representative"""
+        sets = _DisjointSet()
+        for _ in self._link(tweets, sets):
+            pass
+
+        groups: Dict[int, List[int]] = {}
+        for idx in range(len(tweets)):
+            groups.setdefault(sets.find(idx), []).append(idx)
+        return list(groups.values())
+
+    def stream(self, tweets: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+        """(tweet, representative id) as tweets are read, None for a tweet that starts a cluster
+
+        a tweet is judged against the tweets before it only, so nothing waits
+        for the rest of the input. signatures are kept, the tweets are not.
+        """
+        sets = _DisjointSet()
+        heads: Dict[int, str] = {}
+        for idx, tweet, root in self._link(tweets, sets):
+            if root == idx:
+                heads[idx] = str(tweet.get('id'))
+                yield tweet, None
+            else:
+                yield tweet, heads[root]
+
+    def _link(self, tweets: Iterable[Dict[str, Any]], sets: _DisjointSet):
+        """add tweets one by one, yielding (index, tweet, root of its cluster so far)"""
+        signatures = {}
+        url_sets = {}
+        buckets = {}
+
+        for tweet in tweets:
+            idx = sets.add()
+            shingles, urls = self.features(tweet)
+            if shingles:  # nothing to compare otherwise, stays on its own
+                signatures[idx] = sig = self.signature(shingles)
+                url_sets[idx] = urls
+
+                for band in range(self.bands):
+                    key = (band, sig[band * self.rows:(band + 1) * self.rows])
+                    first = buckets.setdefault(key, idx)
+                    if first != idx and self._same(first, idx, signatures, url_sets):
+                        sets.union(first, idx)
+            yield idx, tweet, sets.find(idx)
+
+    def _same(self, a: int, b: int, signatures, url_sets) -> bool:
+        # reposts of one collection share its links, same-template posts of different films don't
+        if (url_sets[a] or url_sets[b]) and not url_sets[a] & url_sets[b]:
+            return False
+        return self.similarity(signatures[a], signatures[b]) >= self.threshold
+
+
+def group_near_duplicates(tweets: Iterable[Dict[str, Any]], finder: NearDuplicateFinder = None
+                          ) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """(representatives in input order, other members keyed by representative id)"""
+    finder = finder or NearDuplicateFinder()
+    representatives = []
+    members: Dict[str, List[Dict[str, Any]]] = {}
+    for tweet, head in finder.stream(tweets):
+        if head is None:
+            representatives.append(tweet)
+        else:
+            members.setdefault(head, []).append(tweet)
+    return representatives, members
@@ -0,0 +1,166 @@
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .compression import codec_for
+from . import serializer
+
+# sidecar format: a header line, then one "<tweet id>\t<offset>\t<length>" line
+# per record. offsets are byte positions of the record's line in the jsonl file.
+INDEX_SUFFIX = '.idx'
+INDEX_HEADER = '# bookmark-offset-index v1'
+
+
+def index_path_for(data_path) -> Path:
+    data_path = Path(data_path)
+    return data_path.with_name(data_path.name + INDEX_SUFFIX)
+
+
+def _fingerprint(data_path) -> str:
+    stat = os.stat(data_path)
+    return f"{stat.st_size} {stat.st_mtime_ns}"
+
+
+def _require_plain(data_path):
+    if codec_for(data_path):
+        raise ValueError(f"cannot index compressed file {data_path}, offsets need a plain .jsonl file")
+
+
+def write_index(data_path, entries: Iterable[Tuple[str, int, int]]) -> Path:
+    """write the sidecar for data_path from (id, offset, length) entries"""
+    _require_plain(data_path)
+    index_path = index_path_for(data_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(f"{INDEX_HEADER} {_fingerprint(data_path)}\n")
+        for tweet_id, offset, length in entries:
+            f.write(f"{tweet_id}\t{offset}\t{length}\n")
+    return index_path
+
+
+def iter_records(data_path) -> Iterator[Tuple[str, int, int]]:
+    """scan a jsonl file, yielding (id, offset, length) for each record"""
+    offset = 0
+    with open(data_path, 'rb') as f:
+        for line in f:
+            length = len(line)
+            stripped = line.strip()
+            if stripped:
+                tweet_id = serializer.loads(stripped).get('id')
+                if tweet_id:
+                    yield str(tweet_id), offset, length
+            offset += length
+
+
+def build_index(data_path) -> Path:
+    """(re)build the sidecar index for a jsonl bookmark file"""
+    _require_plain(data_path)
+    return write_index(data_path, list(iter_records(data_path)))
+
+
+def load_index(data_path) -> Optional[Dict[str, Tuple[int, int]]]:
+    """read the sidecar, or None if it is missing or the data file changed"""
+    index_path = index_path_for(data_path)
+    if not index_path.exists():
+        return None
+
+    offsets = {}
+    with open(index_path, 'r', encoding='utf-8') as f:
+        header = f.readline().rstrip('\n')
+        if header != f"{INDEX_HEADER} {_fingerprint(data_path)}":
+            return None
+        for line in f:
+            tweet_id, offset, length = line.rstrip('\n').split('\t')
+            offsets[tweet_id] = (int(offset), int(length))
+    return offsets
+
+
+class OffsetIndexReader:
+    """random access to tweets in a jsonl file by id
+
+    the data file is memory-mapped and only the requested records are
+    decoded, so a lookup costs one dict hit plus one json.loads.
+    """
+
+    def __init__(self, data_path, build: bool = True):
+        self.data_path = Path(data_path)
+        _require_plain(self.data_path)
+
+        offsets = load_index(self.data_path)
+        if offsets is None:
+            if not build:
+                raise FileNotFoundError(f"no up-to-date index for {self.data_path}")
+            build_index(self.data_path)
+            offsets = load_index(self.data_path)
+        self.offsets = offsets
+
+        self._file = open(self.data_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, tweet_id):
+        return str(tweet_id) in self.offsets
+
+    def ids(self) -> List[str]:
+        return list(self.offsets)
+
+    def get(self, tweet_id) -> Optional[Dict]:
+        entry = self.offsets.get(str(tweet_id))
+        if entry is None:
+            return None
+        offset, length = entry
+        return serializer.loads(self._map[offset:offset + length])
+
+    def get_many(self, tweet_ids: Iterable) -> Iterator[Dict]:
+        """yield found tweets in the order asked, skipping unknown ids"""
+        for tweet_id in tweet_ids:
+            tweet = self.get(tweet_id)
+            if tweet is not None:
+                yield tweet
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build or query a tweet id offset index for a jsonl file')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='write <file>.idx next to the jsonl file')
+    build.add_argument('jsonl_file')
+
+    get = sub.add_parser('get', help='print tweets by id')
+    get.add_argument('jsonl_file')
+    get.add_argument('ids', nargs='+')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        path = build_index(args.jsonl_file)
+        print(f"✓ Indexed {args.jsonl_file} -> {path}")
+        return
+
+    with OffsetIndexReader(args.jsonl_file) as reader:
+        for tweet_id in args.ids:
+            tweet = reader.get(tweet_id)
+            if tweet is None:
+                print(f"✗ {tweet_id} not found")
+            else:
+                print(json.dumps(tweet, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# connect time of the last request made on this thread, set by the pools below
+_connect_timing = threading.local()
+
+
+class _TimedHTTPConnection(urllib3.connection.HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """adapter whose pools record how long opening a new connection took"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPPool, 'https': _TimedHTTPSPool}
+
+
+class OllamaClient:
+    """keep-alive http client for one ollama server
+
+    a single requests.Session with a connection pool sized to the number of
+    concurrent extractions, so workers reuse warm tcp connections instead of
+    opening one per call.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", pool_size: int = 1):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = max(1, pool_size)
+
+        self.session = requests.Session()
+        # pool_block makes extra threads wait for a free connection rather
+        # than opening throwaway ones past the pool size
+        adapter = _TimedAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def probe(self, timeout: float = 5) -> Tuple[int, List[str]]:
+        """one /api/tags call that answers both 'is it up' and 'which models'
+
+        returns (status code, model names without tags)
+        """
+        response = self.session.get(self.url('/api/tags'), timeout=timeout)
+        if response.status_code != 200:
+            return response.status_code, []
+        models = [m['name'].split(':')[0] for m in response.json().get('models', [])]
+        return response.status_code, models
+
+    def post(self, path: str, payload: Dict[str, Any], timeout: float,
+             stream: bool = False) -> Tuple[requests.Response, Dict[str, Any]]:
+        """post json, returning the response and client-side timings
+
+        timings has http_s (request start to headers, or full body when not
+        streaming), connect_s (tcp/tls setup, 0 when a pooled connection was
+        reused) and reused.
+        """
+        _connect_timing.seconds = 0.0
+        start = time.perf_counter()
+        response = self.session.post(self.url(path), json=payload, timeout=timeout, stream=stream)
+        http_s = time.perf_counter() - start
+        connect_s = _connect_timing.seconds
+
+        return response, {
+            'http_s': http_s,
+            'connect_s': connect_s,
+            'reused': connect_s == 0.0,
+        }
+
+    def generate(self, payload: Dict[str, Any], timeout: float, stream: bool = False):
+        return self.post('/api/generate', payload, timeout, stream)
+
+    def close(self):
+        self.session.close()
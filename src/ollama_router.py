@@ -0,0 +1,187 @@
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+import requests
+
+from .ollama_client import OllamaClient
+
+
+class Endpoint:
+    """one ollama server behind the router, with its load and health"""
+
+    def __init__(self, url: str, pool_size: int):
+        self.client = OllamaClient(url, pool_size)
+        self.url = self.client.base_url
+        self.in_flight = 0
+        self.latency_s = None  # moving average of successful requests
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = None  # monotonic time, None while healthy
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until is None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'requests': self.requests,
+            'failures': self.failures,
+            'ejections': self.ejections,
+            'latency_s': self.latency_s,
+        }
+
+
+class OllamaRouter:
+    """spreads requests over several ollama servers
+
+    drop-in for OllamaClient. each request goes to the healthy endpoint with
+    the least load, counting requests in flight plus recent failures, ties
+    broken by average latency. an endpoint that fails eject_after times in a
+    row is taken out for cooldown seconds and only comes back once a
+    /api/tags probe succeeds.
+    """
+
+    def __init__(self, urls: List[str], pool_size: int = 1, eject_after: int = 3,
+                 cooldown: float = 30.0, smoothing: float = 0.3):
+        self.endpoints = [Endpoint(url, pool_size) for url in urls]
+        self.eject_after = eject_after
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return ', '.join(e.url for e in self.endpoints)
+
+    def probe(self, timeout: float = 5) -> Tuple[int, List[str]]:
+        """probe every endpoint, unreachable ones start out ejected
+
+        returns 200 and the models every reachable endpoint has, or the
+        first failure when none is reachable.
+        """
+        models = None
+        failure = None
+        for endpoint in self.endpoints:
+            try:
+                status, available = endpoint.client.probe(timeout)
+            except requests.exceptions.RequestException as e:
+                failure = failure or e
+                self._eject(endpoint)
+                continue
+            if status != 200:
+                failure = failure or status
+                self._eject(endpoint)
+                continue
+            models = set(available) if models is None else models & set(available)
+
+        if models is None:
+            if isinstance(failure, Exception):
+                raise failure
+            return failure, []
+        return 200, sorted(models)
+
+    def post(self, path: str, payload: Dict[str, Any], timeout: float,
+             stream: bool = False) -> Tuple[requests.Response, Dict[str, Any]]:
+        endpoint = self._acquire()
+        released = threading.Event()
+
+        def release(ok, latency=None):
+            if not released.is_set():
+                released.set()
+                self._release(endpoint, ok, latency)
+
+        try:
+            response, timings = endpoint.client.post(path, payload, timeout, stream)
+        except requests.exceptions.RequestException:
+            release(False)
+            raise
+
+        timings['endpoint'] = endpoint.url
+        # an overloaded server answers 429 fast, that speed must not draw more work to it
+        ok = response.status_code != 429 and response.status_code < 500
+        if not stream:
+            release(ok, timings['http_s'])
+        else:
+            # a streamed request is in flight until its body is closed
+            close = response.close
+            started = time.perf_counter() - timings['http_s']
+
+            def close_and_release():
+                close()
+                release(ok, time.perf_counter() - started)
+            response.close = close_and_release
+        return response, timings
+
+    def generate(self, payload: Dict[str, Any], timeout: float, stream: bool = False):
+        return self.post('/api/generate', payload, timeout, stream)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e.stats() for e in self.endpoints]
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def _acquire(self) -> Endpoint:
+        """least-loaded healthy endpoint, re-admitting recovered ones on the way"""
+        now = time.monotonic()
+        with self._lock:
+            due = [e for e in self.endpoints if not e.healthy and e.ejected_until <= now]
+            for endpoint in due:
+                # nobody else probes it meanwhile
+                endpoint.ejected_until = now + self.cooldown
+
+        for endpoint in due:
+            self._try_readmit(endpoint)
+
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy]
+            if not healthy:
+                raise requests.exceptions.ConnectionError("no healthy Ollama endpoint")
+            # recent failures count as load, so a failing endpoint that answers
+            # fast doesn't soak up the retries
+            endpoint = min(healthy, key=lambda e: (e.in_flight + e.consecutive_failures,
+                                                   e.consecutive_failures, e.latency_s or 0.0))
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _try_readmit(self, endpoint: Endpoint):
+        try:
+            status, _ = endpoint.client.probe(timeout=2)
+        except requests.exceptions.RequestException:
+            return
+        if status == 200:
+            with self._lock:
+                endpoint.ejected_until = None
+                endpoint.consecutive_failures = 0
+
+    def _release(self, endpoint: Endpoint, ok: bool, latency: float = None):
+        with self._lock:
+            endpoint.in_flight -= 1
+            if ok:
+                endpoint.consecutive_failures = 0
+                if latency is not None:
+                    if endpoint.latency_s is None:
+                        endpoint.latency_s = latency
+                    else:
+                        endpoint.latency_s += self.smoothing * (latency - endpoint.latency_s)
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.eject_after and endpoint.healthy:
+                self._eject_locked(endpoint)
+
+    def _eject(self, endpoint: Endpoint):
+        with self._lock:
+            self._eject_locked(endpoint)
+
+    def _eject_locked(self, endpoint: Endpoint):
+        endpoint.ejected_until = time.monotonic() + self.cooldown
+        endpoint.ejections += 1
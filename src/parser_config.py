@@ -0,0 +1,17 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'parser.config.json'
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_parser_config(path=None) -> Dict[str, Any]:
+    """rule parser settings shared with the node parser (config/parser.config.json)"""
+    return _load(str(Path(path or DEFAULT_CONFIG_PATH).resolve()))
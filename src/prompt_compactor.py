@@ -0,0 +1,94 @@
+import re
+import threading
+from typing import Any, Dict, List
+from urllib.parse import unquote, urlsplit, urlunsplit
+from .url_repair import TRAILING_PUNCT_RE, URL_RE, repair_broken_urls
+
+# query parameters that only track where a click came from; short or generic
+# names (t, s, ref, feature) can be real parameters on some host, so they stay
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'si'})
+TRACKING_PREFIXES = ('utm_',)
+
+SPACES_RE = re.compile(r'[ \t ​]+')
+# close enough to a bpe tokenizer on tweet text to compare prompts with each other
+TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def estimate_tokens(text: str) -> int:
+    return len(TOKEN_RE.findall(text))
+
+
+def is_tracking_param(name: str) -> bool:
+    name = unquote(name).lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def compact_url(url: str) -> str:
+    """url without tracking parameters, the fragment (mega keys live there) is kept
+
+    the other parameters are kept byte for byte, nothing is decoded and encoded again.
+    """
+    url = TRAILING_PUNCT_RE.sub('', url)
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = '&'.join(param for param in parts.query.split('&')
+                     if param and not is_tracking_param(param.partition('=')[0]))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+
+
+def compact_text(text: str) -> str:
+    """broken urls rejoined and untracked, runs of spaces and blank lines dropped"""
+    text = URL_RE.sub(lambda m: compact_url(m.group(0)), repair_broken_urls(text or ''))
+    lines = (SPACES_RE.sub(' ', line).strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+class PromptCompactor:
+    """short tweet blocks for the model, with a running count of what it saved
+
+    the author line goes (titles matching the author are filtered after the
+    answer anyway), empty sections go, and links already written in the text
+    aren't listed again. token counts are estimates, see estimate_tokens.
+    """
+
+    def __init__(self):
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def block(self, tweet: Dict[str, Any]) -> str:
+        text = compact_text(tweet.get('text'))
+        quoted = compact_text(tweet.get('quoted_text'))
+        in_text = set(URL_RE.findall(text + '\n' + quoted))
+
+        urls: List[str] = []
+        for url in list(tweet.get('links') or []) + list(tweet.get('quoted_links') or []):
+            url = compact_url(url)
+            if url not in in_text and url not in urls:
+                urls.append(url)
+
+        parts = [f"TEXT:\n{text}"]
+        if quoted:
+            parts.append(f"QUOTED:\n{quoted}")
+        if urls:
+            parts.append(f"URLS: {' '.join(urls)}")
+        return '\n'.join(parts)
+
+    def record(self, before: str, after: str):
+        """count one prompt as it would have been and as it was sent"""
+        before, after = estimate_tokens(before), estimate_tokens(after)
+        with self._lock:
+            self.prompts += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'prompts': self.prompts,
+                'tokens_before': self.tokens_before,
+                'tokens_after': self.tokens_after,
+                'saved': 1 - self.tokens_after / self.tokens_before if self.tokens_before else None,
+            }
@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class BudgetExhausted(Exception):
+    """the run's time budget is used up, no more requests should go out"""
+
+
+class CircuitBreaker:
+    """stops dispatch for a while after a run of consecutive failures
+
+    closed: requests flow. open: everyone waits for the cooldown. half-open:
+    one probe request goes through, success closes the breaker, failure
+    opens it again with a doubled cooldown.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.trips = 0
+        self._probing = False
+        self._cond = threading.Condition()
+
+    def acquire(self, deadline: Optional[float] = None):
+        """wait until a request may go out, BudgetExhausted if the deadline comes first"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    raise BudgetExhausted()
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.OPEN and now >= self.open_until:
+                    self.state = self.HALF_OPEN
+                if self.state == self.HALF_OPEN and not self._probing:
+                    self._probing = True
+                    return
+
+                # open: sleep out the cooldown, half-open: wait for the probe's outcome
+                wait = self.open_until - now if self.state == self.OPEN else 1.0
+                if deadline is not None:
+                    wait = min(wait, deadline - now)
+                self._cond.wait(max(wait, 0.01))
+
+    def record_success(self):
+        with self._cond:
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.state = self.CLOSED
+            self._probing = False
+            self._cond.notify_all()
+
+    def release(self):
+        """an attempt that says nothing about the server (4xx, unparsable answer)
+
+        leaves state and failure count alone, only hands a half-open probe
+        on to the next caller.
+        """
+        with self._cond:
+            if self._probing:
+                self._probing = False
+                self._cond.notify_all()
+
+    def record_failure(self) -> bool:
+        """count a failure, True when it (re)opened the breaker"""
+        with self._cond:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            elif self.state == self.OPEN or self.failures < self.threshold:
+                return False
+
+            self.state = self.OPEN
+            self.open_until = time.monotonic() + self.cooldown
+            self.trips += 1
+            self._probing = False
+            self._cond.notify_all()
+            return True
+
+
+class RetryPolicy:
+    """attempts, backoff and timeouts for model requests
+
+    - backoff is exponential with full jitter, so workers that failed together
+      don't come back together
+    - once enough requests succeeded, the timeout follows the observed p95
+      latency (times a safety factor) instead of the fixed worst case
+    - nothing waits or times out past the run deadline
+    - a shared circuit breaker pauses dispatch while the server is down or
+      overloaded
+    """
+
+    def __init__(self, max_attempts: int = 3, timeout: float = 180, min_timeout: float = 15,
+                 base_delay: float = 1.0, max_delay: float = 30.0, timeout_factor: float = 3.0,
+                 min_samples: int = 10, budget_s: float = None, breaker: CircuitBreaker = None):
+        self.max_attempts = max(1, max_attempts)
+        self.max_timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout_factor = timeout_factor
+        self.min_samples = min_samples
+        self.deadline = time.monotonic() + budget_s if budget_s else None
+        self.breaker = breaker or CircuitBreaker()
+
+        self.latencies = deque(maxlen=200)
+        self.failed_attempts = 0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """seconds left in the run budget, None without a budget"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        """True once the run deadline has passed"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def acquire(self):
+        """block while the breaker is open, raises BudgetExhausted past the deadline"""
+        self.breaker.acquire(self.deadline)
+
+    def timeout(self, timeouts: int = 0) -> float:
+        """timeout for the next attempt, doubled for each earlier attempt of it that timed out"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        timeout = self.max_timeout
+        if len(samples) >= self.min_samples:
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            timeout = min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor) * 2 ** timeouts)
+
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        return timeout
+
+    def backoff(self, attempt: int) -> float:
+        """full-jitter delay after a failed attempt (1-based), None if it would overrun the budget"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+    def record_success(self, latency: float = None):
+        """count a good answer, latency None when it shouldn't shape the timeout"""
+        if latency is not None:
+            with self._lock:
+                self.latencies.append(latency)
+        self.breaker.record_success()
+
+    def release(self):
+        """an attempt that neither succeeded nor points at the server, see CircuitBreaker.release"""
+        self.breaker.release()
+
+    def record_failure(self) -> bool:
+        """count a failed attempt, True when it opened the circuit breaker"""
+        with self._lock:
+            self.failed_attempts += 1
+        return self.breaker.record_failure()
+
+    def stats(self) -> dict:
+        return {
+            'failed_attempts': self.failed_attempts,
+            'breaker_trips': self.breaker.trips,
+            'current_timeout_s': self.timeout(),
+        }
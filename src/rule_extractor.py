@@ -0,0 +1,170 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from .extractors import Extractors
+from .gazetteer import Gazetteer, normalize_title
+from .parser_config import load_parser_config
+from .url_repair import collect_urls
+
+# matches "Title (1999)" / "Title (1975-77)" at the start of a line
+TITLE_YEAR_LINE_RE = re.compile(r'^\s*([^(\n]+?)\s*\((\d{4})(?:\s*[-–]\s*\d{2,4})?\)', re.MULTILINE)
+# any "(1999)" / "(1975-77)", wherever it is: two of them are two titles
+YEAR_PAREN_RE = re.compile(r'\((\d{4})(?:\s*[-–]\s*\d{2,4})?\)')
+
+# what is left on a title that isn't part of it: "[4K Restoration]", "John Carpenter - ..."
+BRACKET_TAG_RE = re.compile(r'[\[\]{}]')
+CREDIT_PREFIX_RE = re.compile(r'^[^\n]+?\s[-–—]\s')
+
+# anything past latin extended-b, e.g. small caps "sᴛᴇᴘʜᴇɴ"
+UNFOLDED_LETTER_RE = re.compile(r'[^\u0000-\u024f]')
+
+# keywords that say something about the file but are not a video quality
+NON_QUALITY_KEYWORDS = {'gb', 'tb', 'collection'}
+
+# url_domains that point at a review page rather than the files
+REVIEW_HOSTS = {'boxd.it'}
+
+# ids a known title brings along
+KNOWN_IDS = ('wikidata_id', 'imdb_id', 'steam_id')
+
+# extractors.extract_type names -> the TYPE wording the model uses
+TYPE_LABELS = {
+    'film': 'Movie',
+    'tv series': 'TV Series',
+    'tv film': 'TV Movie',
+    'documentary': 'Documentary',
+    'game': 'Game',
+    'manga': 'Manga',
+    'book': 'Book',
+}
+
+
+class RuleExtractor:
+    """deterministic first tier in front of the model
+
+    ports the title/quality/type rules from the node parser. it only
+    answers when a tweet is formulaic enough to be sure, e.g.
+    "Title (1999) 1080p gofile.io/...", and returns None otherwise so the
+    tweet goes on to the model.
+
+    with a gazetteer, titles it knows come out in their canonical spelling
+    with their ids, and extract_known answers tweets that aren't formulaic
+    but name a known title.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, gazetteer: Gazetteer = None):
+        self.config = config or load_parser_config()
+        self.extractors = Extractors(self.config)
+        self.url_domains = [d.lower() for d in self.config['url_domains']]
+        self.gazetteer = gazetteer
+
+    def host_urls(self, tweet: Dict[str, Any]) -> List[str]:
+        """file-host urls from links, quoted links and the text, wrapped urls repaired"""
+        unified = '\n'.join(t for t in (tweet.get('text'), tweet.get('quoted_text')) if t)
+        urls = []
+        for url in collect_urls(tweet, unified):
+            # truncated display urls ("gofile.io/d/…") and folder links that
+            # lost their id to a line wrap are no use as links
+            parsed = urlparse(url)
+            if url.endswith('…') or parsed.path.endswith('/'):
+                continue
+            host = parsed.netloc.lower()
+            # review pages (letterboxd) aren't the files
+            if host in REVIEW_HOSTS:
+                continue
+            if any(host == d or host.endswith('.' + d) for d in self.url_domains):
+                urls.append(url)
+        return urls
+
+    def extract(self, tweet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """high-confidence extraction in the model's output shape, or None"""
+        # fold styled unicode (𝐓𝒉𝒆 → The) so the patterns can see the title
+        text = unicodedata.normalize('NFKC', tweet.get('text') or '')
+
+        # exactly one "Title (Year)" line and no other year in parentheses anywhere,
+        # "Silent Hill (2006) & Silent Hill: Revelation (2012)" is for the model to sort out
+        if len(TITLE_YEAR_LINE_RE.findall(text)) != 1 or len(YEAR_PAREN_RE.findall(text)) != 1:
+            return None
+
+        title_data = self.extractors.extract_title(text)
+        if not title_data or not title_data.get('year'):
+            return None
+
+        quality = [q for q in self.extractors.extract_quality(text)
+                   if q.lower() not in NON_QUALITY_KEYWORDS]
+        if not quality:
+            return None
+
+        urls = self.host_urls(tweet)
+        if not urls:
+            return None
+
+        title = title_data['title'].strip('"\'“”')
+        # styled letters nfkc can't fold (small caps etc.) are left to the model
+        if UNFOLDED_LETTER_RE.search(title):
+            return None
+        # tags and credits around the title make it a guess
+        if BRACKET_TAG_RE.search(title) or CREDIT_PREFIX_RE.search(title):
+            return None
+
+        type_name = self.extractors.extract_type(text)
+
+        extraction = {
+            "titles": [title],
+            "urls": urls,
+            "quality": quality,
+            "type": [TYPE_LABELS.get(type_name, type_name)] if type_name else [],
+            "summary": "",
+            "year": title_data['year'],
+            "source": "rules",
+            "raw_response": None,
+        }
+        known = self.gazetteer.lookup(title, title_data['year']) if self.gazetteer is not None else None
+        return self._with_known(extraction, known) if known else extraction
+
+    def extract_known(self, tweet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """extraction for a tweet whose title the gazetteer knows, or None
+
+        the title has to be the tweet's whole first line, a year in parentheses
+        aside (one at most in the tweet), so a collection that happens to start
+        with a known title still goes to the model. the rest comes from the
+        tweet like in extract but nothing else is required.
+        """
+        if self.gazetteer is None:
+            return None
+        text = unicodedata.normalize('NFKC', tweet.get('text') or '')
+        if len(TITLE_YEAR_LINE_RE.findall(text)) > 1:
+            return None
+
+        title_data = self.extractors.extract_title(text)
+        if not title_data:
+            return None
+        lead = next((line for line in text.splitlines() if line.strip()), '')
+        if normalize_title(YEAR_PAREN_RE.sub(' ', lead)) != normalize_title(title_data['title']):
+            return None
+        year = title_data.get('year') or self.extractors.extract_year(text)
+        known = self.gazetteer.lookup(title_data['title'].strip('"\'“”'), year)
+        if not known:
+            return None
+
+        type_name = self.extractors.extract_type(text)
+        return self._with_known({
+            "titles": [known['title']],
+            "urls": self.host_urls(tweet),
+            "quality": [q for q in self.extractors.extract_quality(text)
+                        if q.lower() not in NON_QUALITY_KEYWORDS],
+            "type": [TYPE_LABELS.get(type_name, type_name)] if type_name else [],
+            "summary": "",
+            "year": year,
+            "source": "gazetteer",
+            "raw_response": None,
+        }, known)
+
+    def _with_known(self, extraction: Dict[str, Any], known: Dict[str, Any]) -> Dict[str, Any]:
+        """canonical title, year, type and ids of a gazetteer entry merged in"""
+        extraction = {**extraction, "titles": [known['title']], "year": known.get('year') or extraction['year']}
+        if not extraction['type'] and known.get('type') in TYPE_LABELS:
+            extraction['type'] = [TYPE_LABELS[known['type']]]
+        extraction.update({key: known[key] for key in KNOWN_IDS if known.get(key)})
+        return extraction
@@ -0,0 +1,55 @@
+import json
+from typing import Any, BinaryIO, Iterable
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used when missing
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """encode to utf-8 bytes, compact unless pretty is asked for"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data) -> Any:
+    """decode bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj: Any, fp: BinaryIO, pretty: bool = False):
+    """write obj to a binary file object"""
+    fp.write(dumps(obj, pretty))
+
+
+def load(fp) -> Any:
+    """read a whole json document from a binary or text file object"""
+    return loads(fp.read())
+
+
+def dump_array(items: Iterable[Any], fp: BinaryIO, pretty: bool = False):
+    """stream a json array item by item, nothing is encoded in full"""
+    if pretty:
+        # items sit one level in, the same layout as indenting the whole list
+        start, separator, end = b'[\n  ', b',\n  ', b'\n]'
+    else:
+        start, separator, end = b'[', b',', b']'
+
+    opened = False
+    for item in items:
+        data = dumps(item, pretty)
+        if pretty:
+            # encoded strings never hold a raw newline, only layout does
+            data = data.replace(b'\n', b'\n  ')
+        fp.write(separator if opened else start)
+        fp.write(data)
+        opened = True
+    fp.write(end if opened else b'[]')
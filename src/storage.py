@@ -1,73 +1,160 @@
-import json
+import asyncio
 import csv
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Iterable, Iterator
 import aiofiles
+from .compression import codec_for, codec_suffix, open_file
+from .offset_index import write_index
+from . import serializer
+
+CSV_FIELDS = ['id', 'author', 'text', 'links', 'has_quote', 'quoted_text', 'quoted_links']
 
 class BookmarkStorage:
-    def __init__(self, base_dir: Path):
+    def __init__(self, base_dir: Path, compression: str = None, pretty: bool = False):
         self.base_dir = base_dir
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # appended to default filenames, e.g. '.zst' -> bookmarks_<ts>.json.zst
+        self.suffix = codec_suffix(compression)
+        # compact output by default, indent only for files meant to be read by people
+        self.pretty = pretty
     
     async def save_json(self, data: List[Dict], filename: str = None):
         """save bookmarks as json"""
-        filename = filename or f'bookmarks_{self.timestamp}.json'
+        filename = filename or f'bookmarks_{self.timestamp}.json{self.suffix}'
+        filepath = self.base_dir / filename
+        
+        if codec_for(filepath):
+            # compressed output is encoded incrementally off the event loop
+            await asyncio.to_thread(self._write_json, filepath, data)
+        else:
+            async with aiofiles.open(filepath, 'wb') as f:
+                await f.write(serializer.dumps(data, self.pretty))
+        
+        return filepath
+    
+    def _write_json(self, filepath: Path, data):
+        with open_file(filepath, 'wb') as f:
+            serializer.dump_array(data, f, self.pretty)
+    
+    def save_jsonl(self, data: Iterable[Dict], filename: str = None, index: bool = False):
+        """save bookmarks as json lines, one tweet per line
+        
+        with index=True an id -> byte offset sidecar is written alongside
+        (plain files only), see offset_index.OffsetIndexReader
+        """
+        filename = filename or f'bookmarks_{self.timestamp}.jsonl{self.suffix}'
         filepath = self.base_dir / filename
+        index = index and not codec_for(filepath)
+        entries = []
+        offset = 0
         
-        async with aiofiles.open(filepath, 'w') as f:
-            await f.write(json.dumps(data, indent=2, ensure_ascii=False))
+        with open_file(filepath, 'wb') as f:
+            for tweet in data:
+                line = serializer.dumps(tweet) + b'\n'
+                f.write(line)
+                if index and tweet.get('id'):
+                    entries.append((str(tweet['id']), offset, len(line)))
+                offset += len(line)
+        
+        if index:
+            write_index(filepath, entries)
         
         return filepath
     
+    def save_export(self, tweets: Iterable[Dict], filename: str, meta: Dict = None,
+                    after: Callable[[], Dict] = None):
+        """save tweets in the browser export shape ({..., "tweets": [...]}), streaming
+
+        after is called once the tweets are written, its keys go after the array
+        (totals that are only known at the end).
+        """
+        filepath = self.base_dir / filename
+        count = 0
+        
+        with open_file(filepath, 'wb') as f:
+            f.write(b'{\n')
+            for key, value in (meta or {}).items():
+                f.write(b'  ' + serializer.dumps(key) + b': ' + serializer.dumps(value) + b',\n')
+            f.write(b'  "tweets": [')
+            for tweet in tweets:
+                f.write(b',\n    ' if count else b'\n    ')
+                f.write(serializer.dumps(tweet))
+                count += 1
+            f.write(b'\n  ]')
+            for key, value in (after() if after else {}).items():
+                f.write(b',\n  ' + serializer.dumps(key) + b': ' + serializer.dumps(value))
+            f.write(b'\n}\n')
+        
+        return filepath, count
+    
     def save_csv(self, data: List[Dict], filename: str = None):
         """save bookmarks as csv"""
-        filename = filename or f'bookmarks_{self.timestamp}.csv'
+        filename = filename or f'bookmarks_{self.timestamp}.csv{self.suffix}'
         filepath = self.base_dir / filename
         
         if not data:
             return None
         
-        # flatten nested data
-        flat_data = []
-        for tweet in data:
-            flat_tweet = {
-                'id': tweet.get('id'),
-                'author': tweet.get('author'),
-                'text': tweet.get('text'),
-                'links': '|'.join(tweet.get('links', [])),
-                'has_quote': tweet.get('has_quote'),
-                'quoted_text': tweet.get('quoted_text'),
-                'quoted_links': '|'.join(tweet.get('quoted_links', []))
-            }
-            flat_data.append(flat_tweet)
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=flat_data[0].keys())
+        with open_file(filepath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
             writer.writeheader()
-            writer.writerows(flat_data)
+            # flatten nested data row by row
+            writer.writerows(self._flatten(tweet) for tweet in data)
         
         return filepath
     
+    def _flatten(self, tweet: Dict) -> Dict:
+        return {
+            'id': tweet.get('id'),
+            'author': tweet.get('author'),
+            'text': tweet.get('text'),
+            'links': '|'.join(tweet.get('links', [])),
+            'has_quote': tweet.get('has_quote'),
+            'quoted_text': tweet.get('quoted_text'),
+            'quoted_links': '|'.join(tweet.get('quoted_links', []))
+        }
+    
+    def load_json(self, filename) -> List[Dict]:
+        """load a json file, compressed or not"""
+        with open_file(self.base_dir / filename, 'rb') as f:
+            return serializer.load(f)
+    
+    def iter_jsonl(self, filename) -> Iterator[Dict]:
+        """stream tweets from a json lines file, compressed or not"""
+        with open_file(self.base_dir / filename, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield serializer.loads(line)
+    
+    def iter_csv(self, filename) -> Iterator[Dict]:
+        """stream rows back from a csv written by save_csv"""
+        with open_file(self.base_dir / filename, newline='') as f:
+            for row in csv.DictReader(f):
+                row['links'] = [l for l in row['links'].split('|') if l]
+                row['quoted_links'] = [l for l in row['quoted_links'].split('|') if l]
+                yield row
+    
     async def save_categorized(self, categorized: Dict):
         """save categorized tweets"""
         # save year mentions
         if categorized['year_mentions']:
             await self.save_json(categorized['year_mentions'], 
-                               f'filtered/year_mentions_{self.timestamp}.json')
+                               f'filtered/year_mentions_{self.timestamp}.json{self.suffix}')
         
         # save movie mentions
         if categorized['movie_mentions']:
             await self.save_json(categorized['movie_mentions'], 
-                               f'filtered/movie_mentions_{self.timestamp}.json')
+                               f'filtered/movie_mentions_{self.timestamp}.json{self.suffix}')
         
         # save both
         if categorized['both_year_and_movie']:
             await self.save_json(categorized['both_year_and_movie'], 
-                               f'filtered/year_and_movie_{self.timestamp}.json')
+                               f'filtered/year_and_movie_{self.timestamp}.json{self.suffix}')
         
         # save by domain
         for domain, tweets in categorized['domain_matches'].items():
             if tweets:
-                filename = f'filtered/{domain.replace(".", "_")}_{self.timestamp}.json'
-                await self.save_json(tweets, filename)
\ No newline at end of file
+                filename = f'filtered/{domain.replace(".", "_")}_{self.timestamp}.json{self.suffix}'
+                await self.save_json(tweets, filename)
@@ -0,0 +1,96 @@
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from . import serializer
+from .telemetry import ollama_timings
+
+# the line-format answer is complete once every one of these has been written out
+ANSWER_FIELDS = ('TITLE', 'URL', 'QUALITY', 'TYPE', 'SUMMARY')
+
+
+class FieldTracker:
+    """follows a streamed TITLE:/URL:/... answer and says when all fields are in
+
+    a field only counts once its line is finished (a newline came after it),
+    so a summary that is still being written is never cut off.
+    """
+
+    def __init__(self, fields: Iterable[str] = ANSWER_FIELDS):
+        self.fields = frozenset(fields)
+        self.seen = set()
+        self.text = ''
+        self._scanned = 0
+
+    def feed(self, chunk: str) -> bool:
+        """add streamed text, True once every field line is complete"""
+        self.text += chunk
+        end = self.text.rfind('\n')
+        if end >= self._scanned:
+            for line in self.text[self._scanned:end].split('\n'):
+                name, sep, _ = line.strip().partition(':')
+                if sep and name in self.fields:
+                    self.seen.add(name)
+            self._scanned = end + 1
+        return self.complete
+
+    @property
+    def complete(self) -> bool:
+        return self.seen == self.fields
+
+
+def read_generate_stream(response, started: float, early_stop: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """read an ollama ndjson /api/generate stream
+
+    started is the perf_counter() taken before the request went out. returns
+    the text and timings: ttft_s (first token), complete_s (last token read),
+    tokens, early_stop when the connection was closed before the model
+    finished because every field was already there, and ollama's own
+    timings from the final chunk when the stream was read to the end. a body
+    that stalls for longer than the read timeout raises requests' ReadTimeout,
+    like a request that never got its headers.
+    """
+    tracker = FieldTracker()
+    ttft_s = None
+    tokens = 0
+    stopped = False
+    server = {}
+
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = serializer.loads(line)
+            if chunk.get('error'):
+                raise RuntimeError(chunk['error'])
+
+            token = chunk.get('response', '')
+            if token:
+                if ttft_s is None:
+                    ttft_s = time.perf_counter() - started
+                tokens += 1
+                if tracker.feed(token) and early_stop:
+                    stopped = True
+                    break
+            if chunk.get('done'):
+                server = ollama_timings(chunk)
+            # past the done chunk the server ends the body, reading to the end
+            # hands the connection back to the pool
+    except requests.exceptions.ConnectionError as e:
+        # requests wraps a read timeout inside the body as a connection error
+        if e.args and isinstance(e.args[0], ReadTimeoutError):
+            raise requests.exceptions.ReadTimeout(*e.args, response=response) from e
+        raise
+    finally:
+        # an early stop leaves the body unread, closing drops that connection
+        response.close()
+
+    return tracker.text, {
+        'ttft_s': ttft_s,
+        'complete_s': time.perf_counter() - started,
+        'tokens': tokens,
+        'early_stop': stopped,
+        **server,
+    }
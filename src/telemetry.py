@@ -0,0 +1,116 @@
+import math
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from . import serializer
+
+# ollama reports these in nanoseconds on every finished generate response
+OLLAMA_DURATIONS = {
+    'total_duration': 'total_s',
+    'load_duration': 'load_s',
+    'prompt_eval_duration': 'prompt_eval_s',
+    'eval_duration': 'eval_s',
+}
+OLLAMA_COUNTS = ('prompt_eval_count', 'eval_count')
+
+
+def ollama_timings(result: Dict[str, Any]) -> Dict[str, Any]:
+    """server-side timings of a generate response, durations in seconds"""
+    timings = {}
+    for field, name in OLLAMA_DURATIONS.items():
+        if result.get(field) is not None:
+            timings[name] = result[field] / 1e9
+    for field in OLLAMA_COUNTS:
+        if result.get(field) is not None:
+            timings[field] = result[field]
+    return timings
+
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> Optional[Dict[str, float]]:
+    """nearest-rank percentiles, None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        result[f'p{p}'] = ordered[rank - 1]
+    return result
+
+
+class Telemetry:
+    """per-request metrics of a run
+
+    every model request becomes one record: client side (queue_s, http_s,
+    connect_s, reused, status) plus whatever ollama reported (total_s,
+    load_s, prompt_eval_count/_s, eval_count/_s). records are kept for the
+    summary and, with a path, appended to a jsonl metrics file as they come.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, path=None, resume: bool = False):
+        """start writing metrics, at path if given; a fresh run truncates, a resumed run appends"""
+        if path is not None:
+            self.path = Path(path)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if resume:
+                self._drop_torn_tail()
+            self._file = open(self.path, 'ab' if resume else 'wb')
+        return self
+
+    def _drop_torn_tail(self):
+        """cut off a half-written last record left by a crash mid-write"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def record(self, record: Dict[str, Any]):
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(serializer.dumps(record) + b'\n')
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def summary(self) -> Dict[str, Any]:
+        """latency percentiles, throughput and where the time went"""
+        with self._lock:
+            records = list(self.records)
+        ok = [r for r in records if r.get('status') == 200]
+
+        def values(key, source=ok):
+            return [r[key] for r in source if r.get(key) is not None]
+
+        prompt_tokens = sum(values('prompt_eval_count'))
+        prompt_s = sum(values('prompt_eval_s'))
+        gen_tokens = sum(values('eval_count'))
+        gen_s = sum(values('eval_s'))
+
+        return {
+            'requests': len(records),
+            'failed_requests': len(records) - len(ok),
+            # request start to answer on the client, includes the network and ollama's own queue
+            'latency_s': percentiles([r.get('complete_s', r['http_s']) for r in ok if 'http_s' in r]),
+            'queue_s': percentiles(values('queue_s', records)),
+            'server_total_s': percentiles(values('total_s')),
+            'load_s_total': sum(values('load_s')),
+            'prompt_tokens': prompt_tokens,
+            'generated_tokens': gen_tokens,
+            'prompt_tokens_per_s': prompt_tokens / prompt_s if prompt_s else None,
+            'generated_tokens_per_s': gen_tokens / gen_s if gen_s else None,
+            # share of model time spent reading prompts rather than writing answers
+            'prompt_share': prompt_s / (prompt_s + gen_s) if prompt_s + gen_s else None,
+        }
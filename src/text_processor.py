@@ -0,0 +1,44 @@
+# python port of src/textProcessor.js, keep the two in step
+import re
+from typing import Any, Dict, List
+
+PROTOCOL_BREAK_RE = re.compile(r'(https?://)\s*\n\s*', re.IGNORECASE)
+SPACES_RE = re.compile(r'[ \t]+')
+
+
+class TextProcessor:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.block_delimiters = config['block_delimiters']
+
+    def unify_text(self, main_text: str, quoted_text: str) -> str:
+        unified = main_text or ''
+        if quoted_text:
+            unified += '\n---QUOTED TWEET---\n' + quoted_text
+        return unified
+
+    def normalize(self, text: str) -> str:
+        # lowercase for matching
+        normalized = text.lower()
+
+        # fix URLs split by line breaks FIRST
+        normalized = PROTOCOL_BREAK_RE.sub(r'\1', normalized)
+
+        # (the js quote cleanup maps ascii quotes onto themselves, nothing to port)
+
+        # normalize whitespace (but preserve structure)
+        normalized = normalized.replace('\r\n', '\n')
+        return SPACES_RE.sub(' ', normalized)
+
+    def split_into_blocks(self, text: str) -> List[str]:
+        # try each delimiter in order
+        for delimiter in self.block_delimiters:
+            blocks = [b.strip() for b in text.split(delimiter)]
+            blocks = [b for b in blocks if b]
+
+            # if we got meaningful blocks, use them
+            if len(blocks) > 1:
+                return blocks
+
+        # fallback: treat entire text as one block
+        return [text]
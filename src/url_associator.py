@@ -0,0 +1,52 @@
+# python port of src/urlAssociator.js, keep the two in step
+from typing import Any, Dict, List, Set
+from urllib.parse import urlsplit
+
+
+class UrlAssociator:
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def associate(self, block: str, all_urls: List[str], used_urls: Set[str]) -> List[str]:
+        associated_urls = []
+        block_lower = block.lower()
+
+        # scan block for urls
+        for url in all_urls:
+            if url in used_urls:
+                continue
+
+            # check if url appears in this block (case-insensitive)
+            if url.lower() in block_lower or self.fuzzy_url_match(block_lower, url):
+                associated_urls.append(url)  # use original url, not lowercase
+                used_urls.add(url)
+
+        # if no urls found in block, try order-based fallback
+        if not associated_urls and all_urls:
+            for url in all_urls:
+                if url not in used_urls:
+                    associated_urls.append(url)
+                    used_urls.add(url)
+                    break
+
+        return associated_urls
+
+    def fuzzy_url_match(self, text: str, url: str) -> bool:
+        try:
+            parts = urlsplit(url)
+            hostname = parts.hostname
+        except ValueError:
+            return False  # invalid url
+        if not hostname:
+            return False
+
+        domain = hostname.replace('www.', '', 1)
+        if domain in text:
+            return True
+
+        # check path segments
+        for part in parts.path.split('/'):
+            if len(part) > 3 and part.lower() in text:
+                return True
+
+        return False
@@ -0,0 +1,85 @@
+# python port of the url helpers in src/parser.js, keep the two in step
+import re
+from typing import Any, Dict, List
+
+URL_RE = re.compile(r'https?://[^\s\])<>(“”"\'’]+', re.IGNORECASE)
+TRAILING_PUNCT_RE = re.compile(r'[.,;:!?]+$')
+
+BARE_PROTOCOL_RE = re.compile(r'^https?://$', re.IGNORECASE)
+NEW_LABEL_RE = re.compile(r'^(https?://|\w+:)', re.IGNORECASE)
+LOOKS_DONE_RE = re.compile(r'[.…\s]')
+ENDS_WITH_SLASH_RE = re.compile(r'https?://\S+/$', re.IGNORECASE)
+PATH_TAIL_RE = re.compile(r'^[A-Za-z0-9/?&=_.-]+(\?.*)?$')
+URL_AT_END_RE = re.compile(r'https?://\S+$', re.IGNORECASE)
+ID_TAIL_RE = re.compile(r'^[A-Za-z0-9_/?&=.-]+$')
+STARTS_WITH_PROTOCOL_RE = re.compile(r'^https?://', re.IGNORECASE)
+LINE_SPLIT_RE = re.compile(r'\r?\n')
+
+
+def repair_broken_urls(text: str) -> str:
+    """re-join urls that the scraper saw wrapped over several lines"""
+    lines = LINE_SPLIT_RE.split(text)
+    out = []
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        trimmed = line.strip()
+
+        # case 1: line is just "https://" or "http://"
+        if BARE_PROTOCOL_RE.match(trimmed):
+            url = trimmed
+            j = i + 1
+            while j < len(lines):
+                nxt = lines[j].strip()
+                if not nxt:
+                    j += 1
+                    continue
+                # stop if next line is a new label or another protocol
+                if NEW_LABEL_RE.match(nxt):
+                    break
+                url += nxt
+                j += 1
+                # stop if it clearly looks done (… or space)
+                if LOOKS_DONE_RE.search(nxt):
+                    break
+            out.append(url)
+            i = j
+            continue
+
+        # case 2: "https://domain/.../" then id on next line
+        if ENDS_WITH_SLASH_RE.search(trimmed) and i + 1 < len(lines):
+            nxt = lines[i + 1].strip()
+            if PATH_TAIL_RE.match(nxt):
+                out.append(trimmed + nxt)
+                i += 2
+                continue
+
+        # case 3: "https://vkvideo.ru/playlist/-2299" + "37903_23"
+        if URL_AT_END_RE.search(trimmed) and i + 1 < len(lines):
+            nxt = lines[i + 1].strip()
+            if ID_TAIL_RE.match(nxt) and not STARTS_WITH_PROTOCOL_RE.match(nxt):
+                out.append(trimmed + nxt)
+                i += 2
+                continue
+
+        out.append(line)
+        i += 1
+
+    return '\n'.join(out)
+
+
+def collect_urls(tweet: Dict[str, Any], unified_text: str = '') -> List[str]:
+    """unique urls from links, quoted links and the (repaired) tweet text"""
+    pieces = list(tweet.get('links') or []) + list(tweet.get('quoted_links') or []) + [unified_text or '']
+
+    repaired = repair_broken_urls('\n'.join(pieces))
+
+    urls = []
+    seen = set()
+    for url in URL_RE.findall(repaired):
+        url = TRAILING_PUNCT_RE.sub('', url)
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
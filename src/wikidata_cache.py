@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from . import serializer
+
+DAY = 24 * 60 * 60
+
+# returned by get when there is no live entry, None is a cached "no match"
+MISS = object()
+
+
+class WikidataCache:
+    """sqlite-backed store of wikidata lookups, one row per title/year
+
+    every entry expires on its own: matches after ttl_days, lookups that found
+    nothing after the shorter negative_ttl_days (wikidata may gain the title).
+    each put is committed as it happens, so an interrupted run keeps what it
+    looked up. safe to share between threads.
+    """
+
+    def __init__(self, path, ttl_days: float = 7, negative_ttl_days: float = 1):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_days * DAY
+        self.negative_ttl_s = negative_ttl_days * DAY
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS lookups ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB,'
+            ' created REAL NOT NULL,'
+            ' expires REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS lookups_expires ON lookups (expires)')
+        self._db.commit()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.negative_stores = 0
+        self.imported = 0
+
+    def get(self, key: str) -> Any:
+        """the cached match, None for a cached miss, MISS when nothing live is stored"""
+        with self._lock:
+            row = self._db.execute('SELECT value, expires FROM lookups WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISS
+            value, expires = row
+            if expires <= time.time():
+                self.misses += 1
+                self.expired += 1
+                return MISS
+            if value is None:
+                self.negative_hits += 1
+                return None
+            self.hits += 1
+        return serializer.loads(value)
+
+    def put(self, key: str, match: Optional[Dict[str, Any]], created: float = None):
+        """store a lookup's answer, match None meaning nothing was found"""
+        created = created or time.time()
+        ttl_s = self.ttl_s if match is not None else self.negative_ttl_s
+        value = serializer.dumps(match) if match is not None else None
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO lookups (key, value, created, expires) VALUES (?, ?, ?, ?)',
+                (key, value, created, created + ttl_s)
+            )
+            self._db.commit()
+            if match is None:
+                self.negative_stores += 1
+            else:
+                self.stores += 1
+
+    def matches(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(key, match) for every live cached match, no-match entries left out"""
+        with self._lock:
+            rows = self._db.execute('SELECT key, value FROM lookups WHERE value IS NOT NULL AND expires > ?',
+                                    (time.time(),)).fetchall()
+        for key, value in rows:
+            yield key, serializer.loads(value)
+
+    def import_json(self, path) -> int:
+        """take over the node client's wikidata-cache.json ({key: {data, timestamp}})
+
+        entries keep their age, so ones past ttl_days are skipped; keys already
+        stored win.
+        """
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return 0
+
+        now = time.time()
+        rows = []
+        for key, entry in data.items():
+            created = entry.get('timestamp', 0) / 1000
+            if entry.get('data') and created + self.ttl_s > now:
+                rows.append((key, serializer.dumps(entry['data']), created, created + self.ttl_s))
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                'INSERT OR IGNORE INTO lookups (key, value, created, expires) VALUES (?, ?, ?, ?)', rows)
+            self._db.commit()
+            imported = self._db.total_changes - before
+            self.imported += imported
+        return imported
+
+    def purge(self) -> int:
+        """delete expired entries, returns how many"""
+        with self._lock:
+            deleted = self._db.execute('DELETE FROM lookups WHERE expires <= ?', (time.time(),)).rowcount
+            self._db.commit()
+        return deleted
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM lookups').fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        with self._lock:
+            entries, negative = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(value IS NULL), 0) FROM lookups').fetchone()
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'negative_stores': self.negative_stores,
+            'imported': self.imported,
+            'entries': entries,
+            'negative_entries': negative,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
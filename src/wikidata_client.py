@@ -0,0 +1,298 @@
+# python port of src/wikidataClient.js, keep the two in step
+import asyncio
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from .wikidata_cache import MISS, WikidataCache
+
+WIKIDATA_ENDPOINT = 'https://www.wikidata.org/w/api.php'
+USER_AGENT = 'MediaParser/1.0'
+
+# wbgetentities takes at most 50 ids per call
+MAX_IDS_PER_CALL = 50
+# candidates checked per search, like the node client
+CANDIDATES_PER_SEARCH = 3
+
+MEDIA_TYPES = {
+    'Q11424', 'Q5398426', 'Q506240', 'Q336144', 'Q1366112',
+    'Q21191270', 'Q7889', 'Q16070115', 'Q7058673', 'Q63952888',
+    'Q220898', 'Q581714', 'Q202866', 'Q8274',  # manga
+}
+FILM_TYPES = {'Q11424', 'Q581714'}
+TV_TYPES = {'Q5398426', 'Q63952888', 'Q220898'}
+GAME_TYPES = {'Q7889', 'Q16070115'}
+DATE_PROPS = ('P577', 'P571')  # publication date, inception
+
+YEAR_RE = re.compile(r'(\d{4})')
+
+Lookup = Tuple[str, Optional[str]]
+
+
+def _claim_value(claims: Dict[str, Any], prop: str) -> Any:
+    try:
+        return claims[prop][0]['mainsnak']['datavalue']['value']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def is_media_entity(entity: Dict[str, Any]) -> bool:
+    instances = (entity.get('claims') or {}).get('P31') or []
+    return any(((claim.get('mainsnak') or {}).get('datavalue') or {}).get('value', {}).get('id') in MEDIA_TYPES
+               for claim in instances)
+
+
+def format_entity(entity: Dict[str, Any], search_title: str) -> Dict[str, Any]:
+    claims = entity.get('claims') or {}
+    title = ((entity.get('labels') or {}).get('en') or {}).get('value') or search_title
+
+    year = None
+    for prop in DATE_PROPS:
+        date_value = (_claim_value(claims, prop) or {}).get('time')
+        if date_value:
+            match = YEAR_RE.search(date_value)
+            year = match.group(1) if match else None
+            break
+
+    media_type = 'unknown'
+    instance_of = (_claim_value(claims, 'P31') or {}).get('id')
+    if instance_of in FILM_TYPES:
+        media_type = 'film'
+    elif instance_of in TV_TYPES:
+        media_type = 'tv series'
+    elif instance_of in GAME_TYPES:
+        media_type = 'game'
+
+    formatted = {'title': title, 'year': year, 'type': media_type, 'wikidata_id': entity.get('id')}
+    if claims.get('P345'):
+        formatted['imdb_id'] = _claim_value(claims, 'P345')
+    elif claims.get('P1733'):
+        formatted['steam_id'] = _claim_value(claims, 'P1733')
+    return formatted
+
+
+def select_best_match(candidates: List[Dict[str, Any]], search_title: str,
+                      search_year: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not candidates:
+        return None
+
+    search_lower = search_title.lower()
+    scored = []
+    for candidate in candidates:
+        score = 20
+        title_lower = candidate['title'].lower()
+        if title_lower == search_lower:
+            score += 50
+        elif search_lower in title_lower or title_lower in search_lower:
+            score += 25
+        if search_year and candidate['year'] == search_year:
+            score += 25
+        if candidate.get('imdb_id') or candidate.get('steam_id'):
+            score += 10
+        scored.append({**candidate, 'confidence': score})
+
+    # stable, so ties keep search order like the js sort
+    scored.sort(key=lambda c: -c['confidence'])
+    return scored[0]
+
+
+def cache_key(title: str, year: Optional[str]) -> str:
+    return f"search:{title.lower()}:{year or 'any'}"
+
+
+class TokenBucket:
+    """async rate limiter, rate requests per second with bursts of up to burst
+
+    callers reserve a token without waiting on each other: the bucket may go
+    negative and each caller sleeps off its own share of the debt, so there
+    is no lock to bind to an event loop.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """take a token, returns how long to wait before using it"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class WikidataClient:
+    """wikidata lookups for parsed titles, pipelined
+
+    searches run concurrently under one token bucket; the entities they turn
+    up are fetched together, up to 50 ids per wbgetentities call, and each
+    id only once. identical title/year lookups share one search while it is
+    in flight. blocking http (requests) runs in worker threads.
+
+    search_media is the async lookup, search_many the blocking one for a
+    whole list of lookups. answers, "nothing found" included, go to cache
+    when one is given; failed lookups are not cached.
+    """
+
+    def __init__(self, cache: WikidataCache = None, endpoint: str = WIKIDATA_ENDPOINT,
+                 rate_limit_ms: int = 500, burst: int = 4, concurrency: int = 8,
+                 linger_s: float = 0.25, timeout: float = 10):
+        self.endpoint = endpoint
+        self.cache = cache
+        self.timeout = timeout
+        # how long a partly filled entity batch waits for more ids
+        self.linger_s = linger_s
+        self.bucket = TokenBucket(1000 / rate_limit_ms, burst)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.entities: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._searches: Dict[str, asyncio.Future] = {}
+        self._entity_waiters: Dict[str, asyncio.Future] = {}
+        self._pending_ids: List[str] = []
+        self._flush_handle = None
+
+        self.stats = {'lookups': 0, 'cache_hits': 0, 'shared': 0, 'searches': 0,
+                      'entity_calls': 0, 'entities_fetched': 0, 'errors': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    # --------------- lookups ---------------
+
+    def search_many(self, lookups: Iterable[Lookup]) -> Dict[Lookup, Optional[Dict[str, Any]]]:
+        """blocking: best match (or None) for every (title, year), all in one pipelined run"""
+        return asyncio.run(self.resolve(lookups))
+
+    async def resolve(self, lookups: Iterable[Lookup]) -> Dict[Lookup, Optional[Dict[str, Any]]]:
+        unique = list(dict.fromkeys((title, year or None) for title, year in lookups))
+        results = await asyncio.gather(*(self.search_media(title, year) for title, year in unique))
+        return dict(zip(unique, results))
+
+    async def search_media(self, title: str, year: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        self.stats['lookups'] += 1
+        key = cache_key(title, year)
+        # the same title/year already being searched: wait for that one
+        if key in self._searches:
+            self.stats['shared'] += 1
+            return await asyncio.shield(self._searches[key])
+
+        cached = self.cache.get(key) if self.cache is not None else MISS
+        if cached is not MISS:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        future = asyncio.get_running_loop().create_future()
+        self._searches[key] = future
+        try:
+            best = await self._search_uncached(title, year)
+            if self.cache is not None:
+                self.cache.put(key, best)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f'wikidata error for "{title}": {e}')
+            best = None
+        finally:
+            del self._searches[key]
+        future.set_result(best)
+        return best
+
+    async def _search_uncached(self, title: str, year: Optional[str]) -> Optional[Dict[str, Any]]:
+        results = await self._search(title, year)
+        if not results and year:
+            results = await self._search(title)
+        if not results:
+            return None
+
+        ids = [result['id'] for result in results[:CANDIDATES_PER_SEARCH]]
+        entities = await asyncio.gather(*(self._entity(entity_id) for entity_id in ids))
+        candidates = [format_entity(entity, title) for entity in entities
+                      if entity and is_media_entity(entity)]
+        return select_best_match(candidates, title, year)
+
+    async def _search(self, title: str, year: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.stats['searches'] += 1
+        result = await self._get({
+            'action': 'wbsearchentities',
+            'search': f'{title} {year}' if year else title,
+            'language': 'en',
+            'type': 'item',
+            'limit': 10,
+            'format': 'json',
+        })
+        return result.get('search') or []
+
+    # --------------- batched entity fetches ---------------
+
+    async def _entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        if entity_id in self.entities:
+            return self.entities[entity_id]
+        if entity_id not in self._entity_waiters:
+            self._entity_waiters[entity_id] = asyncio.get_running_loop().create_future()
+            self._pending_ids.append(entity_id)
+            if len(self._pending_ids) >= MAX_IDS_PER_CALL:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.linger_s, self._flush)
+        return await asyncio.shield(self._entity_waiters[entity_id])
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        ids, self._pending_ids = self._pending_ids[:MAX_IDS_PER_CALL], self._pending_ids[MAX_IDS_PER_CALL:]
+        if ids:
+            asyncio.get_running_loop().create_task(self._fetch_entities(ids))
+        if self._pending_ids:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.linger_s, self._flush)
+
+    async def _fetch_entities(self, ids: List[str]):
+        self.stats['entity_calls'] += 1
+        try:
+            result = await self._get({
+                'action': 'wbgetentities',
+                'ids': '|'.join(ids),
+                'props': 'claims|labels|descriptions',
+                'languages': 'en',
+                'format': 'json',
+            })
+            entities = result.get('entities') or {}
+        except Exception as e:
+            # the searches waiting on these ids fail, later ones may retry them
+            for entity_id in ids:
+                self._entity_waiters.pop(entity_id).set_exception(e)
+            return
+
+        for entity_id in ids:
+            entity = entities.get(entity_id)
+            if entity and 'missing' not in entity:
+                self.stats['entities_fetched'] += 1
+            else:
+                entity = None
+            self.entities[entity_id] = entity
+            self._entity_waiters.pop(entity_id).set_result(entity)
+
+    async def _get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self.bucket.acquire()
+        response = await asyncio.to_thread(self.session.get, self.endpoint, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
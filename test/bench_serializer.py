@@ -0,0 +1,83 @@
+# test/bench_serializer.py
+# encode/decode throughput of the serializer backends on real export shapes
+#
+#   python test/bench_serializer.py [export.json ...]
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import serializer
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_FILES = sorted(ROOT.glob('twitter_bookmarks_*.json')) + [ROOT / 'output' / 'parsed-bookmarks.json']
+
+
+def stdlib_pretty(obj):
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def stdlib_compact(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def timed(fn, arg, min_time=1.0):
+    """run fn(arg) until min_time has passed, return seconds per call"""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn(arg)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs
+
+
+def bench_file(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+    tweets = data['tweets'] if isinstance(data, dict) else data
+
+    encoders = [
+        ('stdlib indent=2 (old)', stdlib_pretty),
+        ('stdlib compact', stdlib_compact),
+        (f'serializer pretty ({serializer.BACKEND})', lambda o: serializer.dumps(o, pretty=True)),
+        (f'serializer compact ({serializer.BACKEND})', serializer.dumps),
+        (f'serializer jsonl ({serializer.BACKEND})', lambda ts: b'\n'.join(serializer.dumps(t) for t in ts)),
+    ]
+
+    print(f"\n{path.name}: {len(tweets)} tweets, {len(raw)/1024:.0f} KB on disk")
+    print(f"  {'encode':<36} {'ms':>8} {'MB/s':>8} {'size KB':>8}")
+    for name, fn in encoders:
+        arg = tweets if 'jsonl' in name else data
+        size = len(fn(arg))
+        secs = timed(fn, arg)
+        print(f"  {name:<36} {secs*1000:>8.2f} {size/secs/1e6:>8.1f} {size/1024:>8.0f}")
+
+    compact = serializer.dumps(data)
+    decoders = [
+        ('stdlib json.loads', json.loads),
+        (f'serializer.loads ({serializer.BACKEND})', serializer.loads),
+    ]
+    print(f"  {'decode':<36} {'ms':>8} {'MB/s':>8}")
+    for name, fn in decoders:
+        secs = timed(fn, compact)
+        print(f"  {name:<36} {secs*1000:>8.2f} {len(compact)/secs/1e6:>8.1f}")
+
+
+def main():
+    files = [Path(p) for p in sys.argv[1:]] or [p for p in DEFAULT_FILES if p.exists()]
+    if not files:
+        print('error: no export files found, pass one on the command line')
+        sys.exit(1)
+
+    print(f"serializer backend: {serializer.BACKEND}")
+    for path in files:
+        bench_file(path)
+
+
+if __name__ == '__main__':
+    main()
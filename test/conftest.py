@@ -0,0 +1,79 @@
+# test/conftest.py
+import json
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+import pytest
+
+# make the repo root (processor scripts, src package) and this folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ollama_stub import OllamaStub, default_responder
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+
+
+@pytest.fixture
+def tweet():
+    """one scraped tweet: tweet('1', 'Heat (1995)', links=['https://gofile.io/d/abc'])"""
+    def make(tweet_id, text, links=(), quoted_text='', quoted_links=()):
+        return {
+            'id': tweet_id,
+            'author': 'stub author',
+            'text': text,
+            'links': list(links),
+            'quoted_text': quoted_text,
+            'quoted_links': list(quoted_links),
+        }
+    return make
+
+
+@pytest.fixture
+def make_tweets(tweet):
+    """n formulaic tweets, ids from 1000, text formatted with {i}"""
+    def make(n, text='Night Train {i} (1999)\n1080p'):
+        return [tweet(str(1000 + i), text.format(i=i), [f'https://gofile.io/d/{i}']) for i in range(n)]
+    return make
+
+
+@pytest.fixture
+def titles():
+    """the extracted titles of processed tweets, in order"""
+    return lambda processed: [t['ai_extraction']['titles'] for t in processed]
+
+
+@pytest.fixture
+def generate_payloads():
+    """what a stub was sent on /api/generate"""
+    return lambda stub: [payload for path, payload in stub.requests if path == '/api/generate']
+
+
+@pytest.fixture
+def run(tmp_path):
+    """process tweets against a fresh OllamaStub, returns (stub, processor, processed)
+
+        stub, processor, processed = run(tweets, responder, concurrency=2)
+
+    stub_options go to the OllamaStub, everything else to the processor. an
+    explicit ollama_url skips the stub, stub is None then. the output lands
+    in tmp_path / 'out.json'.
+    """
+    def run(tweets, responder=default_responder, stub_options=None, **kwargs):
+        input_file = tmp_path / 'bookmarks.json'
+        input_file.write_text(json.dumps({'tweets': tweets}))
+        with ExitStack() as stack:
+            stub = None
+            if 'ollama_url' not in kwargs:
+                stub = stack.enter_context(OllamaStub(responder=responder, **(stub_options or {})))
+                kwargs['ollama_url'] = stub.url
+            processor = BookmarkAIProcessor(**kwargs)
+            processed = processor.process_bookmarks(str(input_file), str(tmp_path / 'out.json'))
+        return stub, processor, processed
+    return run
+
+
+@pytest.fixture
+def read_output(tmp_path):
+    """the output file of the last run"""
+    return lambda: json.loads((tmp_path / 'out.json').read_text())
@@ -0,0 +1,238 @@
+# test/ollama_stub.py
+# minimal local stand-in for the ollama http api, used by the python tests.
+# it simulates per-request latency and a fixed number of parallel slots
+# (like OLLAMA_NUM_PARALLEL): requests beyond the slot count queue up.
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# full prompts label the text MAIN TWEET TEXT, compact ones (--compact-prompt) just TEXT
+MAIN_TEXT_RE = re.compile(r'^(?:MAIN TWEET TEXT|TEXT):\n(.*)', re.MULTILINE)
+BATCH_TWEET_RE = re.compile(r'=== TWEET (\S+) ===\n(?:AUTHOR[^\n]*\n\nMAIN TWEET TEXT|TEXT):\n(.*)')
+
+
+def title_from_prompt(prompt: str) -> str:
+    """echo the first line of the tweet text back as the title"""
+    match = MAIN_TEXT_RE.search(prompt)
+    return match.group(1).strip() if match else 'Unknown Title'
+
+
+def batch_from_prompt(prompt: str) -> list:
+    """(id, first text line) for every tweet of a batched prompt"""
+    return [(m.group(1), m.group(2).strip()) for m in BATCH_TWEET_RE.finditer(prompt)]
+
+
+def answer_for(title: str) -> str:
+    return (
+        f"TITLE: {title}\n"
+        f"URL: https://gofile.io/d/stub\n"
+        f"QUALITY: 1080p\n"
+        f"TYPE: Movie\n"
+        f"SUMMARY: A film served by the stub server."
+    )
+
+
+def json_answer_for(title: str) -> dict:
+    return {
+        'titles': [title],
+        'urls': ['https://gofile.io/d/stub'],
+        'quality': ['1080p'],
+        'type': ['Movie'],
+        'summary': 'A film served by the stub server.',
+    }
+
+
+def embed_text(text: str, dim: int = 32) -> list:
+    """bag of hashed words, texts sharing words point the same way"""
+    vector = [0.0] * dim
+    for word in re.findall(r'\w+', text.lower()):
+        vector[int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % dim] += 1.0
+    return vector
+
+
+def default_responder(payload: dict) -> str:
+    prompt = payload.get('prompt', '')
+    batch = batch_from_prompt(prompt)
+    if payload.get('format'):
+        # json mode, answer in the requested schema's shape
+        if batch:
+            return json.dumps({'results': [{'id': i, **json_answer_for(t)} for i, t in batch]})
+        return json.dumps(json_answer_for(title_from_prompt(prompt)))
+    if batch:
+        return "\n\n".join(f"=== TWEET {tweet_id} ===\n{answer_for(title)}" for tweet_id, title in batch)
+    return answer_for(title_from_prompt(prompt))
+
+
+class OllamaStub:
+    """threaded stub server, use as a context manager
+
+        with OllamaStub(latency=0.1, slots=2) as stub:
+            processor = BookmarkAIProcessor(ollama_url=stub.url)
+    """
+
+    def __init__(self, latency: float = 0.0, slots: int = 1, models=('mistral',),
+                 responder=default_responder, token_delay: float = 0.0, port: int = 0):
+        self.latency = latency
+        # pause between streamed tokens, for stream=True requests
+        self.token_delay = token_delay
+        self.slots = threading.BoundedSemaphore(slots)
+        self.models = list(models)
+        self.responder = responder
+
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = []  # (path, payload) in arrival order
+        self.connections = set()  # client (host, port) pairs seen, one per tcp connection
+        self.tokens_sent = 0
+        self.hangups = 0  # streams the client closed before the end
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, path: str) -> int:
+        with self.lock:
+            return sum(1 for p, _ in self.requests if p == path)
+
+    def handle_generate(self, payload: dict) -> tuple:
+        """(status, body); a responder may return (status, text) to fail a request"""
+        with self.slots:
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                time.sleep(self.latency)
+                text = self.responder(payload)
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+        status = 200
+        if isinstance(text, tuple):
+            status, text = text
+        if status != 200:
+            return status, {'error': text}
+        return 200, {
+            'model': payload.get('model'),
+            'response': text,
+            'done': True,
+            **self.server_timings(payload, text),
+        }
+
+    def server_timings(self, payload: dict, text: str) -> dict:
+        """made-up but consistent ollama timing fields: 1ms per prompt token, 10ms per generated one"""
+        prompt_tokens = len(payload.get('prompt', '').split())
+        eval_tokens = len(text.split())
+        return {
+            'total_duration': int((self.latency + prompt_tokens * 0.001 + eval_tokens * 0.01) * 1e9),
+            'load_duration': 0,
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int(prompt_tokens * 0.001 * 1e9),
+            'eval_count': eval_tokens,
+            'eval_duration': int(eval_tokens * 0.01 * 1e9),
+        }
+
+    def embed(self, payload: dict) -> tuple:
+        texts = payload.get('input', [])
+        if isinstance(texts, str):
+            texts = [texts]
+        return 200, {'model': payload.get('model'), 'embeddings': [embed_text(t) for t in texts]}
+
+    def stream_generate(self, handler, payload: dict):
+        """answer as ollama's ndjson stream, one whitespace-delimited token per chunk"""
+        with self.slots:
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                time.sleep(self.latency)
+                text = self.responder(payload)
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'application/x-ndjson')
+                handler.send_header('Transfer-Encoding', 'chunked')
+                handler.end_headers()
+
+                for token in (t for t in re.findall(r'\S*\s*', text) if t):
+                    time.sleep(self.token_delay)
+                    handler.write_chunk({'model': payload.get('model'), 'response': token, 'done': False})
+                    with self.lock:
+                        self.tokens_sent += 1
+                handler.write_chunk({'model': payload.get('model'), 'response': '', 'done': True,
+                                     **self.server_timings(payload, text)})
+                handler.wfile.write(b'0\r\n\r\n')
+            except (BrokenPipeError, ConnectionResetError):
+                handler.close_connection = True
+                with self.lock:
+                    self.hangups += 1
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so tests can see connection reuse
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections.add(self.client_address)
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def write_chunk(self, body):
+                data = json.dumps(body).encode('utf-8') + b'\n'
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append((self.path, None))
+                if self.path == '/api/tags':
+                    self._send(200, {'models': [{'name': f'{m}:latest'} for m in stub.models]})
+                else:
+                    self._send(404, {'error': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with stub.lock:
+                    stub.requests.append((self.path, payload))
+                if self.path == '/api/generate' and payload.get('stream'):
+                    stub.stream_generate(self, payload)
+                elif self.path == '/api/generate':
+                    self._send(*stub.handle_generate(payload))
+                elif self.path == '/api/embed':
+                    self._send(*stub.embed(payload))
+                else:
+                    self._send(404, {'error': 'not found'})
+
+        return Handler
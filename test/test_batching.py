@@ -0,0 +1,57 @@
+# test/test_batching.py
+from ollama_stub import answer_for, batch_from_prompt, default_responder
+
+
+def test_batches_share_one_call_and_map_back_by_id(run, make_tweets, titles):
+    tweets = make_tweets(7)
+    stub, processor, processed = run(tweets, batch_size=3)
+
+    # 3 + 3 + 1
+    assert stub.count('/api/generate') == 3
+    assert [t['id'] for t in processed] == [t['id'] for t in tweets]
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(7)]
+    assert processor.batch_fallbacks == 0
+
+
+def test_answers_out_of_order_still_land_on_the_right_tweet(run, make_tweets, titles):
+    def reversed_responder(payload):
+        batch = batch_from_prompt(payload['prompt'])
+        return "\n\n".join(f"=== TWEET {tweet_id} ===\n{answer_for(title)}" for tweet_id, title in reversed(batch))
+
+    stub, _, processed = run(make_tweets(4), reversed_responder, batch_size=4)
+
+    assert stub.count('/api/generate') == 1
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(4)]
+
+
+def test_missing_ids_fall_back_to_single_calls(run, make_tweets, titles):
+    def forgetful_responder(payload):
+        batch = batch_from_prompt(payload['prompt'])
+        if not batch:
+            return default_responder(payload)
+        # drops the last tweet and mangles the second
+        lines = [f"=== TWEET {batch[0][0]} ===\n{answer_for(batch[0][1])}",
+                 f"=== TWEET {batch[1][0]} ===\nsorry, not sure about this one"]
+        return "\n\n".join(lines)
+
+    stub, processor, processed = run(make_tweets(3), forgetful_responder, batch_size=3)
+
+    assert stub.count('/api/generate') == 3
+    assert processor.batch_fallbacks == 2
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(3)]
+
+
+def test_long_tweets_get_their_own_prompt(run, make_tweets, titles):
+    tweets = make_tweets(2) + make_tweets(1, text='Long Feature (2001)\n' + 'x' * 800)
+    tweets[2]['id'] = '2000'
+    stub, _, processed = run(tweets, batch_size=3)
+
+    assert stub.count('/api/generate') == 2
+    assert titles(processed)[2] == ['Long Feature (2001)']
+
+
+def test_batches_run_on_the_worker_pool(run, make_tweets, titles):
+    stub, _, processed = run(make_tweets(8), batch_size=2, concurrency=2)
+
+    assert stub.count('/api/generate') == 4
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(8)]
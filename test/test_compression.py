@@ -0,0 +1,55 @@
+# test/test_compression.py
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from src.compression import codec_for, codec_suffix, open_file, strip_codec_suffix
+from src.storage import BookmarkStorage
+
+TWEETS = [
+    {'id': '1', 'author': 'a', 'text': 'Heat (1995) ünïcode', 'links': ['https://gofile.io/d/a']},
+    {'id': '2', 'author': 'b', 'text': 'Ronin (1998)', 'links': []},
+]
+
+MAGIC = {'.gz': b'\x1f\x8b', '.zst': b'\x28\xb5\x2f\xfd', '': b'['}
+
+
+def test_codec_comes_from_the_last_suffix():
+    assert codec_for('bookmarks.json.gz') == 'gzip'
+    assert codec_for('bookmarks.jsonl.ZST') == 'zstd'
+    assert codec_for('bookmarks.json') is None
+    assert strip_codec_suffix('out/bookmarks.json.zst').name == 'bookmarks.json'
+    assert codec_suffix('zstd') == codec_suffix('zst') == '.zst'
+    with pytest.raises(ValueError):
+        codec_suffix('bz2')
+
+
+@pytest.mark.parametrize('suffix', ['.gz', '.zst', ''])
+def test_json_round_trips_through_the_codec_of_its_name(tmp_path, suffix):
+    storage = BookmarkStorage(tmp_path)
+    path = asyncio.run(storage.save_json(TWEETS, f'bookmarks.json{suffix}'))
+
+    assert path.read_bytes()[:len(MAGIC[suffix])] == MAGIC[suffix]
+    assert storage.load_json(path.name) == TWEETS
+
+
+@pytest.mark.parametrize('suffix', ['.gz', '.zst'])
+def test_jsonl_round_trips_line_by_line(tmp_path, suffix):
+    storage = BookmarkStorage(tmp_path)
+    path = storage.save_jsonl(iter(TWEETS), f'bookmarks.jsonl{suffix}')
+
+    assert path.read_bytes()[:len(MAGIC[suffix])] == MAGIC[suffix]
+    assert list(storage.iter_jsonl(path.name)) == TWEETS
+    with open_file(path) as f:
+        assert len(f.readlines()) == 2
+
+
+def test_default_names_carry_the_configured_codec(tmp_path):
+    storage = BookmarkStorage(tmp_path, compression='gz')
+    path = storage.save_jsonl(TWEETS)
+
+    assert path.name.endswith('.jsonl.gz')
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert json.loads(f.readline()) == TWEETS[0]
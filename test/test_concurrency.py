@@ -0,0 +1,58 @@
+# test/test_concurrency.py
+import json
+import time
+
+from ollama_stub import OllamaStub
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+
+
+def write_input(tmp_path, tweets):
+    path = tmp_path / 'bookmarks.json'
+    path.write_text(json.dumps({'tweets': tweets}))
+    return path
+
+
+def test_pool_runs_in_parallel_and_keeps_input_order(tmp_path, make_tweets):
+    tweets = make_tweets(12)
+    input_file = write_input(tmp_path, tweets)
+
+    with OllamaStub(latency=0.2, slots=4) as stub:
+        processor = BookmarkAIProcessor(ollama_url=stub.url, concurrency=4)
+        start = time.time()
+        processed = processor.process_bookmarks(str(input_file), str(tmp_path / 'out.json'))
+        elapsed = time.time() - start
+
+    # 12 requests at 0.2s over 4 slots is ~0.6s, sequential would be 2.4s
+    assert elapsed < 1.6
+    assert stub.max_active == 4
+
+    assert [t['id'] for t in processed] == [t['id'] for t in tweets]
+    for tweet in processed:
+        number = int(tweet['id']) - 1000
+        assert tweet['ai_extraction']['titles'] == [f'Night Train {number} (1999)']
+
+
+def test_pool_never_exceeds_concurrency(tmp_path, make_tweets):
+    input_file = write_input(tmp_path, make_tweets(8))
+
+    with OllamaStub(latency=0.05, slots=8) as stub:
+        processor = BookmarkAIProcessor(ollama_url=stub.url, concurrency=2)
+        processed = processor.process_bookmarks(str(input_file), str(tmp_path / 'out.json'))
+
+    assert len(processed) == 8
+    assert stub.max_active <= 2
+
+
+def test_server_slots_bound_throughput(tmp_path, make_tweets):
+    # more workers than server slots: extra requests queue on the server side
+    input_file = write_input(tmp_path, make_tweets(6))
+
+    with OllamaStub(latency=0.1, slots=2) as stub:
+        processor = BookmarkAIProcessor(ollama_url=stub.url, concurrency=6)
+        processed = processor.process_bookmarks(str(input_file), str(tmp_path / 'out.json'))
+
+    assert len(processed) == 6
+    assert stub.max_active == 2
+    output = json.loads((tmp_path / 'out.json').read_text())
+    assert output['processed_count'] == 6
+    assert output['failed_count'] == 0
@@ -0,0 +1,65 @@
+# test/test_embeddings.py
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ollama_stub import OllamaStub
+from src.embeddings import Embedder, EmbeddingIndex
+from src.ollama_client import OllamaClient
+
+TWEETS = [
+    {'id': '1', 'text': 'Suspiria (1977) Italian horror classic, Argento at his best'},
+    {'id': '2', 'text': 'Deep Red (1975) another Italian horror gem from Argento'},
+    {'id': '3', 'text': 'Paris, Texas (1984) road movie, Wim Wenders'},
+    {'id': '4', 'text': 'The Beyond (1981) Fulci Italian horror, gore and zombies'},
+    {'id': '5', 'text': ''},
+]
+
+
+def build(tmp_path, stub, tweets, batch_size=2):
+    embedder = Embedder(OllamaClient(stub.url), 'stub-embed', batch_size=batch_size)
+    index = EmbeddingIndex(tmp_path / 'index')
+    return index, embedder, index.build(tweets, embedder)
+
+
+def test_build_batches_and_search_ranks_by_cosine(tmp_path):
+    with OllamaStub() as stub:
+        index, embedder, stats = build(tmp_path, stub, TWEETS)
+        # the empty tweet is skipped, four texts in batches of two
+        assert stats == {'rows': 4, 'embedded': 4, 'reused': 0}
+        assert stub.count('/api/embed') == 2
+        results = index.search_text('italian horror', embedder, k=3)
+
+    assert {row['id'] for row, _ in results} == {'1', '2', '4'}
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_like_excludes_the_tweet_itself(tmp_path):
+    with OllamaStub() as stub:
+        index, _, _ = build(tmp_path, stub, TWEETS)
+
+    results = index.like('2', k=2)
+    assert [row['id'] for row, _ in results][0] == '1'
+    assert '2' not in [row['id'] for row, _ in results]
+    with pytest.raises(KeyError):
+        index.like('404')
+
+
+def test_rebuild_only_embeds_new_or_changed_text(tmp_path):
+    with OllamaStub() as stub:
+        build(tmp_path, stub, TWEETS)
+        changed = TWEETS[:3] + [{'id': '4', 'text': 'The Beyond (1981) restored 4K'}, {'id': '6', 'text': 'Inferno (1980)'},
+                                {'id': '7', 'text': 'Inferno  (1980)'}]
+        index, _, stats = build(tmp_path, stub, changed)
+
+    # 7 is 6 again, one text embedded for both rows
+    assert stats == {'rows': 6, 'embedded': 2, 'reused': 4}
+    assert stub.count('/api/embed') == 3
+    assert index.like('6', k=1)[0][0]['id'] == '7'
+
+    # reopened from disk, the matrix is memory-mapped and unit length
+    reopened = EmbeddingIndex(tmp_path / 'index')
+    assert isinstance(reopened.vectors, np.memmap)
+    assert reopened.vectors.shape == (6, 32)
+    assert np.allclose(np.linalg.norm(reopened.vectors, axis=1), 1.0)
+    assert reopened.like('1', k=1)[0][0]['id'] == '2'
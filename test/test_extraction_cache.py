@@ -0,0 +1,71 @@
+# test/test_extraction_cache.py
+import itertools
+import sqlite3
+import time
+
+from src.extraction_cache import ExtractionCache, content_key
+
+
+def test_least_recently_used_entries_go_first(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(time, 'time', lambda: next(clock))
+    entry = {'titles': ['x' * 100]}
+    cache = ExtractionCache(tmp_path / 'extractions.sqlite3', max_bytes=400)
+    for key in 'abc':
+        cache.put(key, entry)
+    # a is the oldest entry but was just read
+    assert cache.get('a') == entry
+
+    cache.put('d', entry)
+    assert cache.get('b') is None
+    assert [cache.get(key) is not None for key in 'acd'] == [True, True, True]
+    assert cache.stats()['evictions'] == 1
+    assert cache.total_bytes <= 400
+
+
+def test_key_ignores_whitespace_but_not_model_or_prompt(tweet):
+    original = tweet('1', 'Heat (1995)\n1080p', ['https://gofile.io/d/a', 'https://gofile.io/d/b'])
+    reflowed = tweet('2', '  Heat (1995)  1080p ', ['https://gofile.io/d/b', 'https://gofile.io/d/a'])
+    key = content_key(original, 'mistral', 'direct', 1)
+
+    assert content_key(reflowed, 'mistral', 'direct', 1) == key
+    assert content_key(original, 'llama3', 'direct', 1) != key
+    assert content_key(original, 'mistral', 'reasoning', 1) != key
+    assert content_key(original, 'mistral', 'direct', 2) != key
+
+
+def test_answers_are_reused_across_runs(tmp_path, run, make_tweets, titles):
+    path = tmp_path / 'extractions.sqlite3'
+    stub, _, processed = run(make_tweets(3), cache=ExtractionCache(path))
+    assert stub.count('/api/generate') == 3
+
+    # a new run, a new connection to the same file
+    cache = ExtractionCache(path)
+    stub, _, cached = run(make_tweets(3), cache=cache)
+    assert stub.count('/api/generate') == 0
+    assert titles(cached) == titles(processed)
+    assert cache.stats()['hits'] == 3
+
+    # another prompt variant is a miss, its answers are stored next to the old ones
+    cache = ExtractionCache(path)
+    stub, _, _ = run(make_tweets(3), cache=cache, show_reasoning=True)
+    assert stub.count('/api/generate') == 3
+    assert cache.stats()['misses'] == 3
+    assert len(cache) == 6
+    # each answer remembers what gave it
+    assert len(list(cache.values(model='mistral', variant='reasoning'))) == 3
+    assert len(list(cache.values(model='mistral', variant='direct'))) == 3
+
+
+def test_caches_from_before_model_columns_still_open(tmp_path):
+    path = tmp_path / 'extractions.sqlite3'
+    db = sqlite3.connect(str(path))
+    db.execute('CREATE TABLE extractions (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,'
+               ' created REAL NOT NULL, accessed REAL NOT NULL)')
+    db.commit()
+    db.close()
+
+    cache = ExtractionCache(path)
+    cache.put('a', {'titles': ['Heat']}, model='mistral', variant='direct')
+    assert cache.get('a') == {'titles': ['Heat']}
+    assert list(cache.values(model='mistral')) == [{'titles': ['Heat']}]
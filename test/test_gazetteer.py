@@ -0,0 +1,119 @@
+# test/test_gazetteer.py
+import time
+
+from src.extraction_cache import ExtractionCache
+from src.gazetteer import Gazetteer, normalize_title
+from src.media_parser import MediaParser
+from src.rule_extractor import RuleExtractor
+from src.wikidata_cache import WikidataCache
+
+GREEN_MILE = {'title': 'The Green Mile', 'year': '1999', 'type': 'film', 'wikidata_id': 'Q208263',
+              'imdb_id': 'tt0120689', 'confidence': 105}
+
+
+def known_titles(tmp_path):
+    cache = WikidataCache(tmp_path / 'wikidata.sqlite3')
+    cache.put('search:green mile:1999', GREEN_MILE)
+    cache.put('search:nothing here:any', None)
+    extractions = ExtractionCache(tmp_path / 'extractions.sqlite3')
+    extractions.put('a', {'titles': ['Night Train'], 'type': ['Movie'], 'year': '1987'})
+    extractions.put('b', {'titles': ['Unknown Title'], 'type': []})
+    extractions.put('c', {'titles': ['Heat', 'Ronin'], 'type': ['Movie']})
+    extractions.put('d', {'titles': ['Ronin'], 'type': ['Movie']})
+    return Gazetteer.from_caches(cache, extractions)
+
+
+def test_exact_and_fuzzy_lookups(tmp_path):
+    gazetteer = known_titles(tmp_path)
+
+    assert normalize_title('𝐓𝐡𝐞 Green-Mile!') == 'the green mile'
+    assert gazetteer.lookup('THE GREEN MILE', '1999')['imdb_id'] == 'tt0120689'
+    # found by what the wikidata search was made for too
+    assert gazetteer.lookup('green mile')['title'] == 'The Green Mile'
+    assert gazetteer.lookup('night train')['type'] == 'film'
+
+    # a typo needs the year to agree
+    typo = gazetteer.lookup('The Gren Mile', '1999')
+    assert typo['wikidata_id'] == 'Q208263' and 0.8 <= typo['score'] < 1
+    assert gazetteer.lookup('The Gren Mile') is None
+    assert gazetteer.lookup('The Gren Mile', '2009') is None
+    assert gazetteer.lookup('The Green Mile', '2009') is None
+
+    # no-match lookups, junk titles, title lists and titles without a year are not indexed
+    assert gazetteer.lookup('nothing here') is None
+    assert gazetteer.lookup('unknown title') is None
+    assert gazetteer.lookup('heat') is None
+    assert gazetteer.lookup('ronin') is None
+
+
+def test_only_extractions_of_the_same_model_and_prompt(tmp_path):
+    extractions = ExtractionCache(tmp_path / 'extractions.sqlite3')
+    extractions.put('a', {'titles': ['Night Train'], 'year': '1987'}, model='mistral', variant='json')
+    extractions.put('b', {'titles': ['Heat'], 'year': '1995'}, model='mistral', variant='direct')
+    extractions.put('c', {'titles': ['Ronin'], 'year': '1998'}, model='llama3', variant='json')
+    extractions.put('d', {'titles': ['Thief'], 'year': '1981'})
+
+    gazetteer = Gazetteer.from_caches(extraction_cache=extractions, model='mistral', variant='json')
+    assert [entry['title'] for entry in gazetteer.entries] == ['Night Train']
+
+
+def test_lookups_stay_fast_with_many_titles():
+    gazetteer = Gazetteer()
+    for i in range(20000):
+        gazetteer.add({'title': f'Night Train Number {i}', 'year': str(1950 + i % 70)})
+
+    start = time.perf_counter()
+    for i in range(0, 20000, 100):
+        assert gazetteer.lookup(f'night train numbr {i}', str(1950 + i % 70))['title'] == f'Night Train Number {i}'
+    assert (time.perf_counter() - start) / 200 < 0.005
+
+
+def test_rule_tier_canonicalizes_and_answers_known_titles(tmp_path, tweet):
+    rules = RuleExtractor(gazetteer=known_titles(tmp_path))
+
+    formulaic = rules.extract(tweet('1', 'green mile (1999)\n1080p', ['https://gofile.io/d/abc']))
+    assert formulaic['titles'] == ['The Green Mile']
+    assert formulaic['imdb_id'] == 'tt0120689'
+    assert formulaic['source'] == 'rules'
+
+    # no quality, so not formulaic, but the title is known
+    known = rules.extract_known(tweet('2', 'The Gren Mile (1999)\nwhat a film', ['https://gofile.io/d/xyz']))
+    assert known['titles'] == ['The Green Mile']
+    assert known['urls'] == ['https://gofile.io/d/xyz']
+    assert known['type'] == ['Movie']
+    assert known['source'] == 'gazetteer'
+    assert rules.extract_known(tweet('3', 'Some Other Film (1999)')) is None
+    assert rules.extract_known(tweet('4', 'Heat (1995)\nThe Green Mile (1999)')) is None
+    # a known title has to be the whole first line, not the start of a collection
+    assert rules.extract_known(tweet('5', 'The Green Mile (1999) + 40 more prison films\nall 1080p',
+                                     ['https://gofile.io/d/xyz'])) is None
+    assert rules.extract_known(tweet('6', 'noir pack\nThe Green Mile (1999)', ['https://gofile.io/d/xyz'])) is None
+
+
+def test_processor_skips_the_model_for_known_titles(tmp_path, run, tweet):
+    tweets = [tweet('1', 'The Green Mile (1999)\nrewatch', ['https://gofile.io/d/abc']),
+              tweet('2', 'Some Other Film (2001)\nrewatch', ['https://gofile.io/d/def'])]
+    stub, processor, processed = run(tweets, rules=RuleExtractor(gazetteer=known_titles(tmp_path)))
+
+    assert stub.count('/api/generate') == 1
+    assert processor.known_title_hits == 1
+    assert processed[0]['ai_extraction']['wikidata_id'] == 'Q208263'
+
+
+def test_media_parser_asks_the_gazetteer_before_wikidata(tmp_path, tweet):
+    class NoNetwork:
+        def search_media(self, title, year):
+            raise AssertionError(f'looked up {title}')
+
+    parser = MediaParser(wikidata=NoNetwork(), gazetteer=known_titles(tmp_path))
+    [item] = parser.parse_tweet(tweet('1', 'green mile (1999) 1080p', ['https://gofile.io/d/abc']))[
+        'parsed_media']['media_items']
+    assert item['title'] == 'The Green Mile'
+    assert item['wikidata_enhanced'] and item['wikidata_confidence'] == 105
+
+    # a typo is trusted only as far as the fuzzy match goes
+    [item] = parser.parse_tweet(tweet('2', 'the gren mile (1999) 1080p', ['https://gofile.io/d/abc']))[
+        'parsed_media']['media_items']
+    score = parser.gazetteer.lookup('the gren mile', '1999')['score']
+    assert item['title'] == 'The Green Mile'
+    assert item['wikidata_confidence'] == round(score * 100) < 100
@@ -0,0 +1,73 @@
+# test/test_journal.py
+import json
+
+from ollama_stub import OllamaStub, default_responder
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+from src.journal import ExtractionJournal
+
+
+def test_torn_last_line_is_trimmed(tmp_path, tweet):
+    journal = ExtractionJournal(tmp_path / 'out.journal.jsonl').open()
+    journal.record_tweet(tweet('1', 'Heat (1995)'))
+    journal.close()
+    # a crash halfway through the next record
+    with open(journal.path, 'ab') as f:
+        f.write(b'{"kind": "tweet", "tweet": {"id": "2", "te')
+
+    assert [t['id'] for t in journal.load()[0]] == ['1']
+
+    journal.open(resume=True)
+    journal.record_tweet(tweet('3', 'Ronin (1998)'))
+    journal.close()
+    assert [t['id'] for t in journal.load()[0]] == ['1', '3']
+    assert journal.path.read_bytes().count(b'\n') == 2
+
+
+def test_later_success_replaces_an_error(tmp_path, tweet):
+    journal = ExtractionJournal(tmp_path / 'out.journal.jsonl').open()
+    journal.record_error({'tweet_id': '1', 'error': 'timeout'})
+    journal.record_error({'tweet_id': '2', 'error': 'timeout'})
+    journal.record_tweet(tweet('1', 'Heat (1995)'))
+    journal.close()
+
+    processed, errors = journal.load()
+    assert [t['id'] for t in processed] == ['1']
+    assert errors == [{'tweet_id': '2', 'error': 'timeout'}]
+    assert journal.done_ids() == {'1'}
+
+
+def test_tweets_without_an_id_are_kept_apart(tmp_path, tweet):
+    journal = ExtractionJournal(tmp_path / 'out.journal.jsonl').open()
+    journal.record_tweet(tweet(None, 'Heat (1995)'))
+    journal.record_tweet(tweet(None, 'Ronin (1998)'))
+    journal.record_error({'tweet_id': None, 'error': 'timeout'})
+    journal.close()
+
+    processed, errors = journal.load()
+    assert [t['text'] for t in processed] == ['Heat (1995)', 'Ronin (1998)']
+    assert len(errors) == 1
+    assert journal.done_ids() == set()
+
+
+def test_resume_only_asks_for_what_is_not_done(tmp_path, make_tweets):
+    input_file = tmp_path / 'bookmarks.json'
+    input_file.write_text(json.dumps({'tweets': make_tweets(4)}))
+    output_file = tmp_path / 'out.json'
+
+    def flaky_responder(payload):
+        if 'Night Train 2 ' in payload['prompt']:
+            raise RuntimeError('stub crashed')
+        return default_responder(payload)
+
+    with OllamaStub(responder=flaky_responder) as stub:
+        BookmarkAIProcessor(ollama_url=stub.url).process_bookmarks(str(input_file), str(output_file))
+    assert [e['tweet_id'] for e in json.loads(output_file.read_text())['errors']] == ['1002']
+
+    with OllamaStub() as stub:
+        processed = BookmarkAIProcessor(ollama_url=stub.url).process_bookmarks(
+            str(input_file), str(output_file), resume=True)
+
+    # only the tweet that failed is asked again, and its success replaces the error
+    assert stub.count('/api/generate') == 1
+    assert sorted(t['id'] for t in processed) == ['1000', '1001', '1002', '1003']
+    assert json.loads(output_file.read_text())['errors'] == []
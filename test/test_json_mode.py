@@ -0,0 +1,74 @@
+# test/test_json_mode.py
+import functools
+import json
+
+import pytest
+
+from ollama_stub import json_answer_for
+from process_bookmarks_ollama_debug import EXTRACTION_SCHEMA
+from src.retry_policy import RetryPolicy
+
+
+@pytest.fixture
+def run(run):
+    """every run here is in json mode"""
+    return functools.partial(run, json_mode=True)
+
+
+def test_requests_schema_and_parses_json(run, make_tweets, generate_payloads):
+    stub, _, processed = run(make_tweets(2))
+
+    assert all(p['format'] == EXTRACTION_SCHEMA for p in generate_payloads(stub))
+    extraction = processed[0]['ai_extraction']
+    assert extraction['titles'] == ['Night Train 0 (1999)']
+    assert extraction['urls'] == ['https://gofile.io/d/stub']
+    assert extraction['quality'] == ['1080p']
+    assert extraction['type'] == ['Movie']
+
+
+def test_validation_rules_still_apply(run, make_tweets):
+    def noisy_responder(payload):
+        answer = json_answer_for('Night Train')
+        answer['titles'] = ['stub author', 'My Video Collection', 'John Smith', 'Heat']
+        answer['quality'] = ['none', '4K']
+        answer['type'] = 'Movie'  # bare string instead of a list
+        return json.dumps(answer)
+
+    _, _, processed = run(make_tweets(1), noisy_responder)
+
+    extraction = processed[0]['ai_extraction']
+    assert extraction['titles'] == ['Heat']
+    assert extraction['quality'] == ['4K']
+    assert extraction['type'] == ['Movie']
+
+
+def test_unparsable_answer_is_retried_then_reported(tmp_path, run, make_tweets, titles):
+    answers = iter(['TITLE: not json', json.dumps(json_answer_for('Heat'))])
+    stub, _, processed = run(make_tweets(1), lambda payload: next(answers))
+
+    assert stub.count('/api/generate') == 2
+    assert titles(processed) == [['Heat']]
+
+    stub, _, processed = run(make_tweets(1), lambda payload: '{"titles": [')
+    assert stub.count('/api/generate') == 3
+    assert processed == []
+    assert json.loads((tmp_path / 'out.json').read_text())['errors'][0]['error'] == 'unparsable response'
+
+
+def test_unparsable_answers_are_not_server_failures(run, make_tweets):
+    # a backoff this long would show, and the breaker would open after the first answer
+    retry = RetryPolicy(base_delay=30)
+    retry.breaker.threshold = 1
+    stub, _, processed = run(make_tweets(1), lambda payload: '{"titles": [', retry=retry)
+
+    assert stub.count('/api/generate') == 3
+    assert retry.failed_attempts == 0
+    assert retry.breaker.state == retry.breaker.CLOSED
+
+
+def test_json_batches_map_back_by_id(run, make_tweets, titles, generate_payloads):
+    stub, _, processed = run(make_tweets(4), batch_size=4)
+
+    assert stub.count('/api/generate') == 1
+    assert 'results' in generate_payloads(stub)[0]['format']['properties']
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(4)]
@@ -0,0 +1,74 @@
+# test/test_json_stream.py
+import gzip
+import io
+import json
+
+import pytest
+
+from ollama_stub import OllamaStub
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+from src.json_stream import iter_json_array, iter_tweets
+
+
+class CountingReader(io.BytesIO):
+    """bytes reader that remembers how far it was read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed += len(data)
+        return data
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_items_split_across_chunks(chunk_size):
+    tweets = [{'id': str(i), 'text': f'Ångström {i} – “quoted” \\ {{brace}}', 'n': 12345 + i} for i in range(5)]
+    data = json.dumps({'exported_at': '2025-11-12', 'count': 5, 'meta': {'nested': [1, 2]},
+                       'tweets': tweets, 'after': True}, ensure_ascii=False).encode('utf-8')
+
+    assert list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size)) == tweets
+    # a bare list works too, numbers cut by a chunk edge come out whole
+    assert list(iter_json_array(io.BytesIO(b'[1, 22 ,333]'), chunk_size=chunk_size)) == [1, 22, 333]
+    assert list(iter_json_array(io.BytesIO(b'{"tweets": []}'), chunk_size=chunk_size)) == []
+
+
+def test_stops_reading_once_enough_items_are_taken(make_tweets):
+    data = json.dumps({'tweets': make_tweets(2000)}).encode('utf-8')
+    reader = CountingReader(data)
+    items = iter_json_array(reader, chunk_size=1024)
+
+    assert [next(items)['id'] for _ in range(3)] == ['1000', '1001', '1002']
+    assert reader.consumed <= 2048
+
+
+def test_truncated_input_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(b'{"tweets": [{"id": "1"}, {"id": '), chunk_size=4))
+
+
+def test_jsonl_and_compressed_inputs(tmp_path, make_tweets):
+    tweets = make_tweets(3)
+    jsonl = tmp_path / 'bookmarks.jsonl'
+    jsonl.write_text(''.join(json.dumps(t) + '\n' for t in tweets))
+    assert list(iter_tweets(jsonl)) == tweets
+
+    packed = tmp_path / 'bookmarks.json.gz'
+    with gzip.open(packed, 'wt') as f:
+        json.dump({'tweets': tweets}, f)
+    assert list(iter_tweets(packed)) == tweets
+
+
+@pytest.mark.parametrize('options', [{}, {'concurrency': 3}, {'batch_size': 2, 'concurrency': 2}])
+def test_streamed_input_keeps_order_and_limit(tmp_path, options, run, make_tweets, titles):
+    tweets = make_tweets(9)
+    stub, _, processed = run(tweets, **options)
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(9)]
+
+    input_file = tmp_path / 'bookmarks.json'
+    with OllamaStub() as stub:
+        processor = BookmarkAIProcessor(ollama_url=stub.url, **options)
+        limited = processor.process_bookmarks(str(input_file), str(tmp_path / 'limited.json'), limit=4)
+    assert [t['id'] for t in limited] == [t['id'] for t in tweets[:4]]
@@ -0,0 +1,75 @@
+# test/test_media_parser.py
+import json
+from pathlib import Path
+
+from src.media_parser import MediaParser
+
+SAMPLE = Path(__file__).parent / 'sample-input.json'
+
+
+class FakeWikidata:
+    def __init__(self):
+        self.lookups = []
+
+    def search_media(self, title, year):
+        self.lookups.append((title, year))
+        return {'title': 'The Green Mile', 'year': '1999', 'type': 'film', 'wikidata_id': 'Q208263',
+                'imdb_id': 'tt0120689', 'confidence': 80}
+
+
+def test_single_title_gets_every_link(tweet):
+    parsed = MediaParser().parse_tweet(tweet(
+        '1', 'the green mile (1999)\n4K (31.87GB)\n\nhttps://\ntransfer.it/t/qeYXqs1XBZQR',
+        ['https://gofile.io/d/abc']))
+
+    [item] = parsed['parsed_media']['media_items']
+    assert item['title'] == 'The Green Mile'
+    assert item['year'] == '1999'
+    assert item['quality'] == ['4k', 'gb']
+    assert item['associated_urls'] == ['https://gofile.io/d/abc', 'https://transfer.it/t/qeYXqs1XBZQR']
+    assert parsed['parsed_media']['unassociated_urls'] == []
+    assert parsed['id'] == '1'
+
+
+def test_chatter_and_watch_posts(tweet):
+    parser = MediaParser()
+    skipped = parser.parse_tweet(tweet('1', 'good morning everyone'))['parsed_media']
+    assert skipped['skipped_reason'] == 'no_media_indicators'
+
+    # no link at all: a watch post is interest, never a download
+    watching = parser.parse_tweet(tweet('2', 'now watching "Heat" tonight'))['parsed_media']
+    assert watching['media_items'] == []
+    assert watching['media_interest_items'][0]['title'] == 'Heat'
+    assert watching['media_interest_items'][0]['isWatch']
+
+
+def test_wikidata_only_for_media_looking_items(tweet):
+    wikidata = FakeWikidata()
+    parser = MediaParser(wikidata=wikidata)
+
+    [item] = parser.parse_tweet(tweet('1', 'green mile (1999) 1080p', ['https://gofile.io/d/abc']))[
+        'parsed_media']['media_items']
+    assert item['title'] == 'The Green Mile'
+    assert item['imdb_id'] == 'tt0120689'
+    assert item['wikidata_enhanced'] and item['wikidata_confidence'] == 80
+
+    parser.parse_tweet(tweet('2', 'Big Pack 1080p', ['https://gofile.io/d/xyz']))
+    assert wikidata.lookups == [('Green Mile', '1999')]
+
+
+def test_parse_file_streams_the_export_shape(tmp_path):
+    output = tmp_path / 'parsed.json'
+    stats = MediaParser().parse_file(SAMPLE, output)
+
+    source = json.loads(SAMPLE.read_text())
+    parsed = json.loads(output.read_text())
+    # keys around the tweets array are carried over, stats come last
+    assert list(parsed) == ['config', 'stats', 'tweets', 'parser_stats']
+    assert parsed['config'] == source['config']
+    assert [t['id'] for t in parsed['tweets']] == [t['id'] for t in source['tweets']]
+    assert parsed['parser_stats']['tweets_processed'] == stats['tweets_processed'] == 2
+    assert parsed['parser_stats']['total_media_items'] == 2
+
+    matrix = parsed['tweets'][1]['parsed_media']['media_items'][0]
+    assert matrix['year'] == '1999'
+    assert matrix['quality'] == ['4k', 'uhd', 'remux']
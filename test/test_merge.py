@@ -0,0 +1,75 @@
+# test/test_merge.py
+import json
+
+from src.merge import BookmarkMerger, content_hash, load_tweets
+from src.storage import BookmarkStorage
+
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_richest_version_of_each_id_wins(tmp_path):
+    older = write(tmp_path / 'bookmarks_1.json', [
+        {'id': '1', 'text': 'Heat (1995)'},
+        {'id': '2', 'author': 'a', 'text': 'Ronin (1998)', 'links': ['https://gofile.io/d/r']},
+        {'id': '3', 'text': 'Thief (1981)'},
+    ])
+    # a browser export of the same bookmarks, scraped later
+    newer = write(tmp_path / 'twitter_bookmarks_2.json', {'tweets': [
+        {'id': '1', 'author': 'a', 'text': 'Heat (1995)', 'links': ['https://gofile.io/d/h']},
+        {'id': 2, 'text': 'Ronin (1998)', 'links': ['https://gofile.io/d/r']},
+        {'id': '4', 'text': 'Collateral (2004)'},
+        {'text': 'no id'},
+    ]})
+
+    merger = BookmarkMerger()
+    merger.add_file(older)
+    merger.add_file(newer)
+    merged = list(merger.iter_merged())
+
+    # winners come source by source in file order
+    assert [(t['id'], t.get('author')) for t in merged] == [('2', 'a'), ('3', None), ('1', 'a'), ('4', None)]
+    assert merged[2]['links'] == ['https://gofile.io/d/h']
+    assert merger.stats == {
+        'files': 2, 'tweets_read': 7, 'unique': 4, 'duplicates': 1,
+        'changed': 1, 'replaced': 1, 'missing_id': 1,
+    }
+
+
+def test_an_equally_rich_edit_goes_to_the_later_file(tmp_path):
+    first = write(tmp_path / 'a.json', [{'id': '1', 'text': 'Heat (1995) 720p'}])
+    second = write(tmp_path / 'b.json', [{'id': '1', 'text': 'Heat (1995) 1080'}])
+    again = write(tmp_path / 'c.json', [{'id': '1', 'text': 'Heat (1995) 1080'}])
+
+    merger = BookmarkMerger()
+    for path in (first, second, again):
+        merger.add_file(path)
+
+    assert [t['text'] for t in merger.iter_merged()] == ['Heat (1995) 1080']
+    assert merger.stats['changed'] == 1
+    assert merger.stats['replaced'] == 1
+    # the identical copy in c.json is only counted
+    assert merger.stats['duplicates'] == 1
+
+
+def test_content_hash_ignores_key_order_and_empty_fields():
+    a = {'id': '1', 'text': 'Heat', 'links': [], 'author': 'x'}
+    b = {'links': None, 'text': 'Heat', 'id': '9'}
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a) != content_hash({'text': 'Heat', 'links': ['https://gofile.io/d/h']})
+
+
+def test_merged_export_is_written_and_counted(tmp_path):
+    paths = [write(tmp_path / f'{n}.json', [{'id': str(i), 'text': f't{i}'} for i in ids])
+             for n, ids in (('a', [1, 2, 3]), ('b', [2, 3, 4, 5]))]
+    merger = BookmarkMerger()
+    for path in paths:
+        merger.add_file(path)
+
+    storage = BookmarkStorage(tmp_path)
+    path, count = storage.save_export(merger.iter_merged(), 'merged.json.gz', {'stats': merger.stats})
+
+    assert count == 5
+    assert sorted(t['id'] for t in load_tweets(path)) == ['1', '2', '3', '4', '5']
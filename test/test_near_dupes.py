@@ -0,0 +1,91 @@
+# test/test_near_dupes.py
+import pytest
+
+from ollama_stub import default_responder
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+from src.near_dupes import NearDuplicateFinder, group_near_duplicates
+
+COLLECTION = ("Criterion Noir Collection\n\nThe Night of the Hunter (1955)\nKiss Me Deadly (1955)\n"
+              "Touch of Evil (1958)\nThe Big Heat (1953)\n\n1080p remux, all in one folder\n"
+              "https://\nmega.nz/folder/AbCdEf#key123")
+
+
+@pytest.fixture
+def reposts(tweet):
+    return [
+        tweet('1', COLLECTION, links=['https://mega.nz/folder/AbCdEf#key123']),
+        tweet('2', 'grab this before it goes', quoted_text=COLLECTION,
+              quoted_links=['https://mega.nz/folder/AbCdEf#key123']),
+        tweet('3', '🔥🔥 best noir pack out there', quoted_text=COLLECTION,
+              quoted_links=['https://mega.nz/folder/AbCdEf#key123']),
+    ]
+
+
+def test_reposts_of_one_collection_form_a_cluster(tweet, reposts):
+    unrelated = tweet('4', 'Paris, Texas (1984)\n\n1080p (2.1GB)', links=['https://gofile.io/d/xyz'])
+    clusters = NearDuplicateFinder().clusters(reposts + [unrelated])
+
+    assert clusters == [[0, 1, 2], [3]]
+
+
+def test_same_template_different_links_stay_apart(tweet):
+    tweets = [
+        tweet(str(i), f'Night Train {i} (1999)\n\n1080p (1.6GB)\n\nhttps://\ntransfer.it/t/{i}abc',
+              links=[f'https://transfer.it/t/{i}abc'])
+        for i in range(5)
+    ]
+    assert NearDuplicateFinder().clusters(tweets) == [[i] for i in range(5)]
+
+
+def test_representatives_keep_input_order(tweet, reposts):
+    tweets = [tweet('0', 'something else entirely, no links at all here')] + reposts
+    representatives, members = group_near_duplicates(tweets)
+
+    assert [t['id'] for t in representatives] == ['0', '1']
+    assert [t['id'] for t in members['1']] == ['2', '3']
+
+
+def test_one_request_per_cluster_and_copies_are_marked(run, titles, reposts):
+    stub, processor, processed = run(reposts, dedup=NearDuplicateFinder())
+
+    assert stub.count('/api/generate') == 1
+    assert [t['id'] for t in processed] == ['1', '2', '3']
+    assert titles(processed)[1:] == titles(processed)[:1] * 2
+    assert 'duplicate_of' not in processed[0]['ai_extraction']
+    assert [t['ai_extraction'].get('duplicate_of') for t in processed[1:]] == ['1', '1']
+    assert processor.near_duplicates == 2
+
+
+def test_a_failed_extraction_is_not_copied(run, read_output, reposts):
+    stub, processor, processed = run(reposts, lambda payload: (400, 'bad request'), dedup=NearDuplicateFinder())
+
+    assert stub.count('/api/generate') == 1
+    assert processed == []
+    assert read_output()['errors'] == [{'tweet_id': i, 'error': 'API error 400'} for i in '123']
+    assert processor.near_duplicates == 0
+
+
+def test_clusters_are_grouped_as_tweets_are_read(run, tweet, reposts, monkeypatch):
+    events = []
+    # the second repost only comes after an unrelated tweet
+    tweets = reposts[:2] + [tweet('4', 'Paris, Texas (1984)\n\n1080p', links=['https://gofile.io/d/xyz'])] + reposts[2:]
+
+    def read(self, json_file, ids=None):
+        for t in tweets:
+            events.append(t['id'])
+            yield t
+
+    def responder(payload):
+        events.append('request')
+        return default_responder(payload)
+
+    monkeypatch.setattr(BookmarkAIProcessor, '_iter_tweets', read)
+    stub, processor, processed = run(tweets, responder, dedup=NearDuplicateFinder())
+
+    # the first request goes out before the rest of the input is read
+    assert events[:2] == ['1', 'request']
+    assert stub.count('/api/generate') == 2
+    # copies read after their representative's result follow the next one
+    assert [t['id'] for t in processed] == ['1', '4', '2', '3']
+    assert [t['ai_extraction'].get('duplicate_of') for t in processed] == [None, None, '1', '1']
+    assert processor.near_duplicates == 2
@@ -0,0 +1,44 @@
+# test/test_offset_index.py
+import pytest
+
+from src.offset_index import OffsetIndexReader, index_path_for, load_index
+from src.storage import BookmarkStorage
+
+TWEETS = [{'id': str(i), 'text': f'Night Train {i} (1999) ü'} for i in range(5)] + [{'text': 'no id'}]
+
+
+def test_sidecar_written_with_the_file_finds_each_record(tmp_path):
+    path = BookmarkStorage(tmp_path).save_jsonl(TWEETS, 'bookmarks.jsonl', index=True)
+    assert index_path_for(path).exists()
+
+    with OffsetIndexReader(path, build=False) as reader:
+        assert len(reader) == 5
+        assert reader.get('3') == TWEETS[3]
+        assert reader.get(4) == TWEETS[4]
+        assert reader.get('404') is None
+        assert [t['id'] for t in reader.get_many(['2', '404', '0'])] == ['2', '0']
+
+
+def test_rewritten_file_makes_the_sidecar_stale(tmp_path):
+    storage = BookmarkStorage(tmp_path)
+    path = storage.save_jsonl(TWEETS, 'bookmarks.jsonl', index=True)
+    # written again without the sidecar, the old offsets no longer match
+    storage.save_jsonl(list(reversed(TWEETS[:4])) + [{'id': '9', 'text': 'Ronin'}], 'bookmarks.jsonl')
+
+    assert load_index(path) is None
+    with pytest.raises(FileNotFoundError):
+        OffsetIndexReader(path, build=False)
+
+    with OffsetIndexReader(path) as reader:
+        assert reader.get('9') == {'id': '9', 'text': 'Ronin'}
+        assert reader.get('0') == TWEETS[0]
+        assert '4' not in reader
+    # the rebuilt sidecar is current again
+    assert set(load_index(path)) == {'0', '1', '2', '3', '9'}
+
+
+def test_compressed_files_are_not_indexed(tmp_path):
+    path = BookmarkStorage(tmp_path).save_jsonl(TWEETS, 'bookmarks.jsonl.gz', index=True)
+    assert not index_path_for(path).exists()
+    with pytest.raises(ValueError):
+        OffsetIndexReader(path)
@@ -0,0 +1,38 @@
+# test/test_ollama_client.py
+import json
+
+from ollama_stub import OllamaStub
+from process_bookmarks_ollama_debug import BookmarkAIProcessor
+from src.ollama_client import OllamaClient
+
+
+def test_startup_uses_a_single_probe():
+    with OllamaStub() as stub:
+        BookmarkAIProcessor(ollama_url=stub.url)
+        assert stub.count('/api/tags') == 1
+
+
+def test_connections_are_reused_and_setup_is_timed():
+    with OllamaStub() as stub:
+        client = OllamaClient(stub.url, pool_size=1)
+        timings = [client.generate({'model': 'mistral', 'prompt': 'x'}, timeout=5)[1] for _ in range(5)]
+        client.close()
+
+    assert len(stub.connections) == 1
+    assert not timings[0]['reused'] and timings[0]['connect_s'] > 0
+    assert all(t['reused'] and t['connect_s'] == 0 for t in timings[1:])
+
+
+def test_pool_size_follows_concurrency(tmp_path):
+    tweets = [{'id': str(i), 'text': f'Night Train {i} (1999)', 'links': []} for i in range(12)]
+    input_file = tmp_path / 'bookmarks.json'
+    input_file.write_text(json.dumps({'tweets': tweets}))
+
+    with OllamaStub(latency=0.05, slots=3) as stub:
+        processor = BookmarkAIProcessor(ollama_url=stub.url, concurrency=3)
+        processor.process_bookmarks(str(input_file), str(tmp_path / 'out.json'))
+
+    # probe connection plus at most one per worker
+    assert len(stub.connections) <= 3
+    assert len(processor.request_timings) == 12
+    assert sum(not t['reused'] for t in processor.request_timings) <= 3
@@ -0,0 +1,49 @@
+# test/test_priority.py
+import time
+
+from src.filters import TweetFilter
+from src.retry_policy import RetryPolicy
+
+
+def test_score_adds_up_filter_signals(tweet):
+    tweet_filter = TweetFilter(['gofile.io'])
+    full = tweet('1', 'Night Train (1999)\n1080p remux', ['https://gofile.io/d/abc'])
+    year_only = tweet('2', 'rewatched something from 1999 tonight')
+    chatter = tweet('3', 'good morning everyone')
+
+    assert tweet_filter.score(full) > tweet_filter.score(year_only) > tweet_filter.score(chatter) == 0
+    # a link on the quoted tweet counts too
+    quoted = {**chatter, 'quoted_links': ['https://gofile.io/d/xyz']}
+    assert tweet_filter.score(quoted) == TweetFilter.SCORE_WEIGHTS['target_domain'] + TweetFilter.SCORE_WEIGHTS['link']
+
+
+def test_budget_run_takes_best_tweets_first_and_stops_cleanly(run, read_output, tweet):
+    tweets = [tweet(str(i), f'random thought number {i}') for i in range(8)]
+    tweets += [tweet(str(100 + i), f'Night Train {i} (1999)\n1080p', [f'https://gofile.io/d/{i}'])
+               for i in range(3)]
+    _, _, processed = run(tweets, stub_options={'latency': 0.1}, retry=RetryPolicy(budget_s=0.45),
+                          priority=TweetFilter(['gofile.io']))
+
+    output = read_output()
+    handled = output['budget']['handled']
+    assert output['budget']['deadline_reached']
+    assert 3 <= handled < len(tweets)
+    assert output['budget']['unprocessed'] == len(tweets) - handled
+    # the three media tweets went first, nothing left over counts as an error
+    assert [t['id'] for t in processed[:3]] == ['100', '101', '102']
+    assert all(e['error'] != 'run budget exhausted' for e in output['errors'])
+    assert output['processed_count'] + output['failed_count'] == handled
+
+
+def test_scoring_time_counts_against_the_budget(run, read_output, make_tweets):
+    class SlowFilter(TweetFilter):
+        def score(self, tweet):
+            time.sleep(0.05)
+            return super().score(tweet)
+
+    # the whole input is scored before any request, that alone outlasts the budget
+    stub, _, processed = run(make_tweets(6), retry=RetryPolicy(budget_s=0.2), priority=SlowFilter(['gofile.io']))
+
+    assert stub.count('/api/generate') == 0
+    assert processed == []
+    assert read_output()['budget']['deadline_reached']
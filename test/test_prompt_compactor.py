@@ -0,0 +1,53 @@
+# test/test_prompt_compactor.py
+from process_bookmarks_ollama_debug import DIRECT_INSTRUCTIONS
+from src.prompt_compactor import PromptCompactor, compact_text, compact_url
+
+
+def test_tracking_parameters_go_and_the_rest_stays():
+    assert compact_url('https://gofile.io/d/abc?utm_source=x&utm_medium=y&si=123') == 'https://gofile.io/d/abc'
+    assert compact_url('https://drive.google.com/open?id=1AbC&usp=sharing&fbclid=zz') == \
+        'https://drive.google.com/open?id=1AbC&usp=sharing'
+    # only clear trackers go, the rest is left exactly as it was written
+    assert compact_url('https://x.io/f?name=a%20b&t=30&s=2&UTM_Campaign=z&q=%C3%A9+x') == \
+        'https://x.io/f?name=a%20b&t=30&s=2&q=%C3%A9+x'
+    # mega keys live in the fragment
+    assert compact_url('https://mega.nz/folder/AbCd#key123?') == 'https://mega.nz/folder/AbCd#key123'
+
+
+def test_text_is_rejoined_and_squeezed():
+    text = 'Night Train   (1999)\n\n\n1080p  \t(1.6GB)\n\nhttps://\ntransfer.it/t/abc?si=20'
+    assert compact_text(text) == 'Night Train (1999)\n1080p (1.6GB)\nhttps://transfer.it/t/abc'
+
+
+def test_block_drops_author_and_repeated_links():
+    compactor = PromptCompactor()
+    tweet = {
+        'author': 'Some Poster',
+        'text': 'Night Train (1999)\nhttps://gofile.io/d/abc?utm_source=tw',
+        'quoted_text': '',
+        'links': ['https://gofile.io/d/abc', 'https://gofile.io/d/abc?utm_source=tw', 'https://mega.nz/file/x#k'],
+        'quoted_links': [],
+    }
+    assert compactor.block(tweet) == ('TEXT:\nNight Train (1999)\nhttps://gofile.io/d/abc\n'
+                                      'URLS: https://mega.nz/file/x#k')
+
+
+def test_compact_run_sends_fewer_tokens_and_reports_them(run, make_tweets, titles, generate_payloads):
+    tweets = make_tweets(4, text='Night Train {i} (1999)\n1080p\nhttps://\ngofile.io/d/{i}?utm_source=share')
+    stub, processor, processed = run(tweets, compact=PromptCompactor())
+
+    prompts = [payload['prompt'] for payload in generate_payloads(stub)]
+    assert all('AUTHOR' not in p and 'utm_source' not in p for p in prompts)
+    assert all(len(p) < len(DIRECT_INSTRUCTIONS) for p in prompts)
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(4)]
+
+    stats = processor.compact.stats()
+    assert stats['prompts'] == 4
+    assert stats['tokens_after'] < stats['tokens_before'] / 2
+
+
+def test_compact_batches_still_map_back_by_id(run, make_tweets, titles):
+    stub, _, processed = run(make_tweets(5), batch_size=5, compact=PromptCompactor())
+
+    assert stub.count('/api/generate') == 1
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(5)]
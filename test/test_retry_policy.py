@@ -0,0 +1,166 @@
+# test/test_retry_policy.py
+import threading
+import time
+
+import pytest
+
+from ollama_stub import default_responder
+from src.retry_policy import BudgetExhausted, CircuitBreaker, RetryPolicy
+
+
+def test_backoff_is_jittered_exponential_and_respects_the_budget():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)]:
+        delays = [policy.backoff(attempt) for _ in range(50)]
+        assert all(0 <= d <= cap for d in delays)
+        assert len(set(delays)) > 1
+
+    assert RetryPolicy(base_delay=10, budget_s=0.01).backoff(1) is None
+
+
+def test_timeout_follows_observed_latency():
+    policy = RetryPolicy(timeout=180, min_timeout=0.5, min_samples=10)
+    assert policy.timeout() == 180
+
+    for _ in range(9):
+        policy.record_success(1.0)
+    assert policy.timeout() == 180
+    policy.record_success(2.0)
+    assert policy.timeout() == pytest.approx(6.0)
+
+    assert RetryPolicy(timeout=180, budget_s=5).timeout() <= 5
+
+    # each timeout of a request doubles its next attempt's, up to the cap
+    assert policy.timeout(1) == pytest.approx(12.0)
+    assert policy.timeout(10) == 180
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.2)
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    start = time.monotonic()
+    breaker.acquire()
+    assert time.monotonic() - start >= 0.15
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # a second caller waits for the probe's outcome
+    released = threading.Event()
+    waiter = threading.Thread(target=lambda: (breaker.acquire(), released.set()))
+    waiter.start()
+    assert not released.wait(0.1)
+    breaker.record_success()
+    assert released.wait(1)
+    waiter.join()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(BudgetExhausted):
+        CircuitBreaker().acquire(deadline=time.monotonic() - 1)
+
+
+def test_released_probe_leaves_the_breaker_half_open():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    breaker.acquire()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.failures == 1
+    # the next caller gets to probe
+    breaker.acquire()
+
+
+def test_overloaded_server_is_retried_with_backoff(run, read_output, make_tweets, titles):
+    answers = iter([(503, 'busy'), (503, 'busy')])
+
+    def responder(payload):
+        return next(answers, None) or default_responder(payload)
+
+    stub, _, processed = run(make_tweets(1), responder, retry=RetryPolicy(base_delay=0.01))
+
+    assert stub.count('/api/generate') == 3
+    assert titles(processed) == [['Night Train 0 (1999)']]
+    assert read_output()['retries']['failed_attempts'] == 2
+
+
+def test_client_errors_are_not_retried(run, read_output, make_tweets):
+    stub, _, _ = run(make_tweets(1), lambda payload: (400, 'bad request'), retry=RetryPolicy(base_delay=0.01))
+
+    assert stub.count('/api/generate') == 1
+    assert read_output()['errors'][0]['error'] == 'API error 400'
+
+
+def test_client_errors_do_not_close_the_breaker(run, make_tweets):
+    retry = RetryPolicy(breaker=CircuitBreaker(threshold=3))
+    retry.record_failure()
+    stub, _, _ = run(make_tweets(2), lambda payload: (400, 'bad request'), retry=retry, batch_size=2)
+
+    # one batch call, two single calls, none of them a success
+    assert stub.count('/api/generate') == 3
+    assert retry.breaker.failures == 1
+
+
+def test_timed_out_request_gets_a_longer_timeout(run, read_output, make_tweets):
+    def responder(payload):
+        if 'Night Train 3 ' in payload['prompt']:
+            time.sleep(0.45)
+        return default_responder(payload)
+
+    retry = RetryPolicy(max_attempts=2, timeout=30, min_timeout=0.3, min_samples=3, base_delay=0.01)
+    stub, _, processed = run(make_tweets(4), responder, stub_options={'slots': 2}, retry=retry)
+
+    assert stub.count('/api/generate') == 5
+    assert len(processed) == 4
+    assert read_output()['retries']['failed_attempts'] == 1
+
+
+def test_slow_outlier_times_out_at_the_adaptive_timeout(run, read_output, make_tweets):
+    def responder(payload):
+        if 'Night Train 5 ' in payload['prompt']:
+            time.sleep(2)
+        return default_responder(payload)
+
+    retry = RetryPolicy(max_attempts=1, timeout=30, min_timeout=0.2, min_samples=3)
+    start = time.time()
+    _, _, processed = run(make_tweets(6), responder, retry=retry)
+
+    assert time.time() - start < 2
+    assert len(processed) == 5
+    assert read_output()['errors'] == [{'tweet_id': '1005', 'error': 'timeout'}]
+
+
+def test_stalled_stream_is_retried_as_a_timeout(run, read_output, make_tweets):
+    retry = RetryPolicy(max_attempts=2, timeout=0.2, base_delay=0.01)
+    stub, _, processed = run(make_tweets(1), stub_options={'token_delay': 0.5, 'slots': 2},
+                             retry=retry, stream=True)
+
+    assert processed == []
+    assert stub.count('/api/generate') == 2
+    assert read_output()['errors'] == [{'tweet_id': '1000', 'error': 'timeout'}]
+
+
+def test_no_requests_past_the_budget(run, read_output, make_tweets):
+    retry = RetryPolicy(budget_s=0.3)
+    stub, _, processed = run(make_tweets(20), stub_options={'latency': 0.1}, retry=retry)
+
+    assert 1 <= len(processed) < 20
+    # the request in flight at the deadline is cut short by its timeout, that's no error
+    assert read_output()['errors'] == []
+    assert stub.count('/api/generate') <= len(processed) + 1
+
+
+def test_results_finished_out_of_order_survive_the_deadline(run, read_output, make_tweets):
+    def responder(payload):
+        if 'Night Train 0 ' in payload['prompt']:
+            time.sleep(1)
+        return default_responder(payload)
+
+    # the first tweet holds up the in-order output until the deadline cuts it off
+    stub, _, processed = run(make_tweets(3), responder, stub_options={'slots': 3},
+                             retry=RetryPolicy(budget_s=0.4), concurrency=3)
+
+    assert [t['id'] for t in processed] == ['1001', '1002']
+    output = read_output()
+    assert output['errors'] == []
+    assert output['budget']['deadline_reached']
@@ -0,0 +1,109 @@
+# test/test_router.py
+import socket
+import time
+from contextlib import ExitStack
+
+import pytest
+import requests
+
+from ollama_stub import OllamaStub
+from src.ollama_router import OllamaRouter
+from src.retry_policy import RetryPolicy
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_work_is_spread_over_all_endpoints(run, read_output, make_tweets, titles):
+    with OllamaStub(latency=0.1, slots=2) as a, OllamaStub(latency=0.1, slots=2) as b:
+        start = time.time()
+        _, _, processed = run(make_tweets(12), ollama_url=[a.url, b.url], concurrency=4)
+        elapsed = time.time() - start
+
+    # 12 requests over 4 slots at 0.1s, one server alone would need twice as long
+    assert elapsed < 1.0
+    assert a.count('/api/generate') + b.count('/api/generate') == 12
+    assert a.max_active == 2 and b.max_active == 2
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(12)]
+
+    assert sorted(e['requests'] for e in read_output()['endpoints']) == [6, 6]
+
+
+def test_faster_endpoint_gets_more_work(run, make_tweets):
+    with OllamaStub(latency=0.2) as slow, OllamaStub(latency=0.01) as fast:
+        run(make_tweets(10), ollama_url=[slow.url, fast.url])
+
+    assert slow.count('/api/generate') <= 2
+    assert fast.count('/api/generate') >= 8
+
+
+def test_retries_move_off_a_failing_endpoint(run, make_tweets):
+    broken = lambda payload: (500, 'model runner crashed')
+    with OllamaStub(responder=broken) as bad, OllamaStub() as good:
+        _, _, processed = run(make_tweets(10), ollama_url=[bad.url, good.url], retry=RetryPolicy(base_delay=0.01))
+
+    assert len(processed) == 10
+    assert bad.count('/api/generate') == 1
+    assert good.count('/api/generate') == 10
+
+
+def test_overloaded_endpoint_does_not_look_fast(run, read_output, make_tweets):
+    overloaded = lambda payload: (429, 'server busy')
+    retry = RetryPolicy(base_delay=0.01)
+    # the router is under test here, not the breaker
+    retry.breaker.threshold = 100
+    with OllamaStub(responder=overloaded) as busy, OllamaStub(latency=0.05) as good:
+        _, _, processed = run(make_tweets(10), ollama_url=[busy.url, good.url], retry=retry)
+
+    assert len(processed) == 10
+    assert busy.count('/api/generate') == 1
+    stats = read_output()['endpoints'][0]
+    assert stats['failures'] == 1
+    assert stats['latency_s'] is None
+
+
+def test_failing_endpoint_is_ejected():
+    broken = lambda payload: (500, 'model runner crashed')
+    with OllamaStub(responder=broken) as bad, OllamaStub() as good:
+        router = OllamaRouter([bad.url, good.url], eject_after=2)
+        # keep the healthy endpoint busy so the broken one keeps being picked
+        for endpoint in router.endpoints[1:]:
+            endpoint.in_flight = 5
+        statuses = [router.generate({'model': 'mistral', 'prompt': 'x'}, timeout=5)[0].status_code
+                    for _ in range(4)]
+
+    assert statuses == [500, 500, 200, 200]
+    bad_stats = router.stats()[0]
+    assert not bad_stats['healthy']
+    assert bad_stats['ejections'] == 1
+    assert bad.count('/api/generate') == 2
+
+
+def test_unreachable_endpoint_is_readmitted_once_it_answers():
+    port = free_port()
+    with ExitStack() as stack:
+        up = stack.enter_context(OllamaStub())
+        router = OllamaRouter([up.url, f'http://127.0.0.1:{port}'], cooldown=0.2)
+        status, models = router.probe()
+        assert status == 200 and models == ['mistral']
+        assert [e['healthy'] for e in router.stats()] == [True, False]
+
+        late = stack.enter_context(OllamaStub(port=port))
+        time.sleep(0.3)
+        for _ in range(4):
+            response, timings = router.generate({'model': 'mistral', 'prompt': 'x'}, timeout=5)
+            assert response.status_code == 200
+
+        assert [e['healthy'] for e in router.stats()] == [True, True]
+        assert late.count('/api/generate') >= 1
+
+
+def test_no_reachable_endpoint_is_a_connection_error():
+    router = OllamaRouter([f'http://127.0.0.1:{free_port()}', f'http://127.0.0.1:{free_port()}'])
+    with pytest.raises(requests.exceptions.ConnectionError):
+        router.probe(timeout=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        router.generate({'model': 'mistral', 'prompt': 'x'}, timeout=1)
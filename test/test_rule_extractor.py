@@ -0,0 +1,50 @@
+# test/test_rule_extractor.py
+from src.rule_extractor import RuleExtractor
+
+
+def test_formulaic_tweet_with_wrapped_url(tweet):
+    extraction = RuleExtractor().extract(
+        tweet('1', 'The Green Mile (1999)\n\n4K (31.87GB)\n\nhttps://\ntransfer.it/t/qeYXqs1XBZQR'))
+
+    assert extraction['titles'] == ['The Green Mile']
+    assert extraction['year'] == '1999'
+    assert extraction['quality'] == ['4k']
+    assert extraction['urls'] == ['https://transfer.it/t/qeYXqs1XBZQR']
+    assert extraction['source'] == 'rules'
+
+
+def test_ambiguous_tweets_are_left_to_the_model(tweet):
+    rules = RuleExtractor()
+    # no file host
+    assert rules.extract(tweet('1', 'Heat (1995)\n1080p', ['https://boxd.it/abc'])) is None
+    # no quality
+    assert rules.extract(tweet('2', 'Heat (1995)', ['https://gofile.io/d/abc'])) is None
+    # several titles, a collection
+    assert rules.extract(tweet('3', 'Heat (1995)\nRonin (1998)\n1080p', ['https://gofile.io/d/abc'])) is None
+    # two titles on one line
+    assert rules.extract(tweet('4', 'Silent Hill (2006) & Silent Hill: Revelation (2012)\n1080p',
+                               ['https://gofile.io/d/abc'])) is None
+    # tags and a credit left around the title
+    assert rules.extract(tweet('5', 'John Carpenter - Prince of Darkness [4K Restoration] [+Commentary] (1987)\n4K',
+                               ['https://gofile.io/d/abc'])) is None
+
+
+def test_review_links_are_not_kept(tweet):
+    extraction = RuleExtractor().extract(
+        tweet('1', 'Heat (1995)\n1080p', ['https://boxd.it/x', 'https://gofile.io/d/a']))
+
+    assert extraction['urls'] == ['https://gofile.io/d/a']
+
+
+def test_rule_hits_skip_ollama(run, read_output, tweet):
+    tweets = [
+        tweet('1', 'The Fifth Element (1997)\n\n1080p (3.89GB)', ['https://gofile.io/d/abc']),
+        tweet('2', 'something great dropped today', ['https://gofile.io/d/xyz']),
+    ]
+    stub, processor, processed = run(tweets, rules=RuleExtractor())
+
+    assert stub.count('/api/generate') == 1
+    assert processor.rule_hits == 1
+    assert processed[0]['ai_extraction']['titles'] == ['The Fifth Element']
+    assert 'source' not in processed[1]['ai_extraction']
+    assert read_output()['rule_hits'] == 1
@@ -0,0 +1,68 @@
+# test/test_serializer.py
+import io
+import json
+
+import pytest
+
+from src import serializer
+
+DOC = {
+    'model': 'mistral',
+    'tweets': [
+        {'id': '1', 'text': 'Heat (1995) ünïcode "quoted"\nnext line', 'links': [], 'score': 0.5},
+        {'id': '2', 'text': 'Ronin', 'links': ['https://gofile.io/d/r'], 'nested': {'a': [1, 2], 'b': None}},
+    ],
+    'count': 2,
+    'ok': True,
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    """run a test once on each backend, orjson skipped when not installed"""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(serializer, 'orjson', None)
+    return request.param
+
+
+def stdlib(obj, pretty=False):
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_backends_write_the_same_bytes(backend, pretty):
+    assert serializer.dumps(DOC, pretty) == stdlib(DOC, pretty)
+    assert serializer.loads(serializer.dumps(DOC, pretty)) == DOC
+
+    f = io.BytesIO()
+    serializer.dump(DOC, f, pretty)
+    f.seek(0)
+    assert serializer.load(f) == DOC
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_streamed_array_matches_encoding_the_list(backend, pretty):
+    f = io.BytesIO()
+    serializer.dump_array(iter(DOC['tweets']), f, pretty)
+    assert f.getvalue() == stdlib(DOC['tweets'], pretty)
+
+    f = io.BytesIO()
+    serializer.dump_array(iter([]), f, pretty)
+    assert json.loads(f.getvalue()) == []
+
+
+def test_pretty_array_is_written_as_items_arrive(backend):
+    f = io.BytesIO()
+
+    def items():
+        for i in range(3):
+            # everything before this item is already out
+            assert json.loads(f.getvalue() + b'\n]' if i else b'[]') == [{'id': str(n)} for n in range(i)]
+            yield {'id': str(i)}
+
+    serializer.dump_array(items(), f, pretty=True)
+    assert json.loads(f.getvalue()) == [{'id': '0'}, {'id': '1'}, {'id': '2'}]
@@ -0,0 +1,66 @@
+# test/test_streaming.py
+import functools
+import time
+
+import pytest
+import requests
+
+from ollama_stub import OllamaStub, answer_for, title_from_prompt
+from src.ollama_client import OllamaClient
+from src.streaming import FieldTracker, read_generate_stream
+
+
+def rambling_responder(payload):
+    return answer_for(title_from_prompt(payload['prompt'])) + "\n\n" + "Also worth noting, " * 200
+
+
+@pytest.fixture
+def run(run):
+    """every run here streams"""
+    return functools.partial(run, stream=True)
+
+
+def test_tracker_waits_for_the_summary_line_to_end():
+    tracker = FieldTracker()
+    for chunk in ["TITLE: Heat\nURL: https://gofile.io/d/x\n", "QUALITY: 1080p\nTYPE: Movie\n", "SUMMARY: Cops"]:
+        assert not tracker.feed(chunk)
+    assert not tracker.feed(" and robbers")
+    assert tracker.feed(".\n")
+
+
+def test_stops_reading_once_every_field_is_in(run, read_output, make_tweets, titles):
+    # the ramble alone would take 200 tokens * 10ms = 2s per tweet
+    start = time.time()
+    _, _, processed = run(make_tweets(2), rambling_responder, stub_options={'token_delay': 0.01})
+
+    assert time.time() - start < 2
+    assert titles(processed) == [['Night Train 0 (1999)'], ['Night Train 1 (1999)']]
+    assert processed[0]['ai_extraction']['summary'] == 'A film served by the stub server.'
+
+    streaming = read_output()['streaming']
+    assert streaming['requests'] == 2
+    assert streaming['early_stops'] == 2
+    assert 0 < streaming['mean_ttft_s'] <= streaming['mean_complete_s']
+
+
+def test_answers_without_every_field_are_read_to_the_end(run, make_tweets, titles):
+    def partial_responder(payload):
+        return f"TITLE: {title_from_prompt(payload['prompt'])}\nQUALITY: 1080p"
+
+    stub, processor, processed = run(make_tweets(3), partial_responder)
+
+    assert titles(processed) == [[f'Night Train {i} (1999)'] for i in range(3)]
+    assert processed[0]['ai_extraction']['quality'] == ['1080p']
+    assert not any(t['early_stop'] for t in processor.request_timings)
+    # fully read streams keep their keep-alive connection
+    assert len(stub.connections) == 1
+
+
+def test_a_stalled_stream_is_a_timeout():
+    with OllamaStub(token_delay=0.5) as stub:
+        client = OllamaClient(stub.url)
+        # the headers arrive at once, the first token only after the read timeout
+        response, _ = client.generate({'model': 'mistral', 'prompt': '', 'stream': True}, timeout=0.2, stream=True)
+        with pytest.raises(requests.exceptions.Timeout):
+            read_generate_stream(response, time.perf_counter())
+        client.close()
@@ -0,0 +1,82 @@
+# test/test_telemetry.py
+import json
+
+import pytest
+
+from ollama_stub import default_responder
+from src.retry_policy import RetryPolicy
+from src.telemetry import Telemetry, ollama_timings, percentiles
+
+
+@pytest.fixture
+def run(run, read_output, tmp_path):
+    """runs against a stub with some latency, returns the metrics records and the telemetry summary"""
+    def run_with_metrics(tweets, responder=default_responder, **kwargs):
+        run(tweets, responder, stub_options={'latency': 0.02, 'slots': 2}, **kwargs)
+        metrics = [json.loads(line) for line in (tmp_path / 'out.metrics.jsonl').read_text().splitlines()]
+        return metrics, read_output()['telemetry']
+    return run_with_metrics
+
+
+def test_percentiles_are_nearest_rank():
+    values = list(range(1, 101))
+    assert percentiles(values) == {'p50': 50, 'p90': 90, 'p99': 99}
+    assert percentiles([3.0]) == {'p50': 3.0, 'p90': 3.0, 'p99': 3.0}
+    assert percentiles([]) is None
+
+
+def test_ollama_durations_are_converted_to_seconds():
+    assert ollama_timings({'total_duration': 2_500_000_000, 'eval_count': 40, 'response': 'x'}) == {
+        'total_s': 2.5, 'eval_count': 40}
+
+
+def test_every_request_lands_in_the_metrics_file(run, make_tweets):
+    metrics, summary = run(make_tweets(6), concurrency=2)
+
+    assert len(metrics) == 6
+    for record in metrics:
+        assert record['status'] == 200
+        assert record['http_s'] > 0
+        assert record['queue_s'] >= 0
+        assert record['eval_count'] > 0
+        assert record['eval_s'] == pytest.approx(record['eval_count'] * 0.01)
+
+    assert summary['requests'] == 6
+    assert summary['latency_s']['p50'] >= 0.02
+    assert summary['generated_tokens'] == sum(r['eval_count'] for r in metrics)
+    assert summary['generated_tokens_per_s'] == pytest.approx(100)
+    assert summary['prompt_tokens_per_s'] == pytest.approx(1000)
+    assert 0 < summary['prompt_share'] < 1
+
+
+def test_failed_attempts_are_recorded_too(run, make_tweets):
+    answers = iter([(503, 'busy')])
+
+    def responder(payload):
+        return next(answers, None) or default_responder(payload)
+
+    metrics, summary = run(make_tweets(1), responder, retry=RetryPolicy(base_delay=0.01))
+
+    assert [r['status'] for r in metrics] == [503, 200]
+    assert [r['attempt'] for r in metrics] == [1, 2]
+    assert summary['failed_requests'] == 1
+
+
+def test_resumed_run_appends_to_the_metrics_file(tmp_path):
+    path = tmp_path / 'out.metrics.jsonl'
+    first = Telemetry(path).open()
+    first.record({'tweet_id': '1', 'status': 200})
+    first.close()
+    # the first run died halfway through a line
+    with open(path, 'ab') as f:
+        f.write(b'{"tweet_id": "2", "sta')
+
+    resumed = Telemetry(path).open(resume=True)
+    resumed.record({'tweet_id': '3', 'status': 200})
+    resumed.close()
+    assert [json.loads(line)['tweet_id'] for line in path.read_text().splitlines()] == ['1', '3']
+    # only this run's requests count in its summary
+    assert resumed.summary()['requests'] == 1
+
+    Telemetry(path).open().close()
+    assert path.read_text() == ''
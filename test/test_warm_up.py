@@ -0,0 +1,62 @@
+# test/test_warm_up.py
+from ollama_stub import OllamaStub
+from process_bookmarks_ollama_debug import DIRECT_INSTRUCTIONS, BookmarkAIProcessor
+
+
+def test_warm_up_loads_the_model_before_the_first_extraction(run, make_tweets, titles, generate_payloads):
+    stub, processor, processed = run(make_tweets(2), warm_up=True, keep_alive='30m')
+
+    payloads = generate_payloads(stub)
+    assert len(payloads) == 3
+    assert payloads[0]['prompt'] == ''
+    assert processor.warm_up_s is not None
+    assert all(p['keep_alive'] == '30m' for p in payloads)
+    assert titles(processed) == [['Night Train 0 (1999)'], ['Night Train 1 (1999)']]
+
+
+def test_keep_alive_numbers_are_sent_as_seconds(run, make_tweets, generate_payloads):
+    stub, _, _ = run(make_tweets(1), keep_alive='-1')
+    assert generate_payloads(stub)[0]['keep_alive'] == -1
+
+    stub, _, _ = run(make_tweets(1))
+    assert 'keep_alive' not in generate_payloads(stub)[0]
+
+
+def test_prompts_share_the_instruction_prefix_and_end_with_the_tweet(run, make_tweets, generate_payloads):
+    tweets = make_tweets(2)
+    stub, _, _ = run(tweets)
+
+    prompts = [p['prompt'] for p in generate_payloads(stub)]
+    for prompt, tweet in zip(prompts, tweets):
+        assert prompt.startswith(DIRECT_INSTRUCTIONS)
+        assert prompt.endswith('URLS IN TWEET:\n' + tweet['links'][0])
+
+
+def test_every_healthy_endpoint_is_warmed(run, make_tweets, generate_payloads):
+    with OllamaStub() as a, OllamaStub() as b:
+        _, processor, _ = run(make_tweets(2), ollama_url=[a.url, b.url], warm_up=True)
+
+    # each server loads the model itself, warming one leaves the other cold
+    assert generate_payloads(a)[0]['prompt'] == ''
+    assert generate_payloads(b)[0]['prompt'] == ''
+    assert processor.warm_up_s is not None
+
+
+def test_warm_up_is_joined_after_the_first_tweet_is_read(run, make_tweets, monkeypatch):
+    events = []
+    tweets = make_tweets(2)
+
+    def read(self, json_file, ids=None):
+        for tweet in tweets:
+            events.append('read')
+            yield tweet
+
+    class Load:
+        def join(self):
+            events.append('joined')
+
+    monkeypatch.setattr(BookmarkAIProcessor, '_iter_tweets', read)
+    monkeypatch.setattr(BookmarkAIProcessor, '_start_warm_up', lambda self: [Load()])
+    run(tweets, warm_up=True)
+
+    assert events == ['read', 'joined', 'read']
@@ -0,0 +1,59 @@
+# test/test_wikidata_cache.py
+import json
+import time
+
+from src.wikidata_cache import MISS, WikidataCache
+
+HEAT = {'title': 'Heat', 'year': '1995', 'type': 'film', 'wikidata_id': 'Q1', 'confidence': 95}
+
+
+def test_matches_and_misses_expire_on_their_own(tmp_path, monkeypatch):
+    cache = WikidataCache(tmp_path / 'wikidata.sqlite3', ttl_days=7, negative_ttl_days=1)
+    cache.put('search:heat:1995', HEAT)
+    cache.put('search:nothing here:any', None)
+
+    assert cache.get('search:heat:1995') == HEAT
+    assert cache.get('search:nothing here:any') is None
+    assert cache.get('search:ronin:1998') is MISS
+
+    # two days on the miss is due again, the match is not
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 2 * 24 * 60 * 60)
+    assert cache.get('search:nothing here:any') is MISS
+    assert cache.get('search:heat:1995') == HEAT
+    assert cache.purge() == 1
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['negative_hits'], stats['misses'], stats['expired']) == (2, 1, 2, 1)
+    assert (stats['entries'], stats['negative_entries']) == (1, 0)
+
+
+def test_every_put_is_on_disk_right_away(tmp_path):
+    path = tmp_path / 'wikidata.sqlite3'
+    writer = WikidataCache(path)
+    writer.put('search:heat:1995', HEAT)
+    writer.put('search:nothing here:any', None)
+
+    # a second connection sees them without the first being closed
+    reader = WikidataCache(path)
+    assert reader.get('search:heat:1995') == HEAT
+    assert reader.get('search:nothing here:any') is None
+    assert len(reader) == 2
+
+
+def test_import_of_the_node_cache_file(tmp_path):
+    now_ms = time.time() * 1000
+    legacy = tmp_path / 'wikidata-cache.json'
+    legacy.write_text(json.dumps({
+        'search:heat:1995': {'data': HEAT, 'timestamp': now_ms - 1000},
+        'search:ronin:1998': {'data': {**HEAT, 'title': 'Ronin'}, 'timestamp': now_ms - 30 * 24 * 60 * 60 * 1000},
+    }))
+    cache = WikidataCache(tmp_path / 'wikidata.sqlite3')
+    cache.put('search:heat:1995', {**HEAT, 'confidence': 105})
+
+    # the stale one is dropped, what is already stored wins
+    assert cache.import_json(legacy) == 0
+    assert cache.get('search:heat:1995')['confidence'] == 105
+    assert cache.get('search:ronin:1998') is MISS
+    assert WikidataCache(tmp_path / 'other.sqlite3').import_json(legacy) == 1
+    assert cache.import_json(tmp_path / 'missing.json') == 0
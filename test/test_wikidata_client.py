@@ -0,0 +1,93 @@
+# test/test_wikidata_client.py
+import asyncio
+import time
+
+from src.media_parser import MediaParser
+from src.wikidata_cache import WikidataCache
+from src.wikidata_client import TokenBucket, WikidataClient
+from wikidata_stub import WikidataStub, film
+
+
+def catalog(n):
+    return {f'night train {i}': film(f'Q{1000 + i}', f'Night Train {i}', '1999', f'tt{i:07d}')
+            for i in range(n)}
+
+
+def test_entities_are_fetched_fifty_ids_at_a_time():
+    with WikidataStub(catalog(120)) as stub:
+        client = WikidataClient(endpoint=stub.url, rate_limit_ms=1, burst=50, linger_s=0.5)
+        results = client.search_many((f'Night Train {i}', '1999') for i in range(120))
+
+    assert all(results[(f'Night Train {i}', '1999')]['wikidata_id'] == f'Q{1000 + i}' for i in range(120))
+    fetched = [q['ids'].split('|') for q in stub.calls('wbgetentities')]
+    assert all(len(ids) <= 50 for ids in fetched)
+    # every id once, in three or so calls instead of one per candidate
+    assert sorted(i for ids in fetched for i in ids) == sorted(f'Q{1000 + i}' for i in range(120))
+    assert len(fetched) <= 4
+    assert len(stub.calls('wbsearchentities')) == 120
+
+
+def test_identical_lookups_share_one_search():
+    async def lookups(client):
+        return await asyncio.gather(*(client.search_media('Heat', '1995') for _ in range(5)))
+
+    with WikidataStub({'heat': film('Q1', 'Heat', '1995', 'tt0113277')}, latency=0.05) as stub:
+        client = WikidataClient(endpoint=stub.url, rate_limit_ms=1, linger_s=0.01)
+        results = asyncio.run(lookups(client))
+
+    assert [r['imdb_id'] for r in results] == ['tt0113277'] * 5
+    assert results[0]['confidence'] == 20 + 50 + 25 + 10
+    assert len(stub.calls('wbsearchentities')) == 1
+    assert client.stats['shared'] == 4
+
+
+def test_year_retry_and_cached_answers(tmp_path):
+    cache = WikidataCache(tmp_path / 'wikidata.sqlite3')
+    with WikidataStub({'heat': film('Q1', 'Heat', '1995')}) as stub:
+        with WikidataClient(cache, endpoint=stub.url, rate_limit_ms=1, linger_s=0.01) as client:
+            # no hit with the wrong year, found again without it
+            assert client.search_many([('Heat', '1994')])[('Heat', '1994')]['year'] == '1995'
+            assert client.search_many([('Nothing Here', None)]) == {('Nothing Here', None): None}
+        assert [q['search'] for q in stub.calls('wbsearchentities')] == ['Heat 1994', 'Heat', 'Nothing Here']
+
+        # a repeat run costs no requests, the miss included
+        with WikidataClient(cache, endpoint=stub.url) as client:
+            results = client.search_many([('heat', '1994'), ('nothing here', None)])
+            assert results[('heat', '1994')]['wikidata_id'] == 'Q1'
+            assert results[('nothing here', None)] is None
+            assert client.stats['cache_hits'] == 2
+        assert len(stub.requests) == 4
+
+
+def test_failed_lookups_are_not_cached(tmp_path):
+    cache = WikidataCache(tmp_path / 'wikidata.sqlite3')
+    # nothing listens there
+    with WikidataClient(cache, endpoint='http://127.0.0.1:9/w/api.php', rate_limit_ms=1, timeout=1) as client:
+        assert client.search_many([('Heat', '1995')]) == {('Heat', '1995'): None}
+        assert client.stats['errors'] == 1
+    assert len(cache) == 0
+
+
+def test_token_bucket_spaces_requests():
+    async def take(bucket, n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.perf_counter()
+    asyncio.run(take(bucket, 7))
+    # two free, five more at 20ms each
+    assert time.perf_counter() - start >= 0.09
+
+
+def test_parser_enriches_a_window_in_one_run():
+    tweets = [{'id': str(i), 'text': f'night train {i} (1999) 1080p', 'links': [f'https://gofile.io/d/{i}']}
+              for i in range(6)]
+    with WikidataStub(catalog(6)) as stub:
+        client = WikidataClient(endpoint=stub.url, rate_limit_ms=1, burst=10, linger_s=0.2)
+        parsed = list(MediaParser(wikidata=client).parse_tweets(tweets))
+
+    items = [t['parsed_media']['media_items'][0] for t in parsed]
+    assert [i['title'] for i in items] == [f'Night Train {i}' for i in range(6)]
+    assert all(i['wikidata_enhanced'] and i['imdb_id'] for i in items)
+    assert len(stub.calls('wbgetentities')) == 1
@@ -0,0 +1,100 @@
+# test/wikidata_stub.py
+# minimal local stand-in for the wikidata api (wbsearchentities, wbgetentities),
+# used by the python tests. every title it knows is one film entity.
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def film(entity_id: str, title: str, year: str, imdb_id: str = None) -> dict:
+    claims = {
+        'P31': [{'mainsnak': {'datavalue': {'value': {'id': 'Q11424'}}}}],
+        'P577': [{'mainsnak': {'datavalue': {'value': {'time': f'+{year}-01-01T00:00:00Z'}}}}],
+    }
+    if imdb_id:
+        claims['P345'] = [{'mainsnak': {'datavalue': {'value': imdb_id}}}]
+    return {'id': entity_id, 'labels': {'en': {'value': title}}, 'claims': claims}
+
+
+class WikidataStub:
+    """threaded stub server, use as a context manager
+
+        with WikidataStub({'heat': film('Q1', 'Heat', '1995')}) as stub:
+            client = WikidataClient(endpoint=stub.url)
+
+    titles maps a lowercase search title to its entity; a search with the
+    year appended only matches when the entity has that year.
+    """
+
+    def __init__(self, titles: dict, latency: float = 0.0):
+        self.titles = titles
+        self.entities = {entity['id']: entity for entity in titles.values()}
+        self.latency = latency
+
+        self.lock = threading.Lock()
+        self.requests = []  # query dicts in arrival order
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/w/api.php"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def calls(self, action: str) -> list:
+        with self.lock:
+            return [q for q in self.requests if q.get('action') == action]
+
+    def search(self, text: str) -> dict:
+        results = []
+        for title, entity in self.titles.items():
+            year = entity['claims']['P577'][0]['mainsnak']['datavalue']['value']['time'][1:5]
+            if text.lower() in (title, f'{title} {year}'):
+                results.append({'id': entity['id'], 'label': entity['labels']['en']['value']})
+        return {'search': results}
+
+    def get_entities(self, ids: str) -> dict:
+        return {'entities': {i: self.entities.get(i, {'id': i, 'missing': ''}) for i in ids.split('|')}}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                with stub.lock:
+                    stub.requests.append(query)
+                time.sleep(stub.latency)
+
+                if query.get('action') == 'wbsearchentities':
+                    body = stub.search(query.get('search', ''))
+                elif query.get('action') == 'wbgetentities':
+                    body = stub.get_entities(query.get('ids', ''))
+                else:
+                    body = {'error': {'code': 'badvalue'}}
+
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler